@@ -352,6 +352,20 @@ def with_loc(loc: ast.AST, node: A) -> A:
     return node
 
 
+def copy_node(node: A) -> A:
+    """Returns a shallow copy of an AST node.
+
+    List-valued fields are copied as well, so their elements can be replaced without
+    affecting the original node.
+    """
+    new = type(node).__new__(type(node))
+    new.__dict__.update(
+        (key, list(value) if isinstance(value, list) else value)
+        for key, value in node.__dict__.items()
+    )
+    return new
+
+
 def with_type(ty: "Type", node: A) -> A:
     """Annotates an AST node with a type."""
     node.type = ty  # type: ignore[attr-defined]
@@ -1,5 +1,8 @@
+import heapq
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections import deque
+from collections.abc import Iterable, Iterator
+from functools import cached_property
 from typing import Generic, TypeVar
 
 from guppylang_internals.cfg.bb import BB, VariableStats, VId
@@ -10,6 +13,9 @@ T = TypeVar("T")
 # Analysis result is a mapping from basic blocks to lattice values
 Result = dict[BB, T]
 
+# Sets of variables are represented as bit sets during the analyses. See `VarIndex`
+BitSet = int
+
 
 class Analysis(ABC, Generic[T]):
     """Abstract base class for a program analysis pass over the lattice `T`"""
@@ -38,6 +44,74 @@ class Analysis(ABC, Generic[T]):
         Returns a mapping from basic blocks to lattice values at the start of each BB.
         """
 
+    def successors(self, bb: BB) -> list[BB]:
+        """The successors of a BB that are taken into account by the analysis."""
+        if self.include_unreachable():
+            return bb.successors + bb.dummy_successors
+        return bb.successors
+
+    def predecessors(self, bb: BB) -> list[BB]:
+        """The predecessors of a BB that are taken into account by the analysis."""
+        if self.include_unreachable():
+            return bb.predecessors + bb.dummy_predecessors
+        return bb.predecessors
+
+    def postorder(self, bbs: list[BB]) -> list[BB]:
+        """Returns the given BBs in postorder of a depth-first traversal.
+
+        Processing BBs in reverse postorder for forward analyses (or in postorder for
+        backward analyses) ensures that the predecessors (successors) of a BB are
+        visited before the BB itself, except for back edges. This way, the analysis
+        converges in very few iterations.
+        """
+        in_scope = set(bbs)
+        visited: set[BB] = set()
+        order: list[BB] = []
+        for root in bbs:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack: list[tuple[BB, Iterator[BB]]] = [(root, iter(self.successors(root)))]
+            while stack:
+                bb, succs = stack[-1]
+                for succ in succs:
+                    if succ in in_scope and succ not in visited:
+                        visited.add(succ)
+                        stack.append((succ, iter(self.successors(succ))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(bb)
+        return order
+
+
+class Worklist:
+    """Worklist of BBs that always yields the pending BB that comes first in a given
+    order."""
+
+    def __init__(self, order: list[BB]) -> None:
+        self.order = order
+        self.priority = {bb: i for i, bb in enumerate(order)}
+        # Initially, all BBs are pending
+        self.heap = list(range(len(order)))
+        self.pending = [True] * len(order)
+
+    def __bool__(self) -> bool:
+        return bool(self.heap)
+
+    def pop(self) -> BB:
+        i = heapq.heappop(self.heap)
+        self.pending[i] = False
+        return self.order[i]
+
+    def update(self, bbs: Iterable[BB]) -> None:
+        for bb in bbs:
+            # BBs outside of the analysis scope are ignored
+            i = self.priority.get(bb)
+            if i is not None and not self.pending[i]:
+                self.pending[i] = True
+                heapq.heappush(self.heap, i)
+
 
 class ForwardAnalysis(Analysis[T], ABC, Generic[T]):
     """Abstract base class for a program analysis pass running in forward direction."""
@@ -53,21 +127,18 @@ class ForwardAnalysis(Analysis[T], ABC, Generic[T]):
         """
         if not self.include_unreachable():
             bbs = [bb for bb in bbs if bb.reachable]
+        bbs = list(bbs)
         vals_before = {bb: self.initial() for bb in bbs}  # return value
         vals_after = {bb: self.apply_bb(vals_before[bb], bb) for bb in bbs}  # cache
-        queue = set(bbs)
-        while len(queue) > 0:
+        queue = Worklist(self.postorder(bbs)[::-1])
+        while queue:
             bb = queue.pop()
-            preds = (
-                bb.predecessors + bb.dummy_predecessors
-                if self.include_unreachable()
-                else bb.predecessors
-            )
+            preds = self.predecessors(bb)
             vals_before[bb] = self.join(*(vals_after[pred] for pred in preds))
             val_after = self.apply_bb(vals_before[bb], bb)
             if not self.eq(val_after, vals_after[bb]):
                 vals_after[bb] = val_after
-                queue.update(bb.successors)
+                queue.update(self.successors(bb))
         return vals_before
 
 
@@ -83,23 +154,54 @@ class BackwardAnalysis(Analysis[T], ABC, Generic[T]):
 
         Returns a mapping from basic blocks to lattice values at the start of each BB.
         """
+        bbs = list(bbs)
         vals_before = {bb: self.initial() for bb in bbs}
-        queue = set(bbs)
-        while len(queue) > 0:
+        queue = Worklist(self.postorder(bbs))
+        while queue:
             bb = queue.pop()
-            succs = (
-                bb.successors + bb.dummy_successors
-                if self.include_unreachable()
-                else bb.successors
-            )
+            succs = self.successors(bb)
             val_after = self.join(*(vals_before[succ] for succ in succs))
             val_before = self.apply_bb(val_after, bb)
             if not self.eq(vals_before[bb], val_before):
                 vals_before[bb] = val_before
-                queue.update(bb.predecessors)
+                queue.update(self.predecessors(bb))
         return vals_before
 
 
+class VarIndex(Generic[VId]):
+    """Assigns consecutive indices to variables, so that sets of variables can be
+    represented as bit sets.
+
+    The analyses below operate on bit sets since joins and transfer functions are then
+    just bitwise operations on Python integers, instead of allocating new dicts and
+    sets for every BB in every iteration.
+    """
+
+    vars: list[VId]
+    indices: dict[VId, int]
+
+    def __init__(self) -> None:
+        self.vars = []
+        self.indices = {}
+
+    def bits(self, xs: Iterable[VId]) -> BitSet:
+        """Returns the bit set representing a collection of variables."""
+        bits = 0
+        for x in xs:
+            if (i := self.indices.get(x)) is None:
+                i = self.indices[x] = len(self.vars)
+                self.vars.append(x)
+            bits |= 1 << i
+        return bits
+
+    def unpack(self, bits: BitSet) -> Iterator[VId]:
+        """Iterates over the variables in a bit set, in the order they were indexed."""
+        while bits:
+            lowest = bits & -bits
+            yield self.vars[lowest.bit_length() - 1]
+            bits ^= lowest
+
+
 # For live variable analysis, we also store a BB in which a use occurs as evidence of
 # liveness.
 LivenessDomain = dict[VId, BB]
@@ -110,6 +212,10 @@ class LivenessAnalysis(BackwardAnalysis[LivenessDomain[VId]], Generic[VId]):
 
     Computes the variables that are live before the execution of each BB. The analysis
     runs over the lattice of mappings from variable names to BBs containing a use.
+
+    For performance, `run` doesn't iterate on this lattice directly. Instead, the live
+    variables are computed on bit sets via `BitLivenessAnalysis` and a use for every
+    live variable is recovered afterwards.
     """
 
     stats: dict[BB, VariableStats[VId]]
@@ -147,6 +253,86 @@ class LivenessAnalysis(BackwardAnalysis[LivenessDomain[VId]], Generic[VId]):
             x: b for x, b in live_after.items() if x not in stats.assigned
         }
 
+    def run(self, bbs: Iterable[BB]) -> Result[LivenessDomain[VId]]:
+        """Runs the analysis pass.
+
+        Returns a mapping from basic blocks to the variables that are live at the start
+        of each BB, together with a BB in which they are used.
+        """
+        bbs = list(bbs)
+        bit_analysis = BitLivenessAnalysis(
+            self.stats, self._initial.keys(), self._include_unreachable
+        )
+        index = bit_analysis.index
+        live = bit_analysis.run(bbs)
+
+        # Find a use for every live variable by searching backwards from the BBs that
+        # use them. A variable that is live before a BB that doesn't use it is also
+        # live before one of the successors, so we can take the use from there.
+        use_bbs: dict[BB, dict[VId, BB]] = {bb: {} for bb in bbs}
+        queue: deque[tuple[BB, VId]] = deque()
+        for bb in bbs:
+            for x in index.unpack(live[bb] & bit_analysis.used[bb]):
+                use_bbs[bb][x] = bb
+                queue.append((bb, x))
+        while queue:
+            bb, x = queue.popleft()
+            bit = 1 << index.indices[x]
+            for pred in self.predecessors(bb):
+                if pred in live and live[pred] & bit and x not in use_bbs[pred]:
+                    use_bbs[pred][x] = use_bbs[bb][x]
+                    queue.append((pred, x))
+
+        # The remaining live variables are only kept alive by the initial value
+        return {
+            bb: {
+                x: use_bbs[bb][x] if x in use_bbs[bb] else self._initial[x]
+                for x in index.unpack(live[bb])
+            }
+            for bb in bbs
+        }
+
+
+class BitLivenessAnalysis(BackwardAnalysis[BitSet], Generic[VId]):
+    """Live variable analysis pass on bit sets of variables.
+
+    Computes the same live variables as `LivenessAnalysis`, but without keeping track
+    of the BBs in which they are used. The bit sets can be decoded using `index`.
+    """
+
+    index: VarIndex[VId]
+
+    #: Bit sets of the variables used and assigned in each BB
+    used: dict[BB, BitSet]
+    assigned: dict[BB, BitSet]
+
+    def __init__(
+        self,
+        stats: dict[BB, VariableStats[VId]],
+        initial: Iterable[VId] = (),
+        include_unreachable: bool = False,
+    ) -> None:
+        self.index = VarIndex()
+        self._initial = self.index.bits(initial)
+        self.used = {bb: self.index.bits(s.used) for bb, s in stats.items()}
+        self.assigned = {bb: self.index.bits(s.assigned) for bb, s in stats.items()}
+        self._include_unreachable = include_unreachable
+
+    def initial(self) -> BitSet:
+        return self._initial
+
+    def include_unreachable(self) -> bool:
+        return self._include_unreachable
+
+    def join(self, *ts: BitSet) -> BitSet:
+        res = 0
+        for t in ts:
+            res |= t
+        return res
+
+    def apply_bb(self, live_after: BitSet, bb: BB) -> BitSet:
+        return self.used[bb] | (live_after & ~self.assigned[bb])
+
 
 # Set of variables that are definitely assigned at the start of a BB
 DefAssignmentDomain = set[VId]
@@ -165,10 +351,12 @@ class AssignmentAnalysis(ForwardAnalysis[AssignmentDomain[VId]], Generic[VId]):
     Computes the set of variables (i.e. `V`s) that are definitely assigned at the start
     of a BB. Additionally, we compute the set of variables that are assigned on (at
     least) some paths to a BB (the definitely assigned variables are a subset of this).
+
+    For performance, `run` doesn't iterate on this lattice directly, but computes the
+    result on bit sets via `BitAssignmentAnalysis`.
     """
 
     stats: dict[BB, VariableStats[VId]]
-    all_vars: set[VId]
     ass_before_entry: set[VId]
     maybe_ass_before_entry: set[VId]
 
@@ -188,12 +376,14 @@ class AssignmentAnalysis(ForwardAnalysis[AssignmentDomain[VId]], Generic[VId]):
         self.stats = stats
         self.ass_before_entry = ass_before_entry
         self.maybe_ass_before_entry = maybe_ass_before_entry
-        self.all_vars = (
-            set.union(*(set(stat.assigned.keys()) for stat in stats.values()))
-            | ass_before_entry
-        )
         self._include_unreachable = include_unreachable
 
+    @cached_property
+    def all_vars(self) -> set[VId]:
+        return set().union(
+            self.ass_before_entry, *(stat.assigned for stat in self.stats.values())
+        )
+
     def initial(self) -> AssignmentDomain[VId]:
         # Note that definite assignment must start with `all_vars` instead of only
         # `ass_before_entry` since we want to compute the *greatest* fixpoint.
@@ -222,9 +412,82 @@ class AssignmentAnalysis(ForwardAnalysis[AssignmentDomain[VId]], Generic[VId]):
             maybe_ass_before | stats.assigned.keys(),
         )
 
+    def run(self, bbs: Iterable[BB]) -> Result[AssignmentDomain[VId]]:
+        """Runs the analysis pass.
+
+        Returns a mapping from basic blocks to the definitely and maybe assigned
+        variables at the start of each BB.
+        """
+        bit_analysis = BitAssignmentAnalysis(
+            self.stats,
+            self.ass_before_entry,
+            self.maybe_ass_before_entry,
+            self._include_unreachable,
+        )
+        unpack = bit_analysis.index.unpack
+        return {
+            bb: (set(unpack(def_ass)), set(unpack(maybe_ass)))
+            for bb, (def_ass, maybe_ass) in bit_analysis.run(bbs).items()
+        }
+
     def run_unpacked(
         self, bbs: Iterable[BB]
     ) -> tuple[Result[DefAssignmentDomain[VId]], Result[MaybeAssignmentDomain[VId]]]:
         """Runs the analysis and unpacks the definite- and maybe-assignment results."""
         res = self.run(bbs)
         return {bb: res[bb][0] for bb in res}, {bb: res[bb][1] for bb in res}
+
+
+class BitAssignmentAnalysis(ForwardAnalysis[tuple[BitSet, BitSet]], Generic[VId]):
+    """Assigned variable analysis pass on bit sets of variables.
+
+    Computes the same definitely and maybe assigned variables as `AssignmentAnalysis`.
+    The bit sets can be decoded using `index`.
+    """
+
+    index: VarIndex[VId]
+    all_vars: BitSet
+    ass_before_entry: BitSet
+    maybe_ass_before_entry: BitSet
+
+    #: Bit sets of the variables assigned in each BB
+    assigned: dict[BB, BitSet]
+
+    def __init__(
+        self,
+        stats: dict[BB, VariableStats[VId]],
+        ass_before_entry: Iterable[VId],
+        maybe_ass_before_entry: Iterable[VId],
+        include_unreachable: bool = False,
+    ) -> None:
+        self.index = VarIndex()
+        self.ass_before_entry = self.index.bits(ass_before_entry)
+        self.maybe_ass_before_entry = self.index.bits(maybe_ass_before_entry)
+        self.assigned = {bb: self.index.bits(s.assigned) for bb, s in stats.items()}
+        self.all_vars = self.ass_before_entry
+        for assigned in self.assigned.values():
+            self.all_vars |= assigned
+        self._include_unreachable = include_unreachable
+
+    def initial(self) -> tuple[BitSet, BitSet]:
+        return self.all_vars, self.maybe_ass_before_entry
+
+    def include_unreachable(self) -> bool:
+        return self._include_unreachable
+
+    def join(self, *ts: tuple[BitSet, BitSet]) -> tuple[BitSet, BitSet]:
+        if len(ts) == 0:
+            return self.ass_before_entry, self.ass_before_entry
+
+        def_ass, maybe_ass = -1, 0
+        for def_ass_t, maybe_ass_t in ts:
+            def_ass &= def_ass_t
+            maybe_ass |= maybe_ass_t
+        return def_ass, maybe_ass
+
+    def apply_bb(
+        self, val_before: tuple[BitSet, BitSet], bb: BB
+    ) -> tuple[BitSet, BitSet]:
+        assigned = self.assigned[bb]
+        def_ass_before, maybe_ass_before = val_before
+        return def_ass_before | assigned, maybe_ass_before | assigned
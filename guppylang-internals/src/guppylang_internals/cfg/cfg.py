@@ -84,10 +84,14 @@ class BaseCFG(Generic[T]):
 class CFG(BaseCFG[BB]):
     """A control-flow graph of unchecked basic blocks."""
 
+    #: Arguments of the most recent call to `analyze`
+    _analyzed_for: tuple[frozenset[str], frozenset[str], tuple[str, ...]] | None
+
     def __init__(self) -> None:
         super().__init__([])
         self.entry_bb = self.new_bb()
         self.exit_bb = self.new_bb()
+        self._analyzed_for = None
 
     def new_bb(self, *preds: BB, statements: list[BBStatement] | None = None) -> BB:
         """Adds a new basic block to the CFG."""
@@ -119,6 +123,12 @@ class CFG(BaseCFG[BB]):
         maybe_ass_before: set[str],
         inout_vars: list[str],
     ) -> dict[BB, VariableStats[str]]:
+        # The results only depend on the arguments, so we can skip the analysis if the
+        # CFG is checked again in the same setting (e.g. for another monomorphization)
+        key = frozenset(def_ass_before), frozenset(maybe_ass_before), tuple(inout_vars)
+        if key == self._analyzed_for:
+            return {bb: bb.vars for bb in self.bbs}
+
         stats = {bb: bb.compute_variable_stats() for bb in self.bbs}
         # Locals are variables that are assigned somewhere inside the function
         self.assigned_somewhere = def_ass_before.union(
@@ -137,4 +147,5 @@ class CFG(BaseCFG[BB]):
         self.ass_before, self.maybe_ass_before = AssignmentAnalysis(
             stats, def_ass_before, maybe_ass_before, include_unreachable=True
         ).run_unpacked(self.bbs)
+        self._analyzed_for = key
         return stats
@@ -25,6 +25,7 @@ from guppylang_internals.checker.expr_checker import ExprSynthesizer, to_bool
 from guppylang_internals.checker.stmt_checker import StmtChecker
 from guppylang_internals.diagnostic import Error, Note
 from guppylang_internals.error import GuppyError
+from guppylang_internals.profiling import phase
 from guppylang_internals.tys.arg import Argument
 from guppylang_internals.tys.ty import InputFlags, Type
 
@@ -162,9 +163,10 @@ def check_cfg(
     # Finally, run the linearity check
     from guppylang_internals.checker.linearity_checker import check_cfg_linearity
 
-    linearity_checked_cfg = check_cfg_linearity(
-        checked_cfg, func_name, globals, first_modifier_node=first_modifier_node
-    )
+    with phase("check_cfg_linearity"):
+        linearity_checked_cfg = check_cfg_linearity(
+            checked_cfg, func_name, globals, first_modifier_node=first_modifier_node
+        )
 
     from guppylang_internals.checker.unitary_checker import check_cfg_unitary
 
@@ -238,10 +240,11 @@ def check_bb(
     checked_stmts = StmtChecker(ctx, bb, return_ty).check_stmts(bb.statements)
 
     # If we branch, we also have to check the branch predicate
+    branch_pred = bb.branch_pred
     if len(bb.successors) > 1:
-        assert bb.branch_pred is not None
-        bb.branch_pred, ty = ExprSynthesizer(ctx).synthesize(bb.branch_pred)
-        bb.branch_pred, _ = to_bool(bb.branch_pred, ty, ctx)
+        assert branch_pred is not None
+        branch_pred, ty = ExprSynthesizer(ctx).synthesize(branch_pred)
+        branch_pred, _ = to_bool(branch_pred, ty, ctx)
 
     for succ in bb.successors + bb.dummy_successors:
         for x, use_bb in cfg.live_before[succ].items():
@@ -287,7 +290,7 @@ def check_bb(
         sig=Signature(inputs, outputs, dummy_outputs),
     )
     checked_bb.successors = [None] * len(bb.successors)  # type: ignore[list-item]
-    checked_bb.branch_pred = bb.branch_pred
+    checked_bb.branch_pred = branch_pred
     return checked_bb
 
 
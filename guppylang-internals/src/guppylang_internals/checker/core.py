@@ -8,6 +8,7 @@ from types import FrameType
 from typing import (
     TYPE_CHECKING,
     Any,
+    Final,
     Generic,
     NamedTuple,
     TypeAlias,
@@ -35,6 +36,8 @@ from guppylang_internals.tys.ty import (
 )
 
 if TYPE_CHECKING:
+    from guppylang.defs import GuppyDefinition
+
     from guppylang_internals.definition.util import CheckedField
     from guppylang_internals.tys.parsing import TypeParsingCtx
 
@@ -311,11 +314,26 @@ class Globals:
     f_builtins: dict[str, Any]
     frame: FrameType
 
+    #: Names that have been looked up through this object. The engine uses them to
+    #: detect whether a cached definition needs to be checked again.
+    referenced_names: set[str]
+
+    #: Tables of the names that have been resolved so far, mapping them to the raw
+    #: objects they are bound to and to the id of the Guppy definition or the Python
+    #: object they refer to. The entries are only valid as long as none of the names
+    #: are rebound. The engine takes care of this by discarding the whole object once
+    #: a referenced name is rebound, see `CompilationEngine.get_globals`.
+    _bindings: dict[str, object]
+    _resolved: "dict[str, DefId | PythonObject | None]"
+
     def __init__(self, frame: FrameType) -> None:
         self.frame = frame
         self.f_locals = frame.f_locals
         self.f_globals = frame.f_globals
         self.f_builtins = frame.f_builtins
+        self.referenced_names = set()
+        self._bindings = {}
+        self._resolved = {}
 
     @staticmethod
     @cache
@@ -334,11 +352,8 @@ class Globals:
             case DefId() as def_id:
                 return def_id in DEF_STORE.raw_defs
             case str(x):
-                return (
-                    x in self.builtin_defs()
-                    or x in self.f_locals
-                    or x in self.f_globals
-                )
+                self.referenced_names.add(x)
+                return self._lookup(x) is not None
             case x:
                 return assert_never(x)
 
@@ -349,42 +364,73 @@ class Globals:
     def __getitem__(self, item: str) -> "ParsedDef | PythonObject": ...
 
     def __getitem__(self, item: DefId | str) -> "ParsedDef | PythonObject":
-        from guppylang.defs import GuppyDefinition
-
         match item:
             case DefId() as def_id:
                 return ENGINE.get_parsed(def_id)
             case str(name):
-                if name in self.f_locals:
-                    val = self.f_locals[name]
-                    if isinstance(val, GuppyDefinition):
-                        return ENGINE.get_parsed(val.id)
-                    # Before falling back to returning the Python object, check if we
-                    # have defined the name as a builtin
-                    elif name in self.builtin_defs():
-                        defn = self.builtin_defs()[name]
-                        return ENGINE.get_parsed(defn.id)
-                    else:
-                        return PythonObject(val)
-                elif name in self.f_globals:
-                    val = self.f_globals[name]
-                    if isinstance(val, GuppyDefinition):
-                        return ENGINE.get_parsed(val.id)
-                    # Before falling back to returning the Python object, check if we
-                    # have defined the name as a builtin
-                    elif name in self.builtin_defs():
-                        defn = self.builtin_defs()[name]
-                        return ENGINE.get_parsed(defn.id)
-                    else:
-                        return PythonObject(val)
-                elif name in self.builtin_defs():
-                    defn = self.builtin_defs()[name]
-                    return ENGINE.get_parsed(defn.id)
-                else:
-                    raise InternalGuppyError(f"Cannot find definition `{name}`")
+                self.referenced_names.add(name)
+                match self._lookup(name):
+                    case DefId() as def_id:
+                        return ENGINE.get_parsed(def_id)
+                    case PythonObject() as obj:
+                        return obj
+                    case None:
+                        raise InternalGuppyError(f"Cannot find definition `{name}`")
             case x:
                 return assert_never(x)
 
+    def _lookup(self, name: str) -> "DefId | PythonObject | None":
+        """Resolves a name to the Guppy definition or Python object it refers to.
+
+        Returns `None` if the name is not bound. The result is cached in the name
+        table, so each name is only resolved once.
+        """
+        if name in self._resolved:
+            return self._resolved[name]
+        from guppylang.defs import GuppyDefinition
+
+        val = self.resolve(name)
+        resolved: DefId | PythonObject | None
+        if isinstance(val, GuppyDefinition):
+            resolved = val.id
+        # Before falling back to returning the Python object, check if we have defined
+        # the name as a builtin
+        elif name in self.builtin_defs():
+            resolved = self.builtin_defs()[name].id
+        elif val is UNBOUND:
+            resolved = None
+        else:
+            resolved = PythonObject(val)
+        self._resolved[name] = resolved
+        return resolved
+
+    def define(self, name: str, defn: "GuppyDefinition") -> None:
+        """Binds a name in the local scope to a Guppy definition."""
+        self.f_locals[name] = defn
+        self._bindings[name] = defn
+        self._resolved[name] = defn.id
+
+    def resolve(self, name: str) -> object:
+        """Returns the raw Python object that a name is bound to in this scope.
+
+        Returns `UNBOUND` if the name is not bound. Contrary to `__getitem__`, this
+        doesn't parse any definitions and doesn't record the name as referenced.
+        """
+        if name in self._bindings:
+            return self._bindings[name]
+        if name in self.f_locals:
+            val = self.f_locals[name]
+        elif name in self.f_globals:
+            val = self.f_globals[name]
+        else:
+            val = self.builtin_defs().get(name, UNBOUND)
+        self._bindings[name] = val
+        return val
+
+
+#: Sentinel returned by `Globals.resolve` for names that are not bound.
+UNBOUND: Final = object()
+
 
 V = TypeVar("V")
 
@@ -485,6 +531,7 @@ class DummyEvalDict(dict[str, Any]):
         self.node = node
 
     def _check_item(self, key: str) -> None:
+        self.ctx.globals.referenced_names.add(key)
         # Catch the user trying to access Guppy variables
         if key in self.ctx.locals:
             # Find the name node in the AST where the usage occurs
@@ -21,10 +21,9 @@ can be used to infer a type for an expression.
 """
 
 import ast
-import copy
 import sys
 import traceback
-from collections.abc import Sequence
+from collections.abc import Hashable, Sequence
 from contextlib import suppress
 from dataclasses import replace
 from types import ModuleType
@@ -34,6 +33,7 @@ from guppylang_internals.ast_util import (
     AstNode,
     AstVisitor,
     breaks_in_loop,
+    copy_node,
     get_type,
     get_type_opt,
     return_nodes_in_ast,
@@ -149,7 +149,7 @@ from guppylang_internals.tys.const import (
 )
 from guppylang_internals.tys.param import TypeParam, check_all_args
 from guppylang_internals.tys.parsing import arg_from_ast
-from guppylang_internals.tys.subst import Inst, Subst
+from guppylang_internals.tys.subst import ExistentialRenamer, Inst, Subst
 from guppylang_internals.tys.ty import (
     EnumType,
     ExistentialTypeVar,
@@ -163,6 +163,7 @@ from guppylang_internals.tys.ty import (
     TupleType,
     Type,
     TypeBase,
+    Unifier,
     function_tensor_signature,
     parse_function_tensor,
     unify,
@@ -242,7 +243,7 @@ class ExprChecker(AstVisitor[tuple[ast.expr, Subst]]):
 
         The type may have free type variables which will try to be resolved. Returns
         a new desugared expression with type annotations and a substitution with the
-        resolved type variables.
+        resolved type variables. The original expression is left unchanged.
         """
         # If we already have a type for the expression, we just have to match it against
         # the target
@@ -252,15 +253,37 @@ class ExprChecker(AstVisitor[tuple[ast.expr, Subst]]):
                 expr = with_loc(expr, TypeApply(expr, inst))
             return with_type(ty.substitute(subst), expr), subst
 
+        # Checking the same expression against the same type up to renaming of
+        # existential variables yields the same result. Thus, we can skip attempts that
+        # are known to run into an inference error. This avoids exponential blowup when
+        # `check_call` retries nested calls after their synthesis has failed.
+        failures: dict[Hashable, GuppyTypeInferenceError] | None = getattr(
+            expr, "inference_failures", None
+        )
+        if failures and (err := failures.get(_renamed_key(ty))):
+            raise err
+        try:
+            return self._check_uncached(expr, ty, kind)
+        except GuppyTypeInferenceError as err:
+            if (key := _renamed_key(ty)) is not None:
+                if failures is None:
+                    failures = expr.inference_failures = {}  # type: ignore[attr-defined]
+                failures[key] = err
+            raise
+
+    def _check_uncached(
+        self, expr: ast.expr, ty: Type, kind: str
+    ) -> tuple[ast.expr, Subst]:
         # When checking against a variable, we have to synthesize
         if isinstance(ty, ExistentialTypeVar):
             expr, syn_ty = self._synthesize(expr, allow_free_vars=False)
             return with_type(syn_ty, expr), {ty: syn_ty}
 
-        # Otherwise, invoke the visitor
+        # Otherwise, invoke the visitor on a copy, since visitors update the node in
+        # place
         old_kind = self._kind
         self._kind = kind or self._kind
-        expr, subst = self.visit(expr, ty)
+        expr, subst = self.visit(copy_node(expr), ty)
         self._kind = old_kind
         return with_type(ty.substitute(subst), expr), subst
 
@@ -399,11 +422,12 @@ class ExprSynthesizer(AstVisitor[tuple[ast.expr, Type]]):
     ) -> tuple[ast.expr, Type]:
         """Tries to synthesise a type for the given expression.
 
-        Also returns a new desugared expression with type annotations.
+        Also returns a new desugared expression with type annotations. The original
+        expression is left unchanged.
         """
         if ty := get_type_opt(node):
             return node, ty
-        node, ty = self.visit(node)
+        node, ty = self.visit(copy_node(node))
         if ty.unsolved_vars and not allow_free_vars:
             raise GuppyError(TypeInferenceError(node, ty))
         return with_type(ty, node), ty
@@ -660,14 +684,10 @@ class ExprSynthesizer(AstVisitor[tuple[ast.expr, Type]]):
         if isinstance(node, ast.Name):
             x = node.id
             globals = self.ctx.globals
-            if x in globals.f_locals or x in globals.f_globals:
-                val = (
-                    globals.f_locals[x]
-                    if x in globals.f_locals
-                    else globals.f_globals[x]
-                )
-                if isinstance(val, ModuleType):
-                    return val
+            globals.referenced_names.add(x)
+            val = globals.resolve(x)
+            if isinstance(val, ModuleType):
+                return val
         return None
 
     def visit_Tuple(self, node: ast.Tuple) -> tuple[ast.expr, Type]:
@@ -1111,14 +1131,15 @@ def check_num_args(
 def type_check_args(
     inputs: list[ast.expr],
     func_ty: FunctionType,
-    subst: Subst,
+    unifier: Unifier,
     ctx: Context,
     node: AstNode,
-) -> tuple[list[ast.expr], Subst]:
+) -> list[ast.expr]:
     """Checks the arguments of a function call and infers free type variables.
 
     We expect that parameters have been replaced with free unification variables.
-    Checks that all unification variables can be inferred.
+    Solutions for them are recorded in the provided unifier. Checks that all
+    unification variables can be inferred.
     """
     assert not func_ty.parametrized
     check_num_args(len(func_ty.inputs), len(inputs), node, func_ty)
@@ -1126,35 +1147,34 @@ def type_check_args(
     new_args: list[ast.expr] = []
     comptime_args = iter(func_ty.comptime_args)
     for inp, func_inp in zip(inputs, func_ty.inputs, strict=True):
-        a, s = ExprChecker(ctx).check(inp, func_inp.ty.substitute(subst), "argument")
-        subst |= s
+        a, s = ExprChecker(ctx).check(inp, unifier.resolve(func_inp.ty), "argument")
+        unifier.update(s)
         if InputFlags.Inout in func_inp.flags and isinstance(a, PlaceNode):
             a.place = check_place_assignable(
                 a.place, ctx, a, "able to borrow subscripted elements"
             )
         if InputFlags.Comptime in func_inp.flags:
             comptime_arg = next(comptime_args)
-            const = comptime_arg.const.substitute(subst)
-            s = check_comptime_arg(a, const, func_inp.ty.substitute(subst), subst)
-            subst |= s
+            const = unifier.resolve(comptime_arg.const)
+            check_comptime_arg(a, const, unifier.resolve(func_inp.ty), unifier)
         new_args.append(a)
     assert next(comptime_args, None) is None
 
     # Check whether we have found instantiations for all unification variables occurring
     # in the input types
     for inp in func_ty.inputs:
-        if not set.issubset(inp.ty.unsolved_vars, subst.keys()):
+        if not all(var in unifier for var in inp.ty.unsolved_vars):
             raise GuppyTypeInferenceError(
-                TypeInferenceError(node, inp.ty.substitute(subst))
+                TypeInferenceError(node, unifier.resolve(inp.ty))
             )
 
     # We also have to check that we found instantiations for all vars in the return type
-    if not set.issubset(func_ty.output.unsolved_vars, subst.keys()):
+    if not all(var in unifier for var in func_ty.output.unsolved_vars):
         raise GuppyTypeInferenceError(
-            TypeInferenceError(node, func_ty.output.substitute(subst))
+            TypeInferenceError(node, unifier.resolve(func_ty.output))
         )
 
-    return new_args, subst
+    return new_args
 
 
 def check_place_assignable(
@@ -1213,12 +1233,12 @@ def check_place_assignable(
 
 
 def check_comptime_arg(
-    arg: ast.expr, exp_const: Const, ty: Type, subst: Subst | None
-) -> Subst:
+    arg: ast.expr, exp_const: Const, ty: Type, unifier: Unifier
+) -> None:
     """Checks that an expression can be passes as a valid `@comptime` argument.
 
-    Also checks that the value matches the provided constant. Returns a substitution
-    that solves any existential variables occurring in provided constant.
+    Also checks that the value matches the provided constant. Solutions for any
+    existential variables occurring in provided constant are recorded in the unifier.
     """
     const: Const
     match arg:
@@ -1244,10 +1264,8 @@ def check_comptime_arg(
             err.add_sub_diagnostic(ComptimeUnknownError.Feedback(None))
             raise GuppyError(err)
     # Unify with expected constant to check and maybe infer some variables
-    subst = unify(exp_const, const, subst)
-    if subst is None:
+    if not unifier.unify(exp_const, const):
         raise GuppyError(ConstMismatchError(arg, exp_const, const))
-    return subst
 
 
 def synthesize_call(
@@ -1264,16 +1282,18 @@ def synthesize_call(
     # Replace quantified variables with free unification variables and try to infer an
     # instantiation by checking the arguments
     unquantified, free_vars = func_ty.unquantified()
-    args, subst = type_check_args(args, unquantified, {}, ctx, node)
+    unifier = Unifier()
+    args = type_check_args(args, unquantified, unifier, ctx, node)
 
     # Success implies that the substitution is closed
+    subst = unifier.subst()
     assert all(not t.unsolved_vars for t in subst.values())
     inst = check_all_solved(subst, free_vars, func_ty, node)
 
     # Finally, check that the instantiation respects the linearity requirements
     check_inst(func_ty, inst, node)
 
-    return args, unquantified.output.substitute(subst), inst
+    return args, unifier.resolve(unquantified.output), inst
 
 
 def check_call(
@@ -1307,39 +1327,31 @@ def check_call(
     # In other words, if we can get away with synthesising the call without the extra
     # information from the expected type, we should do that to improve the error.
 
-    # TODO: The approach below can result in exponential runtime in the worst case.
-    #  However the bad case, e.g. `x: int = foo(foo(...foo(?)...))`, shouldn't be common
-    #  in practice. Can we do better than that?
-
-    # synthesize_call may modify args and node in place,
-    # hence we deepcopy them before passing in the function
-    node_copy = copy.deepcopy(node)
-    inputs_copy = copy.deepcopy(inputs)
-
+    # Note that checking doesn't modify the argument ASTs, so they can be reused for the
+    # second attempt below. Nested calls like `x: int = foo(foo(...foo(?)...))` are
+    # checked against types with fresh variables in both attempts, so their inference
+    # failures are recorded by `ExprChecker.check` and not explored again. This keeps
+    # the runtime linear in the nesting depth.
     try:
-        inputs, synth, inst = synthesize_call(func_ty, inputs, node, ctx)
+        args, synth, inst = synthesize_call(func_ty, inputs, node, ctx)
         subst = unify(ty, synth, {})
         if subst is None:
             raise GuppyTypeError(TypeMismatchError(node, ty, synth, kind))
         else:
-            return inputs, subst, inst
+            return args, subst, inst
     except GuppyTypeInferenceError:
         pass
 
-    # Restore the state of these values from before they were potentially
-    # modified by `synthesize_call`.
-    inputs = inputs_copy
-    node = node_copy
-
     # If synthesis fails, we try again, this time also using information from the
     # expected return type
     unquantified, free_vars = func_ty.unquantified()
-    subst = unify(ty, unquantified.output, {})
-    if subst is None:
+    unifier = Unifier()
+    if not unifier.unify(ty, unquantified.output):
         raise GuppyTypeError(TypeMismatchError(node, ty, unquantified.output, kind))
 
     # Try to infer more by checking against the arguments
-    inputs, subst = type_check_args(inputs, unquantified, subst, ctx, node)
+    inputs = type_check_args(inputs, unquantified, unifier, ctx, node)
+    subst = unifier.subst()
 
     # Also make sure we found an instantiation for all free vars in the type we're
     # checking against
@@ -1362,6 +1374,16 @@ def check_call(
     return inputs, subst, inst
 
 
+def _renamed_key(ty: Type) -> Hashable | None:
+    """Returns a key that identifies a type up to renaming of existential variables.
+
+    Returns `None` if the type cannot be hashed.
+    """
+    if not ty.unsolved_vars:
+        return ty.intern_key
+    return ty.transform(ExistentialRenamer()).intern_key
+
+
 def check_all_solved(
     subst: Subst,
     free_vars: Sequence[ExistentialVar],
@@ -1473,8 +1495,10 @@ def check_generator(
     """
     from guppylang_internals.checker.stmt_checker import StmtChecker
 
-    # Check the iterator in the outer context
-    gen.iter_assign = StmtChecker(ctx).visit_Assign(gen.iter_assign)
+    # Check the iterator in the outer context. The checkers below update the generator
+    # in place, so we work on copies to leave the original unchanged.
+    gen = copy_node(gen)
+    gen.iter_assign = StmtChecker(ctx).visit_Assign(copy_node(gen.iter_assign))
 
     # The rest is checked in a new nested context to ensure that variables don't escape
     # their scope
@@ -14,6 +14,7 @@ from typing import TYPE_CHECKING, ClassVar, cast
 from guppylang_internals.ast_util import return_nodes_in_ast, with_loc
 from guppylang_internals.cfg.bb import BB
 from guppylang_internals.cfg.builder import CFGBuilder
+from guppylang_internals.cfg.cfg import CFG
 from guppylang_internals.checker.cfg_checker import CheckedCFG, check_cfg
 from guppylang_internals.checker.core import Context, Globals, Place, Variable
 from guppylang_internals.checker.errors.generic import UnsupportedError
@@ -132,21 +133,39 @@ class SelfParamsShadowedError(Error):
             return f'{parent.self_arg}: "{parent.ty_defn.name}{params}"'
 
 
+def build_global_func_cfg(
+    func_def: ast.FunctionDef, ty: FunctionType, globals: Globals
+) -> CFG:
+    """Builds the CFG for the body of a top-level function definition.
+
+    The resulting CFG only depends on whether the function returns `None` and on its
+    unitary flags, so it can be shared between all instantiations of a generic
+    function that agree on those.
+    """
+    func_def = copy.deepcopy(func_def)
+    returns_none = isinstance(ty.output, NoneType)
+    check_invalid_under_dagger(func_def, ty.unitary_flags)
+    return CFGBuilder().build(func_def.body, returns_none, globals, ty.unitary_flags)
+
+
 def check_global_func_def(
     func_def: ast.FunctionDef,
     generic_ty: FunctionType,
     type_args: Inst,
     globals: Globals,
+    cfg: CFG | None = None,
 ) -> CheckedCFG[Place]:
-    """Type checks a top-level function definition."""
+    """Type checks a top-level function definition.
+
+    Optionally takes a CFG for the function body that was previously built via
+    `build_global_func_cfg`. Checking doesn't modify this CFG, so it may be reused.
+    """
     ty = generic_ty.instantiate(type_args)
-    func_def = copy.deepcopy(func_def)
     args = func_def.args.args
-    returns_none = isinstance(ty.output, NoneType)
     assert all(inp.name is not None for inp in ty.inputs)
 
-    check_invalid_under_dagger(func_def, ty.unitary_flags)
-    cfg = CFGBuilder().build(func_def.body, returns_none, globals, ty.unitary_flags)
+    if cfg is None:
+        cfg = build_global_func_cfg(func_def, ty, globals)
     inputs = [
         Variable(cast("str", inp.name), inp.ty, loc, inp.flags, is_func_input=True)
         for inp, loc in zip(ty.inputs, args, strict=True)
@@ -239,7 +258,7 @@ def check_nested_func_def(
             )
             DEF_STORE.register_def(func, parent_frame)
             ENGINE.parsed[def_id] = func
-            globals.f_locals[func_def.name] = GuppyDefinition(func)
+            globals.define(func_def.name, GuppyDefinition(func))
         else:
             # Otherwise, we treat it like a local name
             inputs.append(Variable(func_def.name, func_def.ty, func_def))
@@ -1,8 +1,9 @@
 """Type checking code for modifiers."""
 
 import ast
+import copy
 
-from guppylang_internals.ast_util import loop_in_ast, with_loc
+from guppylang_internals.ast_util import copy_node, loop_in_ast, with_loc
 from guppylang_internals.cfg.bb import BB
 from guppylang_internals.checker.cfg_checker import check_cfg
 from guppylang_internals.checker.core import Context, Variable
@@ -78,12 +79,17 @@ def check_modified_block(
     )
     func_ty = check_modified_block_signature(modified_block, checked_cfg.input_tys)
 
+    # The statement checker annotates the modifiers in place, so we pass on copies to
+    # leave the unchecked block unchanged
+    modifiers = copy.copy(modified_block.modifiers)
+    modifiers.control = [copy_node(control) for control in modifiers.control]
+    modifiers.power = [copy_node(power) for power in modifiers.power]
     checked_modifier = CheckedModifiedBlock(
         def_id,
         checked_cfg,
         func_ty,
         captured,
-        modified_block.modifiers,
+        modifiers,
         **dict(ast.iter_fields(modified_block)),
     )
     return with_loc(modified_block, checked_modifier)
@@ -17,6 +17,7 @@ from typing import TypeVar, cast
 
 from guppylang_internals.ast_util import (
     AstVisitor,
+    copy_node,
     get_type,
     with_loc,
     with_type,
@@ -111,7 +112,12 @@ class StmtChecker(AstVisitor[BBStatement]):
         self.return_ty = return_ty
 
     def check_stmts(self, stmts: Sequence[BBStatement]) -> list[BBStatement]:
-        return [self.visit(s) for s in stmts]
+        """Type checks a list of statements.
+
+        Returns new type annotated statements and leaves the original ones unchanged, so
+        the same CFG can be checked multiple times.
+        """
+        return [self.visit(copy_node(s)) for s in stmts]
 
     def _synth_expr(self, node: ast.expr) -> tuple[ast.expr, Type]:
         return ExprSynthesizer(self.ctx).synthesize(node)
@@ -447,7 +453,7 @@ class StmtChecker(AstVisitor[BBStatement]):
                     assert len(subst) == 0
                 control.qubit_num = len(ctrl)
 
-        for power in node.power:
+        for power in modified_block.power:
             power.iter, subst = self._check_expr(
                 power.iter, NumericType(NumericType.Kind.Nat)
             )
@@ -0,0 +1,230 @@
+"""Opt-in persistent cache for compiled Hugr packages.
+
+When enabled, the engine stores every compiled package in a cache directory on disk,
+keyed by a content hash of all definitions that went into it. Later compilations of an
+unchanged program (also in a fresh interpreter session) load the package from the cache
+instead of lowering all definitions to Hugr again.
+
+The cache is enabled by setting the `GUPPYLANG_CACHE_DIR` environment variable or by
+calling `enable_compile_cache`. Only programs consisting of plain function, declaration,
+struct, and enum definitions are cached. Programs that involve comptime functions or
+other definitions whose compilation runs arbitrary user code are always recompiled. The
+same holds for definitions capturing Python modules or mutable objects that are not part
+of the Guppy library, since they might have changed without changing the cache key.
+"""
+
+import ast
+import hashlib
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+from types import FunctionType, ModuleType
+from typing import TYPE_CHECKING
+
+from hugr.package import ModulePointer, Package
+
+import guppylang_internals
+from guppylang_internals.ast_util import get_file
+from guppylang_internals.checker.core import UNBOUND
+from guppylang_internals.debug_mode import debug_mode_enabled
+from guppylang_internals.definition.common import DefId, Definition
+from guppylang_internals.definition.custom import CustomFunctionDef
+from guppylang_internals.definition.declaration import ParsedFunctionDecl
+from guppylang_internals.definition.enum import ParsedEnumDef
+from guppylang_internals.definition.function import ParsedFunctionDef
+from guppylang_internals.definition.struct import ParsedStructDef
+from guppylang_internals.definition.traced import TracedFunctionDef
+from guppylang_internals.engine import DEF_STORE, CompilationEngine, MonoDefId
+from guppylang_internals.monomorphization import lazy_monomorphization_enabled
+from guppylang_internals.tracing.object import TracingDefMixin
+from guppylang_internals.tys.printing import TypePrinter
+
+if TYPE_CHECKING:
+    from hugr.ext import Extension
+
+_CACHE_DIR: Path | None = (
+    Path(os.environ["GUPPYLANG_CACHE_DIR"])
+    if "GUPPYLANG_CACHE_DIR" in os.environ
+    else None
+)
+
+
+def enable_compile_cache(path: str | os.PathLike[str]) -> None:
+    """Enables the persistent compilation cache, storing packages in `path`."""
+    global _CACHE_DIR
+    _CACHE_DIR = Path(path)
+
+
+def disable_compile_cache() -> None:
+    """Disables the persistent compilation cache."""
+    global _CACHE_DIR
+    _CACHE_DIR = None
+
+
+def compile_cache_dir() -> Path | None:
+    """Returns the directory of the persistent compilation cache if it is enabled."""
+    return _CACHE_DIR
+
+
+def package_cache_key(
+    engine: CompilationEngine,
+    def_ids: list[DefId],
+    additional_extensions: Iterable["Extension"] = (),
+) -> str | None:
+    """Computes the key for the cached package compiled from the given definitions.
+
+    The key covers the Guppy version, the source and captured Python values of every
+    definition in the transitive closure of `def_ids`, and the instantiations they are
+    used at. Assumes that the definitions have already been checked by the engine.
+
+    Returns `None` if the cache is disabled or if the package may not be cached since
+    the closure contains definitions that are not content-addressable.
+    """
+    # Debug information refers to the calling file and working directory, so we don't
+    # bother caching in debug mode
+    if _CACHE_DIR is None or debug_mode_enabled():
+        return None
+
+    forward: dict[MonoDefId, list[MonoDefId]] = {}
+    for dep, users in engine.dependents.items():
+        for user in users:
+            forward.setdefault(user, []).append(dep)
+
+    todo: list[MonoDefId] = [(def_id, ()) for def_id in def_ids]
+    closure: set[MonoDefId] = set()
+    while todo:
+        mono_id = todo.pop()
+        if mono_id not in closure:
+            closure.add(mono_id)
+            todo.extend(forward.get(mono_id, ()))
+
+    printer = TypePrinter()
+    node_keys = []
+    for def_id, mono_args in closure:
+        source = _source_key(engine, def_id)
+        if source is None:
+            return None
+        captured = []
+        if fingerprint := engine.fingerprints.get((def_id, mono_args)):
+            for name, value in sorted(fingerprint.captured.items()):
+                value_key = _value_key(engine, value)
+                if value_key is None:
+                    return None
+                captured.append(f"{name}={value_key}")
+        inst = ",".join(printer.visit(arg) for arg in mono_args)
+        node_keys.append(f"{source}[{inst}]{captured}")
+
+    hasher = hashlib.sha256()
+    hasher.update(guppylang_internals.__version__.encode())
+    # Lazy monomorphization changes the shape of the emitted Hugr
+    hasher.update(str(lazy_monomorphization_enabled()).encode())
+    for ext in additional_extensions:
+        hasher.update(f"{ext.name}:{ext.version}".encode())
+    for def_id in def_ids:
+        hasher.update(str(_source_key(engine, def_id)).encode())
+    for node_key in sorted(node_keys):
+        hasher.update(node_key.encode())
+    return hasher.hexdigest()
+
+
+def load_package(key: str) -> ModulePointer | None:
+    """Looks up a package in the cache, returning `None` if there is no entry."""
+    if _CACHE_DIR is None:
+        return None
+    path = _CACHE_DIR / f"{key}.hugr"
+    try:
+        package = Package.from_bytes(path.read_bytes())
+    except Exception:  # noqa: BLE001
+        # A missing or corrupt entry is just treated like a cache miss
+        return None
+    return ModulePointer(package, 0)
+
+
+def store_package(key: str, pointer: ModulePointer) -> None:
+    """Writes a compiled package to the cache."""
+    if _CACHE_DIR is None:
+        return
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so concurrent readers never observe a partially
+    # written entry
+    with tempfile.NamedTemporaryFile(dir=_CACHE_DIR, delete=False) as f:
+        f.write(pointer.package.to_bytes())
+    Path(f.name).replace(_CACHE_DIR / f"{key}.hugr")
+
+
+def _source_key(engine: CompilationEngine, def_id: DefId) -> str | None:
+    """Returns a string identifying the source of a definition.
+
+    Definitions from the Guppy standard library are identified by their module and
+    name, since their source is already covered by the version in the cache key. User
+    definitions are identified by their file and AST.
+    """
+    if def_id not in DEF_STORE.frames:
+        # Builtin definitions are not associated with a frame
+        defn = DEF_STORE.raw_defs[def_id]
+        return f"builtin:{defn.name}"
+    module = DEF_STORE.frames[def_id].f_globals.get("__name__", "")
+    defn = engine.parsed.get(def_id, DEF_STORE.raw_defs[def_id])
+    if _is_guppy_module(module):
+        return f"std:{module}.{defn.name}"
+    match defn:
+        case TracedFunctionDef():
+            # Comptime functions run arbitrary Python code during compilation
+            return None
+        case ParsedFunctionDef(defined_at=node, link_name=link_name, metadata=meta):
+            max_qubits = meta.get_max_qubits() if meta else None
+            extra = f"{link_name}:{max_qubits}"
+        case ParsedFunctionDecl(defined_at=node, link_name=link_name):
+            extra = link_name
+        case ParsedStructDef(defined_at=node) | ParsedEnumDef(defined_at=node):
+            extra = ""
+        case CustomFunctionDef(defined_at=node) if (
+            isinstance(DEF_STORE.raw_defs[def_id], CustomFunctionDef)
+            and def_id in DEF_STORE.type_member_parents
+        ):
+            # Methods like struct constructors are generated by the compiler and fully
+            # determined by their parent type. Custom functions provided by users on
+            # the other hand are created from a `RawCustomFunctionDef`.
+            parent_key = _source_key(engine, DEF_STORE.type_member_parents[def_id])
+            extra = f"{parent_key}.{defn.name}"
+        case _:
+            return None
+    if node is None:
+        return None
+    dump = ast.dump(node, include_attributes=True)
+    digest = hashlib.sha256(dump.encode()).hexdigest()
+    return f"{type(defn).__name__}:{get_file(node)}:{extra}:{digest}"
+
+
+def _value_key(engine: CompilationEngine, value: object) -> str | None:
+    """Returns a string identifying a Python value captured by a definition, or `None`
+    if the value cannot be identified by its content."""
+    match value:
+        case _ if value is UNBOUND:
+            return "<unbound>"
+        case TracingDefMixin(wrapped=defn):
+            return _source_key(engine, defn.id)
+        case Definition(id=def_id):
+            return _source_key(engine, def_id)
+        case ModuleType(__name__=name) if _is_guppy_module(name):
+            # Other modules could have been modified, so we would need to hash all of
+            # their attributes that are read during checking
+            return f"module:{name}"
+        case type() | FunctionType() if _is_guppy_module(value.__module__):
+            # Python objects from the Guppy library are covered by the version
+            return f"std:{value.__module__}.{value.__qualname__}"
+        case tuple() | frozenset():
+            elems = [_value_key(engine, v) for v in value]
+            if any(elem is None for elem in elems):
+                return None
+            return f"{type(value).__name__}({','.join(map(str, elems))})"
+        case None | bool() | int() | float() | complex() | str() | bytes():
+            return repr(value)
+        case _:
+            return None
+
+
+def _is_guppy_module(name: str) -> bool:
+    """Checks whether a module belongs to the Guppy compiler or standard library."""
+    return name.split(".")[0] in ("guppylang", "guppylang_internals")
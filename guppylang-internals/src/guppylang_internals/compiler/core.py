@@ -1,8 +1,10 @@
+import functools
 import itertools
 from abc import ABC
-from collections.abc import Iterator, Sequence
+from collections.abc import Hashable, Iterator, Sequence
 from contextlib import contextmanager
 from dataclasses import dataclass, field
+from enum import Enum, auto
 from typing import Any, Generic, cast
 
 import tket_exts
@@ -36,12 +38,16 @@ from guppylang_internals.definition.common import (
 from guppylang_internals.definition.ty import TypeDef
 from guppylang_internals.definition.value import CompiledCallableDef
 from guppylang_internals.engine import DEF_STORE, ENGINE, MonoDefId
-from guppylang_internals.error import InternalGuppyError
+from guppylang_internals.error import (
+    InternalGuppyError,
+    RequiresMonomorphizationError,
+)
 from guppylang_internals.metadata.debug_info_util import (
     StringTable,
     debug_conditions_fulfilled,
     make_location_record,
 )
+from guppylang_internals.profiling import phase
 from guppylang_internals.std._internal.compiler.tket_exts import GUPPY_EXTENSION
 from guppylang_internals.tys.common import ToHugrContext
 from guppylang_internals.tys.subst import Inst
@@ -49,6 +55,7 @@ from guppylang_internals.tys.ty import (
     StructType,
     TupleType,
     Type,
+    TypeBase,
 )
 
 CompiledLocals = dict[PlaceId, Wire]
@@ -102,6 +109,10 @@ class CompilerContext(ToHugrContext):
 
     metadata_file_table: StringTable
 
+    #: Hugr representations of the types lowered so far, indexed by the `intern_key`
+    #: of the Guppy type. Populated by `TypeBase.to_hugr` via `memoize_to_hugr`.
+    hugr_type_cache: dict[Hashable, tuple[TypeBase, ht.Type]]
+
     def __init__(
         self,
         module: DefinitionBuilder[ops.Module],
@@ -116,13 +127,36 @@ class CompilerContext(ToHugrContext):
         self.metadata_file_table = (
             file_table if file_table is not None else StringTable([])
         )
+        self.hugr_type_cache = {}
 
     def build_compiled_def(self, def_id: DefId, type_args: Inst | None) -> CompiledDef:
         """Returns the compiled definitions corresponding to the given ID.
 
         Might mutate the current Hugr if this definition has never been compiled before.
+
+        If lazy monomorphization is enabled and the definition is compiled into a
+        polymorphic Hugr function, returns a view of that function at the given
+        instantiation.
         """
+        from guppylang_internals.definition.custom import CustomFunctionDef
+        from guppylang_internals.definition.function import CompiledFunctionDef
+
         mono_args = type_args or ()
+        if mono_args and (poly_args := ENGINE.polymorphic_args(def_id)) is not None:
+            poly_defn = self._build_compiled_def(def_id, poly_args)
+            assert isinstance(poly_defn, CompiledFunctionDef)
+            return poly_defn.instantiate(mono_args)
+        # When compiling a polymorphic function, the instantiations of the functions it
+        # calls may refer to its generic parameters. We can only handle this for custom
+        # functions which are compiled inline. Everything else would require a separate
+        # Hugr function for each instantiation.
+        if any(arg.bound_vars for arg in mono_args) and not isinstance(
+            ENGINE.get_parsed(def_id), CustomFunctionDef
+        ):
+            raise RequiresMonomorphizationError
+        return self._build_compiled_def(def_id, mono_args)
+
+    def _build_compiled_def(self, def_id: DefId, mono_args: Inst) -> CompiledDef:
         if (def_id, mono_args) not in self.compiled:
             defn = ENGINE.get_checked(def_id, mono_args)
             if isinstance(defn, CompilableDef):
@@ -135,13 +169,28 @@ class CompilerContext(ToHugrContext):
         while self.worklist:
             next_id, next_mono_args = self.worklist.popitem()[0]
             next_def = self.compiled[next_id, next_mono_args]
-            with track_hugr_side_effects():
-                next_def.compile_inner(self)
+            with (
+                track_hugr_side_effects(self.module.hugr),
+                phase("compile", (next_id, next_mono_args), self.module.hugr),
+            ):
+                try:
+                    next_def.compile_inner(self)
+                except RequiresMonomorphizationError:
+                    # This can only happen for functions that we are trying to compile
+                    # polymorphically. The engine will start over and monomorphize the
+                    # function instead.
+                    if ENGINE.polymorphic_args(next_id) != next_mono_args:
+                        raise InternalGuppyError(
+                            "Monomorphic definition requires monomorphization"
+                        ) from None
+                    ENGINE.requires_monomorphization.add(next_id)
+                    raise
 
         # Insert explicit drops for affine types
         # TODO: This is a quick workaround until we can properly insert these drops
         # during linearity checking. See https://github.com/quantinuum/guppylang/issues/1082
-        insert_drops(self.module.hugr)
+        with phase("insert_drops", hugr=self.module.hugr):
+            insert_drops(self.module.hugr)
 
     def build_compiled_instance_func(
         self,
@@ -159,8 +208,7 @@ class CompilerContext(ToHugrContext):
         parsed_func = ENGINE.get_instance_func(ty, name)
         if parsed_func is None:
             return None
-        checked_func = ENGINE.get_checked(parsed_func.id, type_args)
-        compiled_func = self.build_compiled_def(checked_func.id, type_args)
+        compiled_func = self.build_compiled_def(parsed_func.id, type_args)
         assert isinstance(compiled_func, CompiledCallableDef)
         return compiled_func
 
@@ -175,6 +223,10 @@ class CompilerContext(ToHugrContext):
         else returns the existing one.
         """
         mono_args = type_args or ()
+        if any(arg.bound_vars for arg in mono_args):
+            # The function would need to be polymorphic in the generic parameters of
+            # the polymorphic function we are currently compiling
+            raise RequiresMonomorphizationError
         if (const_id, mono_args) in self.global_funcs:
             return self.global_funcs[const_id, mono_args], True
         func = self.module.module_root_builder().define_function(
@@ -413,18 +465,20 @@ RESULT_EXTENSION = tket_exts.result()
 DEBUG_EXTENSION = tket_exts.debug()
 
 #: List of extension ops that have side-effects, identified by their qualified name
-EXTENSION_OPS_WITH_SIDE_EFFECTS: list[str] = [
-    # Results should be order w.r.t. each other but also w.r.t. panics
-    *(op_def.qualified_name() for op_def in RESULT_EXTENSION.operations.values()),
-    PRELUDE.get_op("panic").qualified_name(),
-    PRELUDE.get_op("exit").qualified_name(),
-    DEBUG_EXTENSION.get_op("StateResult").qualified_name(),
-    # Qubit allocation and deallocation have the side-effect of changing the number of
-    # available free qubits
-    QUANTUM_EXTENSION.get_op("QAlloc").qualified_name(),
-    QUANTUM_EXTENSION.get_op("QFree").qualified_name(),
-    QUANTUM_EXTENSION.get_op("MeasureFree").qualified_name(),
-]
+EXTENSION_OPS_WITH_SIDE_EFFECTS: frozenset[str] = frozenset(
+    {
+        # Results should be order w.r.t. each other but also w.r.t. panics
+        *(op_def.qualified_name() for op_def in RESULT_EXTENSION.operations.values()),
+        PRELUDE.get_op("panic").qualified_name(),
+        PRELUDE.get_op("exit").qualified_name(),
+        DEBUG_EXTENSION.get_op("StateResult").qualified_name(),
+        # Qubit allocation and deallocation have the side-effect of changing the number
+        # of available free qubits
+        QUANTUM_EXTENSION.get_op("QAlloc").qualified_name(),
+        QUANTUM_EXTENSION.get_op("QFree").qualified_name(),
+        QUANTUM_EXTENSION.get_op("MeasureFree").qualified_name(),
+    }
+)
 
 
 def may_have_side_effect(op: ops.Op) -> bool:
@@ -433,65 +487,95 @@ def may_have_side_effect(op: ops.Op) -> bool:
     We need to insert implicit state order edges between these kinds of nodes to ensure
     they are executed in the correct order, even if there is no data dependency.
     """
-    match op:
-        case ops.ExtOp() as ext_op:
+    match _side_effect_kind(type(op)):
+        case _SideEffectKind.EXT_OP:
+            ext_op = cast("ops.ExtOp", op)
             return ext_op.op_def().qualified_name() in EXTENSION_OPS_WITH_SIDE_EFFECTS
-        case ops.Custom(op_name=op_name, extension=extension):
+        case _SideEffectKind.CUSTOM_OP:
+            custom_op = cast("ops.Custom", op)
+            extension, op_name = custom_op.extension, custom_op.op_name
             qualified_name = f"{extension}.{op_name}" if extension else op_name
             return qualified_name in EXTENSION_OPS_WITH_SIDE_EFFECTS
-        case ops.Call() | ops.CallIndirect():
-            # Conservative choice is to assume that all calls could have side effects.
-            # In the future we could inspect the call graph to figure out a more
-            # precise answer
+        case _SideEffectKind.ALWAYS:
             return True
-        case _:
-            # There is no need to handle TailLoop (in case of non-termination) since
-            # TailLoops are only generated for array comprehensions which must have
-            # statically-guaranteed (finite) size. TODO revisit this for lists.
+        case _SideEffectKind.NEVER:
             return False
 
 
+class _SideEffectKind(Enum):
+    """How `may_have_side_effect` decides whether an op has a side-effect, depending
+    on the class of the op."""
+
+    EXT_OP = auto()
+    CUSTOM_OP = auto()
+    ALWAYS = auto()
+    NEVER = auto()
+
+
+@functools.cache
+def _side_effect_kind(op_class: type[ops.Op]) -> _SideEffectKind:
+    """Classifies an op class for `may_have_side_effect`.
+
+    This is cached since Hugr's op classes are protocols, so `isinstance` checks against
+    them are too slow to run for every node that is added to the Hugr.
+    """
+    if issubclass(op_class, ops.ExtOp):
+        return _SideEffectKind.EXT_OP
+    if issubclass(op_class, ops.Custom):
+        return _SideEffectKind.CUSTOM_OP
+    if issubclass(op_class, ops.Call | ops.CallIndirect):
+        # Conservative choice is to assume that all calls could have side effects.
+        # In the future we could inspect the call graph to figure out a more
+        # precise answer
+        return _SideEffectKind.ALWAYS
+    # There is no need to handle TailLoop (in case of non-termination) since
+    # TailLoops are only generated for array comprehensions which must have
+    # statically-guaranteed (finite) size. TODO revisit this for lists.
+    return _SideEffectKind.NEVER
+
+
 @contextmanager
-def track_hugr_side_effects() -> Iterator[None]:
-    """Initialises the tracking of nodes with side-effects during Hugr building.
+def track_hugr_side_effects(hugr: Hugr[OpVarCov]) -> Iterator[None]:
+    """Initialises the tracking of nodes with side-effects while building the given
+    Hugr.
 
     Ensures that state-order edges are implicitly inserted between side-effectful nodes
     to ensure they are executed in the order they are added.
     """
-    # Remember original `Hugr.add_node` method that is monkey-patched below.
-    hugr_add_node = Hugr.add_node
+    # All Hugr builders add nodes via `Hugr.add_node`, so we hook into it by shadowing
+    # the method on this particular instance. Other Hugrs are not affected.
+    hugr_add_node = hugr.add_node
     # Last node with potential side effects for each dataflow parent
-    prev_node_with_side_effect: dict[Node, tuple[Node, Hugr[Any]]] = {}
+    prev_node_with_side_effect: dict[Node, Node] = {}
 
     def hugr_add_node_with_order(
-        self: Hugr[OpVarCov],
         op: ops.Op,
         parent: ToNode | None = None,
         num_outs: int | None = None,
         metadata: dict[str, Any] | NodeMetadata | None = None,
     ) -> Node:
-        """Monkey-patched version of `Hugr.add_node` that takes care of implicitly
-        inserting state order edges between operations that could have side-effects.
+        """Hooked version of `Hugr.add_node` that takes care of implicitly inserting
+        state order edges between operations that could have side-effects.
         """
-        new_node = hugr_add_node(self, op, parent, num_outs, metadata)
+        new_node = hugr_add_node(op, parent, num_outs, metadata)
         if may_have_side_effect(op):
-            handle_side_effect(new_node, self)
+            handle_side_effect(new_node)
         return new_node
 
-    def handle_side_effect(node: Node, hugr: Hugr[OpVarCov]) -> None:
+    def handle_side_effect(node: Node) -> None:
         """Performs the actual order-edge insertion, assuming that `node` has a side-
         effect."""
         parent = hugr[node].parent
         assert parent is not None
 
         if prev := prev_node_with_side_effect.get(parent):
-            prev_node = prev[0]
+            prev_node = prev
         else:
             # This is the first side-effectful op in this DFG. Recurse on the parent
             # since the parent is also considered side-effectful now. We shouldn't walk
             # up through function definitions (only the Module is above)
             if not isinstance(hugr[parent].op, ops.FuncDefn):
-                handle_side_effect(parent, hugr)
+                handle_side_effect(parent)
                 # For DataflowBlocks and Cases, recurse to mark their containing CFG
                 # or Conditional as side-effectful as well, but there is nothing to do
                 # locally: we cannot add order edges, but Conditional/CFG semantics
@@ -504,20 +588,19 @@ def track_hugr_side_effects() -> Iterator[None]:
         # Add edge, but avoid self-loops for containers when recursing up the hierarchy.
         if prev_node != node:
             hugr.add_order_link(prev_node, node)
-            prev_node_with_side_effect[parent] = (node, hugr)
+            prev_node_with_side_effect[parent] = node
 
-    # Monkey-patch the `add_node` method
-    Hugr.add_node = hugr_add_node_with_order  # type: ignore[method-assign]
+    hugr.add_node = hugr_add_node_with_order  # type: ignore[method-assign]
     try:
         yield
-        for parent, (last, hugr) in prev_node_with_side_effect.items():
+        for parent, last in prev_node_with_side_effect.items():
             # Connect the last side-effecting node to Output
             outp = hugr.children(parent)[1]
             assert isinstance(hugr[outp].op, ops.Output)
             assert last != outp
             hugr.add_order_link(last, outp)
     finally:
-        Hugr.add_node = hugr_add_node  # type: ignore[method-assign]
+        del hugr.add_node
 
 
 #: List of linear extension types that correspond to affine Guppy types and thus require
@@ -567,6 +650,14 @@ def insert_drops(hugr: Hugr[OpVarCov]) -> None:
     TODO: This is a quick workaround until we can properly insert these drops during
       linearity checking. See https://github.com/quantinuum/guppylang/issues/1082
     """
+    # Cache for `requires_drop` keyed by the identity of the type, since Hugr types are
+    # not hashable. Ops often share the same type objects for their ports. However,
+    # `port_kind` may also build fresh types from the op signature, so we keep every
+    # type alive in the cache to make sure its id isn't reused by another type.
+    drop_required: dict[int, tuple[ht.Type, bool]] = {}
+    # Collect all connected out-ports in a single pass over the links, which is much
+    # cheaper than querying the links of every port individually
+    linked_ports = {out_port for out_port, _ in hugr.links()}
     for node in hugr:
         data = hugr[node]
         # Iterating over `node.outputs()` doesn't work reliably since it sometimes
@@ -574,11 +665,16 @@ def insert_drops(hugr: Hugr[OpVarCov]) -> None:
         # and look them up by index.
         for i in range(hugr.num_out_ports(node)):
             port = node.out(i)
+            # Almost all ports are connected, so we can skip computing the port kind
+            # from the op signature for most of them
+            if port in linked_ports:
+                continue
             kind = hugr.port_kind(port)
-            if (
-                next(iter(hugr.linked_ports(port)), None) is None
-                and isinstance(kind, ht.ValueKind)
-                and requires_drop(kind.ty)
-            ):
+            if not isinstance(kind, ht.ValueKind):
+                continue
+            if (cached := drop_required.get(id(kind.ty))) is None:
+                cached = drop_required[id(kind.ty)] = (kind.ty, requires_drop(kind.ty))
+            _, required = cached
+            if required:
                 drop = hugr.add_node(drop_op(kind.ty), parent=data.parent)
                 hugr.add_link(port, drop.inp(0))
@@ -60,6 +60,7 @@ from guppylang_internals.nodes import (
 )
 from guppylang_internals.std._internal.compiler.arithmetic import (
     UnsignedIntVal,
+    convert_ifromusize,
     convert_itousize,
 )
 from guppylang_internals.std._internal.compiler.array import (
@@ -77,6 +78,7 @@ from guppylang_internals.std._internal.compiler.list import (
 )
 from guppylang_internals.std._internal.compiler.prelude import (
     build_panic,
+    load_nat,
     make_error,
     panic,
 )
@@ -87,6 +89,7 @@ from guppylang_internals.std._internal.compiler.tket_bool import (
     not_op,
     read_bool,
 )
+from guppylang_internals.tys.arg import ConstArg
 from guppylang_internals.tys.builtin import (
     bool_type,
     get_element_type,
@@ -281,9 +284,14 @@ class ExprCompiler(CompilerBase, AstVisitor[Wire]):
         return defn.load(self.dfg, self.ctx, node)
 
     def visit_DummyGenericParamValue(self, node: DummyGenericParamValue) -> Wire:
-        raise InternalGuppyError(
-            "Node should not be emitted when compiling monomorphized functions"
-        )
+        # These nodes only show up when compiling a polymorphic function with nat
+        # parameters, see `guppylang_internals.monomorphization`
+        if node.var.ty != NumericType(NumericType.Kind.Nat):
+            raise InternalGuppyError(
+                "Node should not be emitted when compiling monomorphized functions"
+            )
+        usize = self.builder.add_op(load_nat(ConstArg(node.var).to_hugr(self.ctx)))
+        return self.builder.add_op(convert_ifromusize(), usize)
 
     def visit_Name(self, node: ast.Name) -> Wire:
         raise InternalGuppyError("Node should have been removed during type checking.")
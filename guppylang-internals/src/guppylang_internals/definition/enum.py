@@ -35,7 +35,7 @@ from guppylang_internals.definition.util import (
     parse_py_class,
 )
 from guppylang_internals.diagnostic import Error, Help
-from guppylang_internals.engine import DEF_STORE
+from guppylang_internals.engine import DEF_STORE, ENGINE
 from guppylang_internals.error import GuppyError, InternalGuppyError
 from guppylang_internals.span import SourceMap
 from guppylang_internals.tys.arg import Argument
@@ -239,7 +239,7 @@ class ParsedEnumDef(TypeDef, CheckableDef):
         """Checks if the enum can be instantiated with the given arguments."""
         check_all_args(self.params, args, self.name, loc)
 
-        globals = Globals(DEF_STORE.frames[self.id])
+        globals = ENGINE.get_globals(self.id)
         # TODO: This is quite bad: If we have a cyclic definition this will not
         #  terminate, so we have to check for cycles in every call to `check`. The
         #  proper way to deal with this is changing `EnumType` such that it only
@@ -1,11 +1,12 @@
 import ast
 import inspect
 from collections.abc import Callable, Sequence
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, Any
 
 import hugr.build.function as hf
 from hugr import Node, Wire
+from hugr import tys as ht
 from hugr.build.dfg import DefinitionBuilder, OpVar
 from hugr.debug_info import DISubprogram
 from hugr.hugr.node_port import ToNode
@@ -18,11 +19,13 @@ from guppylang_internals.ast_util import (
     with_loc,
     with_type,
 )
+from guppylang_internals.cfg.cfg import CFG
 from guppylang_internals.checker.cfg_checker import CheckedCFG
 from guppylang_internals.checker.core import Context, Globals, Place
 from guppylang_internals.checker.errors.generic import ExpectedError
 from guppylang_internals.checker.expr_checker import check_call, synthesize_call
 from guppylang_internals.checker.func_checker import (
+    build_global_func_cfg,
     check_global_func_def,
     check_signature,
     parse_function_with_docstring,
@@ -51,12 +54,24 @@ from guppylang_internals.definition.value import (
 from guppylang_internals.engine import DEF_STORE, ENGINE
 from guppylang_internals.error import GuppyError
 from guppylang_internals.metadata.common import FunctionMetadata, add_metadata
-from guppylang_internals.nodes import GlobalCall
+from guppylang_internals.nodes import (
+    CheckedModifiedBlock,
+    CheckedNestedFunctionDef,
+    GlobalCall,
+)
 from guppylang_internals.span import SourceMap, to_span
 from guppylang_internals.tys.arg import ConstArg, TypeArg
 from guppylang_internals.tys.const import ConstValue
+from guppylang_internals.tys.param import ConstParam
 from guppylang_internals.tys.subst import Inst, Subst
-from guppylang_internals.tys.ty import FunctionType, Type, UnitaryFlags, type_to_row
+from guppylang_internals.tys.ty import (
+    FunctionType,
+    NoneType,
+    NumericType,
+    Type,
+    UnitaryFlags,
+    type_to_row,
+)
 
 if TYPE_CHECKING:
     from guppylang_internals.definition.declaration import RawFunctionDecl
@@ -163,16 +178,57 @@ class ParsedFunctionDef(CheckableGenericDef, CallableDef):
 
     metadata: FunctionMetadata | None = field(default=None, kw_only=True)
 
+    #: CFGs of the function body that are shared between monomorphizations, indexed by
+    #: whether the instantiated function returns `None`
+    _cfgs: dict[bool, CFG] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
     @property
     def params(self) -> "Sequence[Parameter]":
         """Generic parameters of this function."""
         return self.ty.params
 
+    @property
+    def nat_generic(self) -> bool:
+        """Whether the function is generic and all of its parameters are `nat`s that
+        are not implicitly introduced by comptime arguments.
+
+        Only these functions may be compiled into polymorphic Hugr functions, see
+        `guppylang_internals.monomorphization`.
+        """
+        return bool(self.params) and all(
+            isinstance(param, ConstParam)
+            and not param.from_comptime_arg
+            and param.ty == NumericType(NumericType.Kind.Nat)
+            for param in self.params
+        )
+
     def check(self, type_args: Inst, globals: Globals) -> "CheckedFunctionDef":
         """Type checks the body of the function."""
-        cfg = check_global_func_def(self.defined_at, self.ty, type_args, globals)
+        ty = self.ty.instantiate(type_args)
+        returns_none = isinstance(ty.output, NoneType)
+        if returns_none not in self._cfgs:
+            self._cfgs[returns_none] = build_global_func_cfg(
+                self.defined_at, ty, globals
+            )
+        cfg = check_global_func_def(
+            self.defined_at, self.ty, type_args, globals, self._cfgs[returns_none]
+        )
         mono_ty = self.ty.instantiate_partial(type_args)
         mono_link_name = monomorphized_link_name(self.link_name, type_args)
+        # If this is the parametric check, the result can be used to compile the
+        # function polymorphically. This is not possible if the body contains nested
+        # functions, since they are compiled into separate Hugr functions that don't
+        # have access to the generic parameters.
+        poly_ty = None
+        if (
+            self.nat_generic
+            and type_args == tuple(param.to_bound() for param in self.params)
+            and not _contains_local_funcs(cfg)
+        ):
+            poly_ty = self.ty
+            mono_link_name = self.link_name
         return CheckedFunctionDef(
             self.id,
             self.name,
@@ -182,6 +238,7 @@ class ParsedFunctionDef(CheckableGenericDef, CallableDef):
             mono_link_name,
             cfg,
             metadata=self.metadata,
+            poly_ty=poly_ty,
         )
 
     def check_call(
@@ -222,10 +279,15 @@ class CheckedFunctionDef(ParsedFunctionDef, CompilableDef):
             other representations, regardless of whether the function is actually
             visible for linking)
         cfg: The type- and linearity-checked CFG for the function body.
+        poly_ty: The generic type of the function if it may be compiled into a
+            polymorphic Hugr function. In that case, `ty` still refers to the generic
+            parameters via bound variables.
     """
 
     cfg: CheckedCFG[Place]
 
+    poly_ty: FunctionType | None = field(default=None, kw_only=True)
+
     def __post_init__(self) -> None:
         # We should be monomorphized at this point
         assert not self.params
@@ -241,7 +303,7 @@ class CheckedFunctionDef(ParsedFunctionDef, CompilableDef):
         nodes for the other compiled functions yet. The body is compiled later in
         `CompiledFunctionDef.compile_inner()`.
         """
-        hugr_ty = self.ty.to_hugr_poly(ctx)
+        hugr_ty = (self.poly_ty or self.ty).to_hugr_poly(ctx)
         func_def = module.module_root_builder().define_function(
             self.link_name,
             hugr_ty.body.input,
@@ -267,6 +329,7 @@ class CheckedFunctionDef(ParsedFunctionDef, CompilableDef):
             self.cfg,
             func_def,
             metadata=self.metadata,
+            poly_ty=self.poly_ty,
         )
 
 
@@ -286,18 +349,40 @@ class CompiledFunctionDef(CheckedFunctionDef, CompiledCallableDef, CompiledHugrN
             visible for linking)
         cfg: The type- and linearity-checked CFG for the function body.
         func_def: The Hugr function definition.
+        type_args: If the function was compiled polymorphically, the instantiation of
+            its generic parameters that is used when calling or loading it.
     """
 
     func_def: hf.Function
 
+    type_args: Inst = field(default=(), kw_only=True)
+
     @property
     def hugr_node(self) -> Node:
         """The Hugr node this definition was compiled into."""
         return self.func_def.parent_node
 
+    def instantiate(self, type_args: Inst) -> "CompiledFunctionDef":
+        """Returns a view of a polymorphically compiled function that is called and
+        loaded at the given instantiation."""
+        assert self.poly_ty is not None
+        return replace(
+            self, ty=self.poly_ty.instantiate(type_args), type_args=type_args
+        )
+
+    def _hugr_instantiation(
+        self, ctx: CompilerContext
+    ) -> tuple[ht.FunctionType | None, list[ht.TypeArg] | None]:
+        """Returns the Hugr instantiation and type args that are needed to call or load
+        the function."""
+        if self.poly_ty is None:
+            return None, None
+        return self.ty.to_hugr(ctx), [arg.to_hugr(ctx) for arg in self.type_args]
+
     def load(self, dfg: DFContainer, ctx: CompilerContext, node: AstNode) -> Wire:
         """Loads the function as a value into a local Hugr dataflow graph."""
-        return load(dfg, self.func_def)
+        instantiation, type_args = self._hugr_instantiation(ctx)
+        return dfg.builder.load_function(self.func_def, instantiation, type_args)
 
     def compile_call(
         self,
@@ -307,7 +392,10 @@ class CompiledFunctionDef(CheckedFunctionDef, CompiledCallableDef, CompiledHugrN
         node: AstNode,
     ) -> CallReturnWires:
         """Compiles a call to the function."""
-        return compile_call(args, dfg, self.ty, self.func_def, node)
+        instantiation, type_args = self._hugr_instantiation(ctx)
+        return compile_call(
+            args, dfg, self.ty, self.func_def, node, instantiation, type_args
+        )
 
     def compile_inner(self, globals: CompilerContext) -> None:
         """Compiles the body of the function."""
@@ -325,11 +413,18 @@ def compile_call(
     ty: FunctionType,
     func: ToNode,
     call_ast: AstNode,
+    instantiation: ht.FunctionType | None = None,
+    type_args: Sequence[ht.TypeArg] | None = None,
 ) -> CallReturnWires:
-    """Compiles a call to the function."""
+    """Compiles a call to the function.
+
+    The `instantiation` and `type_args` must be provided if `func` is polymorphic.
+    """
     num_returns = len(type_to_row(ty.output))
     with dfg.builder.set_ast_context(call_ast):
-        call = dfg.builder.call(func, *args)
+        call = dfg.builder.call(
+            func, *args, instantiation=instantiation, type_args=type_args
+        )
     return CallReturnWires(
         regular_returns=list(call[:num_returns]),
         inout_returns=list(call[num_returns:]),
@@ -370,3 +465,14 @@ def make_subprogram_record(
             line_no=to_span(node).start.line,
             scope_line=to_span(node.body[0]).start.line,
         )
+
+
+def _contains_local_funcs(cfg: CheckedCFG[Place]) -> bool:
+    """Checks if a function body contains nested function definitions or modified
+    blocks, which are compiled into separate Hugr functions."""
+    return any(
+        isinstance(node, CheckedNestedFunctionDef | CheckedModifiedBlock)
+        for bb in cfg.bbs
+        for stmt in bb.statements
+        for node in ast.walk(stmt)
+    )
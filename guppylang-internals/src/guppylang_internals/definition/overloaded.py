@@ -1,19 +1,23 @@
 import ast
 import copy
+from collections.abc import Hashable
 from contextlib import suppress
 from dataclasses import dataclass, field
 from typing import ClassVar, NamedTuple, NoReturn
 
 from hugr import Wire
 
-from guppylang_internals.ast_util import AstNode
+from guppylang_internals.ast_util import AstNode, get_type_opt
 from guppylang_internals.checker.core import Context
-from guppylang_internals.checker.expr_checker import ExprSynthesizer
+from guppylang_internals.checker.expr_checker import ExprChecker, ExprSynthesizer
 from guppylang_internals.compiler.core import CompilerContext, DFContainer
 from guppylang_internals.definition.common import (
     DefId,
 )
-from guppylang_internals.definition.custom import CustomFunctionDef
+from guppylang_internals.definition.custom import (
+    CustomFunctionDef,
+    DefaultCallChecker,
+)
 from guppylang_internals.definition.value import (
     CallableDef,
     CallReturnWires,
@@ -24,7 +28,16 @@ from guppylang_internals.error import GuppyError, InternalGuppyError
 from guppylang_internals.span import Span, to_span
 from guppylang_internals.tys.printing import signature_to_str
 from guppylang_internals.tys.subst import Subst
-from guppylang_internals.tys.ty import FunctionType, Type
+from guppylang_internals.tys.ty import (
+    EnumType,
+    FunctionType,
+    NoneType,
+    NumericType,
+    OpaqueType,
+    StructType,
+    TupleType,
+    Type,
+)
 
 
 class OverloadVariant(NamedTuple):
@@ -96,43 +109,57 @@ class OverloadedFunctionDef(CompiledCallableDef, CallableDef):
     def check_call(
         self, args: list[ast.expr], ty: Type, node: AstNode, ctx: Context
     ) -> tuple[ast.expr, Subst]:
-        available_sigs: list[OverloadVariant] = []
-        for def_id in self.func_ids:
-            defn = ctx.globals[def_id]
-            assert isinstance(defn, CallableDef)
-            has_var_args = isinstance(defn, CustomFunctionDef) and defn.has_var_args
-            available_sigs.append(OverloadVariant(defn.ty, has_var_args))
+        args = _synthesize_args(args, ctx)
+        for defn in self._candidates(args, ctx):
             with suppress(GuppyError):
-                # check_call may modify args and node,
-                # thus we deepcopy them before passing in the function
-                node_copy = copy.deepcopy(node)
-                args_copy = copy.deepcopy(args)
-                return defn.check_call(args_copy, ty, node_copy, ctx)
-        return self._call_error(args, node, ctx, available_sigs, ty)
+                return defn.check_call(_fresh_args(args), ty, copy.copy(node), ctx)
+        return self._call_error(args, node, ctx, ty)
 
     def synthesize_call(
         self, args: list[ast.expr], node: AstNode, ctx: "Context"
     ) -> tuple[ast.expr, Type]:
-        available_sigs: list[OverloadVariant] = []
+        args = _synthesize_args(args, ctx)
+        for defn in self._candidates(args, ctx):
+            with suppress(GuppyError):
+                return defn.synthesize_call(_fresh_args(args), copy.copy(node), ctx)
+        return self._call_error(args, node, ctx)
+
+    def _variants(self, ctx: "Context") -> list[CallableDef]:
+        variants: list[CallableDef] = []
         for def_id in self.func_ids:
             defn = ctx.globals[def_id]
             assert isinstance(defn, CallableDef)
-            has_var_args = isinstance(defn, CustomFunctionDef) and defn.has_var_args
-            available_sigs.append(OverloadVariant(defn.ty, has_var_args))
-            with suppress(GuppyError):
-                # synthesize_call may modify args and node,
-                # thus we deepcopy them before passing in the function
-                node_copy = copy.deepcopy(node)
-                args_copy = copy.deepcopy(args)
-                return defn.synthesize_call(args_copy, node_copy, ctx)
-        return self._call_error(args, node, ctx, available_sigs)
+            variants.append(defn)
+        return variants
+
+    def _candidates(self, args: list[ast.expr], ctx: "Context") -> list[CallableDef]:
+        """Returns the variants that could possibly accept the given arguments, in
+        order of declaration.
+
+        Variants whose calls are checked against their signature can be ruled out
+        without checking the arguments if the number of arguments doesn't match, or if
+        the type of an already typed argument can't be unified with or coerced to the
+        corresponding input type.
+        """
+        return [
+            defn
+            for defn in self._variants(ctx)
+            if not _checks_against_signature(defn)
+            or (
+                len(defn.ty.inputs) == len(args)
+                and all(
+                    _heads_compatible(ty, inp.ty)
+                    for arg, inp in zip(args, defn.ty.inputs, strict=True)
+                    if (ty := get_type_opt(arg)) is not None
+                )
+            )
+        ]
 
     def _call_error(
         self,
         args: list[ast.expr],
         node: AstNode,
         ctx: "Context",
-        available_sigs: list[OverloadVariant],
         return_ty: Type | None = None,
     ) -> NoReturn:
         if args and not return_ty:
@@ -145,6 +172,12 @@ class OverloadedFunctionDef(CompiledCallableDef, CallableDef):
         synth = ExprSynthesizer(ctx)
         arg_tys = [synth.synthesize(arg)[1] for arg in args]
         err = OverloadNoMatchError(span, self.name, arg_tys, return_ty)
+        available_sigs = [
+            OverloadVariant(
+                defn.ty, isinstance(defn, CustomFunctionDef) and defn.has_var_args
+            )
+            for defn in self._variants(ctx)
+        ]
         err.add_sub_diagnostic(AvailableOverloadsHint(None, self.name, available_sigs))
         raise GuppyError(err)
 
@@ -160,3 +193,75 @@ class OverloadedFunctionDef(CompiledCallableDef, CallableDef):
         raise InternalGuppyError(
             "OverloadedFunctionDef.compile_call shouldn't be invoked"
         )
+
+
+def _checks_against_signature(defn: CallableDef) -> bool:
+    """Checks whether calls to a definition are checked by comparing the arguments
+    to its signature.
+
+    Custom functions with their own call checkers or variable arguments may accept
+    arguments that don't match their signature.
+    """
+    if isinstance(defn, CustomFunctionDef):
+        return isinstance(defn.call_checker, DefaultCallChecker) and not (
+            defn.has_var_args
+        )
+    return not isinstance(defn, OverloadedFunctionDef)
+
+
+def _type_head(ty: Type) -> Hashable | None:
+    """Returns the outermost type constructor of a type, or `None` if the type could
+    unify with types with a different constructor.
+
+    Numeric types share a head since they can be implicitly coerced into each other.
+    """
+    match ty:
+        case NumericType():
+            return NumericType
+        case NoneType():
+            return NoneType
+        case TupleType(element_types=elems):
+            return TupleType, len(elems)
+        case OpaqueType(defn=defn) | StructType(defn=defn) | EnumType(defn=defn):
+            return type(ty), defn.id
+        case _:
+            # Variables and function types
+            return None
+
+
+def _heads_compatible(s: Type, t: Type) -> bool:
+    """Checks that two types don't have different outermost type constructors."""
+    s_head, t_head = _type_head(s), _type_head(t)
+    return s_head is None or t_head is None or s_head == t_head
+
+
+def _synthesize_args(args: list[ast.expr], ctx: Context) -> list[ast.expr]:
+    """Synthesizes the types of arguments whose checking doesn't depend on the
+    expected type.
+
+    Checking such an argument against a type synthesizes it and compares the result,
+    so synthesizing it once upfront doesn't change which variant is selected. Typed
+    arguments only need a shallow copy before they are passed to each variant (see
+    `_fresh_args`). Arguments that fail to synthesize are left as they are, leaving
+    the error to be reported by the variants.
+    """
+    synth = ExprSynthesizer(ctx)
+    typed_args = []
+    for arg in args:
+        if get_type_opt(arg) is None and not hasattr(
+            ExprChecker, f"visit_{type(arg).__name__}"
+        ):
+            with suppress(GuppyError):
+                arg, _ = synth.synthesize(arg)
+        typed_args.append(arg)
+    return typed_args
+
+
+def _fresh_args(args: list[ast.expr]) -> list[ast.expr]:
+    """Copies arguments so that checking them against one variant doesn't affect the
+    others.
+
+    Checking leaves untyped arguments unchanged, but may update the annotation of typed
+    arguments in place. For those, it's enough to copy the root node.
+    """
+    return [copy.copy(arg) if get_type_opt(arg) is not None else arg for arg in args]
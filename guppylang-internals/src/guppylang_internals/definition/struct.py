@@ -27,7 +27,7 @@ from guppylang_internals.definition.custom import (
 )
 from guppylang_internals.definition.ty import TypeDef
 from guppylang_internals.diagnostic import Help
-from guppylang_internals.engine import DEF_STORE
+from guppylang_internals.engine import DEF_STORE, ENGINE
 from guppylang_internals.error import GuppyError, InternalGuppyError
 from guppylang_internals.span import SourceMap
 from guppylang_internals.tys.arg import Argument
@@ -181,7 +181,7 @@ class ParsedStructDef(TypeDef, CheckableDef):
         check_all_args(self.params, args, self.name, loc)
         # Obtain a checked version of this struct definition so we can construct a
         # `StructType` instance
-        globals = Globals(DEF_STORE.frames[self.id])
+        globals = ENGINE.get_globals(self.id)
         # TODO: This is quite bad: If we have a cyclic definition this will not
         #  terminate, so we have to check for cycles in every call to `check`. The
         #  proper way to deal with this is changing `StructType` such that it only
@@ -1,10 +1,11 @@
 from collections import defaultdict
-from collections.abc import Sequence
-from contextlib import suppress
-from dataclasses import dataclass
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, replace
 from pathlib import Path
-from types import FrameType
-from typing import ClassVar, cast
+from types import FrameType, ModuleType
+from types import FunctionType as PyFunctionType
+from typing import TYPE_CHECKING, ClassVar, cast
 
 import hugr
 import hugr.build.function as hf
@@ -25,6 +26,7 @@ from guppylang_internals.definition.common import (
     CheckedDef,
     CompiledDef,
     DefId,
+    Definition,
     ParsableDef,
     ParsedDef,
     RawDef,
@@ -44,8 +46,10 @@ from guppylang_internals.error import (
 from guppylang_internals.metadata.debug_info_util import (
     StringTable,
 )
+from guppylang_internals.monomorphization import lazy_monomorphization_enabled
+from guppylang_internals.profiling import count, phase
 from guppylang_internals.span import SourceMap
-from guppylang_internals.tracing.util import get_calling_frame
+from guppylang_internals.tracing.util import get_calling_frame, is_compiler_module_name
 from guppylang_internals.tys.arg import ConstArg, TypeArg
 from guppylang_internals.tys.builtin import (
     array_type_def,
@@ -80,6 +84,9 @@ from guppylang_internals.tys.ty import (
     Type,
 )
 
+if TYPE_CHECKING:
+    from guppylang_internals.checker.core import Globals
+
 BUILTIN_DEFS_LIST: list[RawDef] = [
     callable_type_def,
     self_type_def,
@@ -163,6 +170,55 @@ class DefinitionStore:
 DEF_STORE: DefinitionStore = DefinitionStore()
 
 
+@dataclass(frozen=True)
+class DefFingerprint:
+    """Snapshot of the inputs that went into parsing or checking a definition.
+
+    Records the Python objects that names in the defining scope were bound to when they
+    were looked up. A cached result may be reused as long as all of those names are
+    still bound to the very same objects and none of the objects can have been mutated
+    in-place, see `is_immutable`.
+    """
+
+    captured: Mapping[str, object]
+
+    def is_stale(self, globals: "Globals") -> bool:
+        """Checks whether any of the captured names has been rebound since or refers to
+        an object that might have been mutated."""
+        return any(
+            not is_immutable(value) or globals.resolve(name) is not value
+            for name, value in self.captured.items()
+        )
+
+
+def is_immutable(value: object) -> bool:
+    """Checks whether a Python value captured by a definition is guaranteed to stay the
+    same as long as its name isn't rebound.
+
+    This holds for Guppy definitions, for objects of the Guppy library, and for
+    immutable builtin values. Other modules and objects might be mutated in-place, for
+    example changing the module attribute read by `comptime(mod.VALUE)`.
+    """
+    from guppylang_internals.checker.core import UNBOUND
+    from guppylang_internals.tracing.object import TracingDefMixin
+
+    match value:
+        case _ if value is UNBOUND:
+            return True
+        case Definition() | TracingDefMixin():
+            return True
+        case ModuleType(__name__=name):
+            return is_compiler_module_name(name)
+        case type() | PyFunctionType():
+            return is_compiler_module_name(value.__module__)
+        case tuple() | frozenset():
+            return all(is_immutable(v) for v in value)
+        case None | bool() | int() | float() | complex() | str() | bytes():
+            return True
+        case _:
+            return False
+
+
 @dataclass(frozen=True)
 class MonoArgsNote(Note):
     message: ClassVar[str] = "Error occurred while checking the instantiation {inst}"
@@ -178,6 +234,23 @@ class MonoArgsNote(Note):
         )
 
 
+@dataclass(frozen=True)
+class InstantiationCount:
+    """Number of instantiations that were produced for a generic function."""
+
+    #: Name of the function
+    name: str
+
+    #: Number of concrete instantiations that were type checked
+    checked: int
+
+    #: Number of Hugr functions that were emitted in the last compilation
+    compiled: int
+
+    #: Whether the function was compiled into a polymorphic Hugr function
+    polymorphic: bool
+
+
 class CompilationEngine:
     """Main compiler driver handling checking and compiling of definitions.
 
@@ -199,6 +272,34 @@ class CompilationEngine:
 
     to_compile_worklist: dict[MonoDefId, CheckedDef]
 
+    #: Uses of nat-generic functions whose checking is deferred since the functions
+    #: may be compiled polymorphically. See `guppylang_internals.monomorphization`.
+    deferred_generic_uses: dict[MonoDefId, ParsedDef]
+
+    #: Generic functions that turned out to require monomorphization, even though
+    #: lazy monomorphization is enabled
+    requires_monomorphization: set[DefId]
+
+    #: Dependency graph between cached results, mapping each definition to the
+    #: definitions whose parsing or checking looked it up. Parsing a definition is
+    #: tracked under the `(id, ())` node, which is shared with the checking result for
+    #: non-generic definitions.
+    dependents: defaultdict[MonoDefId, set[MonoDefId]]
+
+    #: Fingerprints of the inputs for all cached parsing and checking results.
+    fingerprints: dict[MonoDefId, DefFingerprint]
+
+    #: Scopes of the definitions that have been parsed or checked. They are shared
+    #: between all monomorphizations of a definition, so that every referenced name
+    #: only needs to be resolved once.
+    scopes: "dict[DefId, Globals]"
+
+    #: Stack of definitions that are currently being parsed or checked.
+    _active: list[MonoDefId]
+
+    #: Value of the experimental features flag when the cache was populated.
+    _experimental_features: bool = False
+
     # Cached compilation infrastructure (lazy-initialized, program-independent)
     _base_resolve_registry: ExtensionRegistry | None = None
 
@@ -234,9 +335,94 @@ class CompilationEngine:
         self.parsed = {}
         self.checked = {}
         self.compiled = {}
+        self.dependents = defaultdict(set)
+        self.fingerprints = {}
+        self.scopes = {}
+        self._active = []
         self.to_check_worklist = {}
         self.generic_to_check_worklist = {}
         self.types_to_check_worklist = {}
+        self.deferred_generic_uses = {}
+        self.requires_monomorphization = set()
+
+    def invalidate_stale(self) -> None:
+        """Discards all cached results whose inputs have changed since they were
+        computed, together with all results that transitively depend on them.
+        """
+        from guppylang_internals import experimental
+        from guppylang_internals.checker.core import Globals
+
+        # Toggling experimental features changes what is accepted by the checker, so
+        # none of the cached results can be trusted anymore
+        if self._experimental_features != experimental.EXPERIMENTAL_FEATURES_ENABLED:
+            self.reset()
+            self._experimental_features = experimental.EXPERIMENTAL_FEATURES_ENABLED
+            return
+
+        scopes: dict[int, Globals] = {}
+        stale = set()
+        for mono_id, fingerprint in self.fingerprints.items():
+            frame = DEF_STORE.frames[mono_id[0]]
+            if id(frame) not in scopes:
+                scopes[id(frame)] = Globals(frame)
+            if fingerprint.is_stale(scopes[id(frame)]):
+                stale.add(mono_id)
+        self.invalidate(stale)
+
+    def invalidate(self, mono_ids: set[MonoDefId]) -> None:
+        """Discards the cached results for the given definitions and everything that
+        transitively depends on them.
+
+        Invalidating the `(id, ())` node also discards the parsed definition and thus
+        all of its monomorphizations.
+        """
+        monos: defaultdict[DefId, list[MonoDefId]] = defaultdict(list)
+        for mono_id in self.checked.keys() | self.dependents.keys():
+            monos[mono_id[0]].append(mono_id)
+        todo = list(mono_ids)
+        seen = set()
+        while todo:
+            mono_id = todo.pop()
+            if mono_id in seen:
+                continue
+            seen.add(mono_id)
+            def_id, mono_args = mono_id
+            if not mono_args:
+                self.parsed.pop(def_id, None)
+                todo.extend(monos[def_id])
+            self.checked.pop(mono_id, None)
+            self.fingerprints.pop(mono_id, None)
+            # Some name that was resolved in the scope of the definition might have been
+            # rebound, so we need to resolve the names again
+            self.scopes.pop(def_id, None)
+            todo.extend(self.dependents.pop(mono_id, ()))
+
+    def _record_dependency(self, mono_id: MonoDefId) -> None:
+        """Records that the definition that is currently being parsed or checked
+        depends on the given definition."""
+        if self._active:
+            self.dependents[mono_id].add(self._active[-1])
+
+    @contextmanager
+    def _track(self, mono_id: MonoDefId, globals: "Globals") -> Iterator[None]:
+        """Tracks the dependencies and captured names while parsing or checking a
+        definition in the scope of the given globals.
+
+        If a Guppy error occurs, we make sure that no results depending on the
+        definition stay cached, so that the error is reported again next time.
+        """
+        self._active.append(mono_id)
+        try:
+            yield
+        except GuppyError:
+            self.invalidate({(mono_id[0], ())})
+            raise
+        finally:
+            self._active.pop()
+        captured = {x: globals.resolve(x) for x in globals.referenced_names}
+        if prev := self.fingerprints.get(mono_id):
+            captured = {**prev.captured, **captured}
+        self.fingerprints[mono_id] = DefFingerprint(captured)
 
     @pretty_errors
     @deprecated(
@@ -247,6 +433,21 @@ class CompilationEngine:
         if extension not in self.additional_extensions:
             self.additional_extensions.append(extension)
 
+    def get_globals(self, id: DefId) -> "Globals":
+        """Returns the globals that are in scope for a definition.
+
+        The same object is returned until the definition is invalidated, so the names
+        resolved while parsing or checking the definition are cached across all of its
+        monomorphizations.
+        """
+        from guppylang_internals.checker.core import Globals
+
+        frame = DEF_STORE.frames[id]
+        scope = self.scopes.get(id)
+        if scope is None or scope.frame is not frame:
+            scope = self.scopes[id] = Globals(frame)
+        return scope
+
     @pretty_errors
     def get_parsed(self, id: DefId) -> ParsedDef:
         """Look up the parsed version of a definition by its id.
@@ -254,13 +455,14 @@ class CompilationEngine:
         Parses the definition if it hasn't been parsed yet. Also makes sure that the
         definition will be checked and compiled later on.
         """
-        from guppylang_internals.checker.core import Globals
-
+        self._record_dependency((id, ()))
         if id in self.parsed:
             return self.parsed[id]
         defn = DEF_STORE.raw_defs[id]
         if isinstance(defn, ParsableDef):
-            defn = defn.parse(Globals(DEF_STORE.frames[defn.id]), DEF_STORE.sources)
+            globals = self.get_globals(defn.id)
+            with self._track((id, ()), globals), phase("parse", (id, ())):
+                defn = defn.parse(globals, DEF_STORE.sources)
 
         self.parsed[id] = defn
         if isinstance(defn, TypeDef):
@@ -282,16 +484,22 @@ class CompilationEngine:
         Parses and checks the definition if it hasn't been parsed/checked yet. Also
         makes sure that the definition will be compiled to Hugr later on.
         """
-        from guppylang_internals.checker.core import Globals
-
+        self._record_dependency((id, mono_args))
         if (id, mono_args) in self.checked:
             return self.checked[id, mono_args]
         defn = self.get_parsed(id)
         if isinstance(defn, CheckableDef):
-            defn = defn.check(Globals(DEF_STORE.frames[defn.id]))
+            globals = self.get_globals(defn.id)
+            with self._track((id, mono_args), globals), phase("check", (id, mono_args)):
+                defn = defn.check(globals)
         elif isinstance(defn, CheckableGenericDef):
+            globals = self.get_globals(defn.id)
             try:
-                checked_defn = defn.check(mono_args, Globals(DEF_STORE.frames[defn.id]))
+                with (
+                    self._track((id, mono_args), globals),
+                    phase("check", (id, mono_args)),
+                ):
+                    checked_defn = defn.check(mono_args, globals)
             except GuppyError as err:
                 # If this is an error arising from the initial parametric check where
                 # parameters are treated as opaque values, then we can just report the
@@ -326,7 +534,80 @@ class CompilationEngine:
         for arg in type_args:
             arg.visit(finder)
         if not finder.bound_vars:
-            self.to_check_worklist[defn.id, type_args] = defn
+            self._record_dependency((defn.id, type_args))
+            if self._may_compile_polymorphically(defn):
+                # Until we know whether the function needs to be monomorphized, the
+                # instantiation is represented by the parametric check
+                poly_args = tuple(param.to_bound() for param in defn.params)
+                self.dependents[defn.id, poly_args].add((defn.id, type_args))
+                self.deferred_generic_uses[defn.id, type_args] = defn
+            else:
+                self.to_check_worklist[defn.id, type_args] = defn
+
+    def _may_compile_polymorphically(self, defn: ParsedDef) -> bool:
+        """Checks if a definition is a candidate for being compiled into a polymorphic
+        Hugr function instead of being monomorphized."""
+        from guppylang_internals.definition.function import ParsedFunctionDef
+
+        return (
+            lazy_monomorphization_enabled()
+            and isinstance(defn, ParsedFunctionDef)
+            and defn.nat_generic
+            and defn.id not in self.requires_monomorphization
+        )
+
+    def polymorphic_args(self, id: DefId) -> Inst | None:
+        """Returns the instantiation of a generic function with its own parameters if
+        the function is compiled into a single polymorphic Hugr function.
+
+        Returns `None` if lazy monomorphization is disabled or if the function needs to
+        be monomorphized.
+        """
+        from guppylang_internals.definition.function import CheckedFunctionDef
+
+        defn = self.get_parsed(id)
+        if not self._may_compile_polymorphically(defn):
+            return None
+        assert isinstance(defn, CheckableGenericDef)
+        poly_args = tuple(param.to_bound() for param in defn.params)
+        try:
+            checked = self.get_checked(id, poly_args)
+        except RequiresMonomorphizationError:
+            checked = None
+        if isinstance(checked, CheckedFunctionDef) and checked.poly_ty is not None:
+            return poly_args
+        self.requires_monomorphization.add(id)
+        return None
+
+    def instantiation_report(self) -> dict[DefId, InstantiationCount]:
+        """Reports how many instantiations were produced for each generic function.
+
+        Covers the definitions and declarations of generic functions that were checked
+        or compiled since the last reset.
+        """
+        from guppylang_internals.definition.declaration import ParsedFunctionDecl
+        from guppylang_internals.definition.function import ParsedFunctionDef
+
+        report: dict[DefId, InstantiationCount] = {}
+        for mono_ids, is_compiled in ((self.checked, False), (self.compiled, True)):
+            for def_id, mono_args in mono_ids:
+                defn = self.parsed.get(def_id)
+                if not mono_args or not isinstance(
+                    defn, ParsedFunctionDef | ParsedFunctionDecl
+                ):
+                    continue
+                stats = report.get(def_id, InstantiationCount(defn.name, 0, 0, False))
+                is_poly = any(arg.bound_vars for arg in mono_args)
+                if is_compiled:
+                    stats = replace(
+                        stats,
+                        compiled=stats.compiled + 1,
+                        polymorphic=stats.polymorphic or is_poly,
+                    )
+                elif not is_poly:
+                    stats = replace(stats, checked=stats.checked + 1)
+                report[def_id] = stats
+        return report
 
     def get_instance_func(self, ty: Type | TypeDef, name: str) -> CallableDef | None:
         """Looks up an instance function with a given name for a type.
@@ -384,16 +665,23 @@ class CompilationEngine:
         self.check([id])
 
     @pretty_errors
+    @phase("check_all")
     def check(self, def_ids: list[DefId], *, reset: bool = True) -> None:
         """Top-level function to kick of checking of multiple definitions.
 
         This is the main driver behind `guppy.library(...).check()`.
+
+        Results from previous calls are reused unless their inputs have changed. If
+        `reset` is set to `False`, we skip looking for changed inputs and continue with
+        the state left behind by the previous call.
         """
-        # Clear previous compilation cache.
-        # TODO: In order to maintain results from the previous `check` call we would
-        #  need to store and check if any dependencies have changed.
         if reset:
-            self.reset()
+            self.to_check_worklist = {}
+            self.generic_to_check_worklist = {}
+            self.types_to_check_worklist = {}
+            self.deferred_generic_uses = {}
+            with phase("invalidate_stale"):
+                self.invalidate_stale()
 
         for def_id in def_ids:
             entry_defn = self.get_parsed(def_id)
@@ -405,6 +693,7 @@ class CompilationEngine:
             self.types_to_check_worklist
             or self.generic_to_check_worklist
             or self.to_check_worklist
+            or self.deferred_generic_uses
         ):
             # Types need to be checked first. This is because parsing e.g. a function
             # definition requires instantiating the types in its signature which can
@@ -425,9 +714,16 @@ class CompilationEngine:
                 # we just gve up and wait for the proper monomorphic check later.
                 with suppress(RequiresMonomorphizationError):
                     self.checked[id, mono_args] = self.get_checked(id, mono_args)
-            else:
+            elif self.to_check_worklist:
                 (id, mono_args), _ = self.to_check_worklist.popitem()
                 self.checked[id, mono_args] = self.get_checked(id, mono_args)
+            # At this point, all parametric checks are done, so we know which of the
+            # deferred uses belong to functions that need to be monomorphized after all
+            else:
+                uses, self.deferred_generic_uses = self.deferred_generic_uses, {}
+                for (id, mono_args), defn in uses.items():
+                    if self.polymorphic_args(id) is None:
+                        self.to_check_worklist[id, mono_args] = defn
 
     @pretty_errors
     def compile_single(self, id: DefId) -> ModulePointer:
@@ -435,18 +731,7 @@ class CompilationEngine:
 
         This is the function that is invoked by e.g. `<guppy-definition>.compile`.
         """
-        pointer, [compiled_def] = self._compile([id])
-
-        if (
-            isinstance(compiled_def, CompiledHugrNodeDef)
-            and isinstance(compiled_def, CompiledCallableDef)
-            and not isinstance(pointer.module[compiled_def.hugr_node].op, ops.FuncDecl)
-        ):
-            # if compiling a region set it as the HUGR entrypoint can be
-            # loosened after https://github.com/quantinuum/hugr/issues/2501 is fixed
-            pointer.module.entrypoint = compiled_def.hugr_node
-
-        return pointer
+        return self._compile([id], set_entrypoint=True)
 
     @pretty_errors
     def compile(self, def_ids: list[DefId], *, reset: bool = True) -> ModulePointer:
@@ -455,13 +740,55 @@ class CompilationEngine:
 
         This is the function that is invoked by e.g. `<guppy-library>.compile`.
         """
-        return self._compile(def_ids, reset=reset)[0]
+        return self._compile(def_ids, reset=reset)
 
     def _compile(
-        self, def_ids: list[DefId], *, reset: bool = True
-    ) -> tuple[ModulePointer, list[CompiledDef]]:
+        self, def_ids: list[DefId], *, reset: bool = True, set_entrypoint: bool = False
+    ) -> ModulePointer:
+        from guppylang_internals import compile_cache
+
         self.check(def_ids, reset=reset)
 
+        cache_key = compile_cache.package_cache_key(
+            self, def_ids, self.additional_extensions
+        )
+        if cache_key is not None and (pointer := compile_cache.load_package(cache_key)):
+            self.compiled = {}
+            count("compile_cache_hits")
+            return pointer
+
+        with phase("compile_all"):
+            while True:
+                try:
+                    pointer, requested_defs = self._build_module(def_ids)
+                    break
+                except RequiresMonomorphizationError:
+                    # A function that we tried to compile polymorphically needs to be
+                    # monomorphized after all. It has been added to
+                    # `requires_monomorphization`, so we just start over.
+                    count("lazy_monomorphization_restarts")
+        if set_entrypoint:
+            [compiled_def] = requested_defs
+            if (
+                isinstance(compiled_def, CompiledHugrNodeDef)
+                and isinstance(compiled_def, CompiledCallableDef)
+                and not isinstance(
+                    pointer.module[compiled_def.hugr_node].op, ops.FuncDecl
+                )
+            ):
+                # if compiling a region set it as the HUGR entrypoint can be
+                # loosened after https://github.com/quantinuum/hugr/issues/2501 is fixed
+                pointer.module.entrypoint = compiled_def.hugr_node
+
+        if cache_key is not None:
+            compile_cache.store_package(cache_key, pointer)
+        return pointer
+
+    def _build_module(
+        self, def_ids: list[DefId]
+    ) -> tuple[ModulePointer, list[CompiledDef]]:
+        """Lowers the given definitions and all of their dependencies into a new Hugr
+        module."""
         # Prepare Hugr for this module
         graph = hf.Module()
         graph.metadata["name"] = "__main__"  # entrypoint metadata
@@ -504,9 +831,10 @@ class CompilationEngine:
             resolve_registry = self._get_base_resolve_registry()
 
         # Compute used extensions dynamically from the HUGR.
-        used_extensions_result = graph.hugr.used_extensions(
-            resolve_from=resolve_registry
-        )
+        with phase("used_extensions"):
+            used_extensions_result = graph.hugr.used_extensions(
+                resolve_from=resolve_registry
+            )
 
         # Set metadata for used extensions
         used_exts_meta = [
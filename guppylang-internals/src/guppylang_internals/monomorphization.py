@@ -0,0 +1,69 @@
+"""Global state for determining whether nat-generic functions are monomorphized
+lazily.
+
+By default, every instantiation of a generic function is checked and compiled into a
+separate Hugr function. With lazy monomorphization, functions whose generic parameters
+are all `nat`s are instead compiled once into a polymorphic Hugr function with bounded
+nat type parameters. We only fall back to monomorphization for functions where this is
+not possible, for example because they evaluate their parameters at compile time or call
+other functions that need to be monomorphized.
+
+Note that not all backends accept polymorphic Hugr functions, so lazy monomorphization
+is disabled by default.
+"""
+
+from types import TracebackType
+
+LAZY_MONOMORPHIZATION_ENABLED = False
+
+
+class enable_lazy_monomorphization:
+    """Enables lazy monomorphization of nat-generic functions.
+
+    Can be used as a context manager to enable lazy monomorphization in a `with` block.
+    """
+
+    def __init__(self) -> None:
+        global LAZY_MONOMORPHIZATION_ENABLED
+        self.original = LAZY_MONOMORPHIZATION_ENABLED
+        LAZY_MONOMORPHIZATION_ENABLED = True
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        global LAZY_MONOMORPHIZATION_ENABLED
+        LAZY_MONOMORPHIZATION_ENABLED = self.original
+
+
+class disable_lazy_monomorphization:
+    """Disables lazy monomorphization of nat-generic functions.
+
+    Can be used as a context manager to disable lazy monomorphization in a `with` block.
+    """
+
+    def __init__(self) -> None:
+        global LAZY_MONOMORPHIZATION_ENABLED
+        self.original = LAZY_MONOMORPHIZATION_ENABLED
+        LAZY_MONOMORPHIZATION_ENABLED = False
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        global LAZY_MONOMORPHIZATION_ENABLED
+        LAZY_MONOMORPHIZATION_ENABLED = self.original
+
+
+def lazy_monomorphization_enabled() -> bool:
+    return LAZY_MONOMORPHIZATION_ENABLED
@@ -0,0 +1,212 @@
+"""Instrumentation for measuring where time is spent during compilation.
+
+Profiling is disabled by default. It can be enabled for a block of code using the
+`profile` context manager:
+
+    with profile() as prof:
+        main.compile()
+    prof.dump_json("profile.json")
+    prof.dump_chrome_trace("trace.json")
+
+Alternatively, setting the `GUPPYLANG_PROFILE` environment variable to a file path
+profiles all compilations in the process and writes a Chrome trace to that path when
+the interpreter exits. Traces can be inspected with `chrome://tracing` or Perfetto.
+
+The compiler marks interesting regions with the `phase` context manager. For every
+phase, the profile records the number of calls, the inclusive wall time, and the number
+of Hugr nodes added during the phase. The statistics are aggregated both globally and
+per monomorphic definition the phase was attributed to.
+"""
+
+import atexit
+import json
+import os
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from hugr import Hugr
+
+    from guppylang_internals.engine import MonoDefId
+
+
+@dataclass
+class PhaseStats:
+    """Aggregated statistics for a compilation phase."""
+
+    #: Number of times the phase was entered
+    calls: int = 0
+
+    #: Total wall time spent in the phase in seconds, including nested phases
+    time: float = 0.0
+
+    #: Number of Hugr nodes added while in the phase
+    nodes: int = 0
+
+    def to_json(self) -> dict[str, Any]:
+        return {"calls": self.calls, "time": self.time, "nodes": self.nodes}
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    """A single completed phase, recorded for export to the Chrome trace format."""
+
+    name: str
+    #: Start time in seconds relative to the start of the profile
+    start: float
+    duration: float
+    definition: str | None
+
+
+@dataclass
+class CompileProfile:
+    """Timings collected while profiling is enabled."""
+
+    #: Statistics for each phase, aggregated over all definitions
+    phases: defaultdict[str, PhaseStats] = field(
+        default_factory=lambda: defaultdict(PhaseStats)
+    )
+
+    #: Statistics for each phase, broken down by the definition they are attributed to
+    definitions: defaultdict[str, defaultdict[str, PhaseStats]] = field(
+        default_factory=lambda: defaultdict(lambda: defaultdict(PhaseStats))
+    )
+
+    #: Every completed phase in the order they were finished
+    events: list[TraceEvent] = field(default_factory=list)
+
+    #: Counters for things that are not timed, for example cache hits
+    counters: defaultdict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    _origin: float = field(default_factory=time.perf_counter)
+    _def_stack: list[str] = field(default_factory=list)
+
+    def to_json(self) -> dict[str, Any]:
+        """Returns a JSON-serialisable summary of the profile."""
+        return {
+            "phases": {name: s.to_json() for name, s in self.phases.items()},
+            "definitions": {
+                defn: {name: s.to_json() for name, s in phases.items()}
+                for defn, phases in self.definitions.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Returns the profile in the Chrome trace event format."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": event.name,
+                "cat": "guppy",
+                "ph": "X",
+                "ts": event.start * 1e6,
+                "dur": event.duration * 1e6,
+                "pid": pid,
+                "tid": 0,
+                "args": {"definition": event.definition} if event.definition else {},
+            }
+            for event in self.events
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": self.to_json(),
+        }
+
+    def dump_json(self, path: str | os.PathLike[str]) -> None:
+        """Writes the summary of the profile to a JSON file."""
+        Path(path).write_text(json.dumps(self.to_json(), indent=2))
+
+    def dump_chrome_trace(self, path: str | os.PathLike[str]) -> None:
+        """Writes the profile to a file in the Chrome trace event format."""
+        Path(path).write_text(json.dumps(self.to_chrome_trace()))
+
+
+_ACTIVE_PROFILE: CompileProfile | None = None
+
+
+def active_profile() -> CompileProfile | None:
+    """Returns the profile that is currently being recorded, if any."""
+    return _ACTIVE_PROFILE
+
+
+@contextmanager
+def profile() -> Iterator[CompileProfile]:
+    """Records a profile of all compilations that happen inside a `with` block."""
+    global _ACTIVE_PROFILE
+    original = _ACTIVE_PROFILE
+    _ACTIVE_PROFILE = prof = CompileProfile()
+    try:
+        yield prof
+    finally:
+        _ACTIVE_PROFILE = original
+
+
+@contextmanager
+def phase(
+    name: str, mono_id: "MonoDefId | None" = None, hugr: "Hugr[Any] | None" = None
+) -> Iterator[None]:
+    """Marks a phase of the compiler that should show up in the profile.
+
+    If `mono_id` is given, the phase and all phases nested inside it are attributed to
+    that definition. Otherwise, the phase is attributed to the innermost enclosing
+    definition. If `hugr` is given, the number of nodes added to it are recorded.
+
+    Does nothing if profiling is disabled.
+    """
+    prof = _ACTIVE_PROFILE
+    if prof is None:
+        yield
+        return
+    if mono_id is not None:
+        prof._def_stack.append(_mono_id_label(mono_id))
+    definition = prof._def_stack[-1] if prof._def_stack else None
+    num_nodes = hugr.num_nodes() if hugr is not None else 0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        added_nodes = hugr.num_nodes() - num_nodes if hugr is not None else 0
+        if mono_id is not None:
+            prof._def_stack.pop()
+        stats = [prof.phases[name]]
+        if definition is not None:
+            stats.append(prof.definitions[definition][name])
+        for s in stats:
+            s.calls += 1
+            s.time += duration
+            s.nodes += added_nodes
+        prof.events.append(TraceEvent(name, start - prof._origin, duration, definition))
+
+
+def count(name: str, n: int = 1) -> None:
+    """Increments a counter in the active profile, if profiling is enabled."""
+    if _ACTIVE_PROFILE is not None:
+        _ACTIVE_PROFILE.counters[name] += n
+
+
+def _mono_id_label(mono_id: "MonoDefId") -> str:
+    """Returns a human-readable label for a monomorphic definition."""
+    from guppylang_internals.engine import DEF_STORE
+    from guppylang_internals.tys.printing import TypePrinter
+
+    def_id, mono_args = mono_id
+    defn = DEF_STORE.raw_defs.get(def_id)
+    name = defn.name if defn else str(def_id)
+    label = f"{name}#{def_id.id}"
+    if mono_args:
+        printer = TypePrinter()
+        label += f"[{', '.join(printer.visit(arg) for arg in mono_args)}]"
+    return label
+
+
+if "GUPPYLANG_PROFILE" in os.environ:
+    _ACTIVE_PROFILE = CompileProfile()
+    atexit.register(_ACTIVE_PROFILE.dump_chrome_trace, os.environ["GUPPYLANG_PROFILE"])
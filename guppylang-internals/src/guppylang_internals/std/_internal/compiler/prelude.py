@@ -75,6 +75,13 @@ def panic(
     return ops.ExtOp(op_def, sig, args)
 
 
+def load_nat(arg: ht.TypeArg) -> ops.ExtOp:
+    """Returns an operation that loads a bounded nat type argument as a `usize`."""
+    op_def = hugr.std.PRELUDE.get_op("load_nat")
+    sig = ht.FunctionType([], [ht.USize()])
+    return ops.ExtOp(op_def, sig, [arg])
+
+
 def make_error() -> ops.ExtOp:
     """Returns an operation that makes an error."""
     op_def = hugr.std.PRELUDE.get_op("MakeError")
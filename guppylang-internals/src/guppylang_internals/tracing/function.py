@@ -1,4 +1,4 @@
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, ClassVar
 
@@ -10,7 +10,6 @@ from guppylang_internals.cfg.builder import tmp_vars
 from guppylang_internals.checker.core import (
     ComptimeVariable,
     Context,
-    Globals,
     Locals,
     Variable,
 )
@@ -20,9 +19,10 @@ from guppylang_internals.compiler.core import CompilerContext, DFContainer
 from guppylang_internals.compiler.expr_compiler import ExprCompiler
 from guppylang_internals.definition.value import CallableDef
 from guppylang_internals.diagnostic import Error
-from guppylang_internals.engine import DEF_STORE
+from guppylang_internals.engine import ENGINE
 from guppylang_internals.error import GuppyComptimeError, GuppyError, exception_hook
 from guppylang_internals.nodes import PlaceNode
+from guppylang_internals.profiling import count
 from guppylang_internals.tracing.builtins_mock import mock_builtins
 from guppylang_internals.tracing.object import GuppyObject
 from guppylang_internals.tracing.state import (
@@ -161,35 +161,52 @@ def trace_call(func: CallableDef, *args: Any) -> Any:
     state = get_tracing_state()
 
     with capture_guppy_errors():
-        # Try to turn args into `GuppyObjects`
+        # Try to turn args into `GuppyObjects`. Most arguments already are, so we can
+        # skip the conversion for them.
         args_objs = [
-            guppy_object_from_py(
+            arg
+            if isinstance(arg, GuppyObject)
+            else guppy_object_from_py(
                 arg, state.dfg.builder.raw_builder, state.node, state.ctx
             )
             for arg in args
         ]
 
-        # Create dummy variables and bind the objects to them
-        arg_vars: list[Variable] = [
-            ComptimeVariable(next(tmp_vars), obj._ty, None, static_value=arg)
-            for (obj, arg) in zip(args_objs, args, strict=True)
-        ]
-        locals = Locals({var.name: var for var in arg_vars})
-        for obj, var in zip(args_objs, arg_vars, strict=True):
-            state.dfg[var] = obj._use_wire(func)
+        # Calls with the same argument types yield the same checked call, so we only
+        # need to type check them once
+        cache_key = _call_cache_key(func, args, args_objs)
+        arg_vars: list[Variable]
+        if cache_key is not None and cache_key in state.call_cache:
+            count("trace_call_cache_hits")
+            arg_vars, call_node, ret_ty = state.call_cache[cache_key]
+            for obj, var in zip(args_objs, arg_vars, strict=True):
+                state.dfg[var] = obj._use_wire(func)
+        else:
+            # Create dummy variables and bind the objects to them
+            arg_vars = [
+                ComptimeVariable(_arg_var_name(i), obj._ty, None, static_value=arg)
+                for i, (obj, arg) in enumerate(zip(args_objs, args, strict=True))
+            ]
+            locals = Locals({var.name: var for var in arg_vars})
+            for obj, var in zip(args_objs, arg_vars, strict=True):
+                state.dfg[var] = obj._use_wire(func)
 
-        # Check call
-        arg_exprs: list[ast.expr] = [
-            with_loc(state.node, with_type(var.ty, PlaceNode(var))) for var in arg_vars
-        ]
-        ctx = Context(Globals(DEF_STORE.frames[func.id]), locals, {})
-        call_node, ret_ty = func.synthesize_call(arg_exprs, state.node, ctx)
+            # Check call
+            arg_exprs: list[ast.expr] = [
+                with_loc(state.node, with_type(var.ty, PlaceNode(var)))
+                for var in arg_vars
+            ]
+            ctx = Context(ENGINE.get_globals(func.id), locals, {})
+            call_node, ret_ty = func.synthesize_call(arg_exprs, state.node, ctx)
 
-        # Here we check if unitary constraints are respected by the caller
-        unitary_flag = state.function_definition.unitary_flags
-        if unitary_flag != UnitaryFlags.NoFlags:
-            unitary_checker = BBUnitaryChecker()
-            unitary_checker.check([call_node], unitary_flag)
+            # Here we check if unitary constraints are respected by the caller
+            unitary_flag = state.function_definition.unitary_flags
+            if unitary_flag != UnitaryFlags.NoFlags:
+                unitary_checker = BBUnitaryChecker()
+                unitary_checker.check([call_node], unitary_flag)
+
+            if cache_key is not None:
+                state.call_cache[cache_key] = (arg_vars, call_node, ret_ty)
 
     # Compile call
     ret_wire = ExprCompiler(state.ctx).compile(call_node, state.dfg)
@@ -218,3 +235,38 @@ def trace_call(func: CallableDef, *args: Any) -> Any:
 
     ret_obj = GuppyObject(ret_ty, ret_wire)
     return unpack_guppy_object(ret_obj, state.dfg.builder.raw_builder)
+
+
+#: Names of the dummy variables that `trace_call` binds arguments to. They are only
+#: alive for the duration of a single call, so we can reuse them across calls instead
+#: of drawing fresh names and growing the locals of the traced dataflow graph with
+#: every call.
+_arg_var_names: list[str] = []
+
+
+def _arg_var_name(i: int) -> str:
+    """Returns the name of the dummy variable for the `i`-th argument of a traced
+    call."""
+    while len(_arg_var_names) <= i:
+        _arg_var_names.append(next(tmp_vars))
+    return _arg_var_names[i]
+
+
+def _call_cache_key(
+    func: CallableDef, args: tuple[Any, ...], args_objs: list[GuppyObject]
+) -> Hashable | None:
+    """Returns the key under which the checked call of `func` with the given arguments
+    is cached in the tracing state.
+
+    Returns `None` if the result of checking could depend on more than the argument
+    types. This is the case if arguments are plain Python values whose static value
+    may be inspected by the checker, or if the function takes `@comptime` arguments.
+    """
+    if not all(isinstance(arg, GuppyObject) for arg in args):
+        return None
+    if any(InputFlags.Comptime in inp.flags for inp in func.ty.inputs):
+        return None
+    arg_keys = tuple(obj._ty.intern_key for obj in args_objs)
+    if None in arg_keys:
+        return None
+    return func.id, arg_keys
@@ -0,0 +1,226 @@
+"""Lazy unpacking of arrays with linear elements during tracing.
+
+When a Guppy array crosses into a comptime function, it is turned into a Python list.
+Unpacking the array into individual wires for all elements and packing it up again when
+the list is passed back to Guppy is wasteful for large registers of which only a few
+elements are actually touched. Instead, we keep the array as a single wire and only
+take elements out of it once they are used. If the list is passed back to Guppy
+unchanged, only the elements that were taken out need to be returned to the array.
+"""
+
+from typing import Any, cast
+
+import hugr.std.int
+from hugr import Wire
+from hugr import tys as ht
+from hugr.build.dfg import DfBase
+
+from guppylang_internals.compiler.core import DFBuilder
+from guppylang_internals.definition.value import CallableDef
+from guppylang_internals.std._internal.compiler.arithmetic import convert_itousize
+from guppylang_internals.std._internal.compiler.array import (
+    barray_borrow,
+    barray_discard_all_borrowed,
+    barray_new_all_borrowed,
+    barray_return,
+    unpack_array,
+)
+from guppylang_internals.tracing.frozenlist import frozenlist
+from guppylang_internals.tracing.object import GuppyObject
+from guppylang_internals.tracing.state import get_tracing_state
+from guppylang_internals.tys.ty import NumericType, OpaqueType, Type
+
+
+class ArrayBuffer:
+    """Backing store for a Python list obtained from a Guppy array during tracing.
+
+    Elements stay inside the array until they are used for the first time.
+    """
+
+    #: The type of the array
+    ty: OpaqueType
+
+    #: The Python objects for the elements of the array
+    elems: "list[LazyArrayElement]"
+
+    #: The wire holding the array, or `None` if it's not available. This happens if all
+    #: elements have been taken out or the array has been handed back to Guppy.
+    wire: Wire | None
+
+    #: Indices of the elements that are still stored inside the array
+    inside: set[int]
+
+    #: Whether elements are still tied to the array. Otherwise, all elements are backed
+    #: by their own wires.
+    attached: bool
+
+    #: Whether the array has been handed back to Guppy as a whole via `repack`
+    repacked: bool
+
+    #: Whether the list has been iterated over. This hints that all elements will be
+    #: used, so it's cheaper to unpack the whole array at once.
+    bulk: bool
+
+    def __init__(
+        self,
+        ty: OpaqueType,
+        elem_ty: Type,
+        length: int,
+        wire: Wire,
+        builder: DfBase[Any],
+    ) -> None:
+        self.ty = ty
+        self.builder = builder
+        self.hugr_elem_ty = elem_ty.to_hugr(get_tracing_state().ctx)
+        self.hugr_length = ht.BoundedNatArg(n=length)
+        self.wire = wire
+        self.inside = set(range(length))
+        self.attached = True
+        self.repacked = False
+        self.bulk = False
+        self.elems = [LazyArrayElement(elem_ty, self, i) for i in range(length)]
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "ArrayBuffer":
+        # Dummy deepcopy implementation, we do not want to actually deepcopy
+        return self
+
+    def is_intact(self, vs: list[Any]) -> bool:
+        """Checks whether a list still contains exactly the elements of this array."""
+        # Use the list iterator directly to avoid triggering the bulk hint
+        return len(vs) == len(self.elems) and all(
+            v is elem for v, elem in zip(list.__iter__(vs), self.elems, strict=True)
+        )
+
+    def take(self, idx: int) -> Wire:
+        """Takes the element with the given index out of the array."""
+        assert idx in self.inside
+        if self.bulk and len(self.inside) == len(self.elems):
+            self.unpack()
+            return self.elems[idx]._wire
+        assert self.wire is not None
+        self.wire, elem = self.builder.add_op(
+            barray_borrow(self.hugr_elem_ty, self.hugr_length),
+            self.wire,
+            self._load_index(idx),
+        )
+        self.inside.remove(idx)
+        if not self.inside:
+            self.builder.add_op(
+                barray_discard_all_borrowed(self.hugr_elem_ty, self.hugr_length),
+                self.wire,
+            )
+            self.wire = None
+        return elem
+
+    def unpack(self) -> None:
+        """Detaches all elements from the array by giving each of them its own wire."""
+        if not self.attached:
+            return
+        if len(self.inside) == len(self.elems):
+            assert self.wire is not None
+            wires = unpack_array(DFBuilder(self.builder), self.wire)
+            for elem, wire in zip(self.elems, wires, strict=True):
+                elem._wire = wire
+        else:
+            self.bulk = False
+            for idx in sorted(self.inside):
+                self.elems[idx]._wire = self.take(idx)
+        self.wire = None
+        self.inside = set()
+        self.attached = False
+
+    def repack(self) -> Wire:
+        """Hands the array back to Guppy after returning all elements that have been
+        taken out of it.
+
+        Only valid if the corresponding list is intact.
+        """
+        assert self.attached
+        wire = self.wire
+        if wire is None:
+            wire = self.builder.add_op(
+                barray_new_all_borrowed(self.hugr_elem_ty, self.hugr_length)
+            )
+        for idx, elem in enumerate(self.elems):
+            if idx in self.inside:
+                elem._mark_used(None)
+            else:
+                elem_wire = elem._use_wire(None)
+                wire = self.builder.add_op(
+                    barray_return(self.hugr_elem_ty, self.hugr_length),
+                    wire,
+                    self._load_index(idx),
+                    elem_wire,
+                )
+        self.wire = None
+        self.inside = set()
+        self.attached = False
+        self.repacked = True
+        return wire
+
+    def reattach(self, wire: Wire) -> None:
+        """Puts all elements back into the array after it has been returned from a
+        borrowing call."""
+        assert self.repacked
+        self.wire = wire
+        self.inside = set(range(len(self.elems)))
+        self.attached = True
+        self.repacked = False
+        self.bulk = False
+        state = get_tracing_state()
+        for elem in self.elems:
+            if not elem._ty.droppable and elem._used:
+                state.unused_undroppable_objs[elem._id] = elem
+            elem._used = None
+
+    def _load_index(self, idx: int) -> Wire:
+        """Loads an array index as a `usize` constant."""
+        int_val = hugr.std.int.IntVal(idx, width=NumericType.INT_WIDTH)
+        return self.builder.add_op(convert_itousize(), self.builder.load(int_val))
+
+
+class LazyArrayElement(GuppyObject):
+    """An element of an `ArrayBuffer` that is only taken out of the array once it is
+    used."""
+
+    __slots__ = ("_buffer", "_index")
+
+    #: The array this element belongs to
+    _buffer: ArrayBuffer
+
+    #: The index of this element in the array
+    _index: int
+
+    def __init__(self, ty: Type, buffer: ArrayBuffer, index: int) -> None:
+        # The element doesn't have its own wire until it's taken out of the array
+        super().__init__(ty, cast("Wire", None))
+        self._buffer = buffer
+        self._index = index
+
+    def _use_wire(self, called_func: CallableDef | None) -> Wire:
+        self._mark_used(called_func)
+        if self._index in self._buffer.inside:
+            self._wire = self._buffer.take(self._index)
+        return self._wire
+
+
+class lazyarraylist(list):  # type: ignore[type-arg]
+    """A Python list holding the elements of an `ArrayBuffer`."""
+
+    _buffer: ArrayBuffer
+
+    def __init__(self, buffer: ArrayBuffer) -> None:
+        super().__init__(buffer.elems)
+        self._buffer = buffer
+
+    def __iter__(self) -> Any:
+        self._buffer.bulk = True
+        return super().__iter__()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "lazyarraylist":
+        # Dummy deepcopy implementation, we do not want to actually deepcopy
+        return self
+
+
+class frozenlazyarraylist(lazyarraylist, frozenlist):
+    """An immutable `lazyarraylist`."""
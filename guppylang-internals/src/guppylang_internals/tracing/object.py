@@ -129,6 +129,8 @@ class DunderMixin:
     delegating to the objects impls.
     """
 
+    __slots__ = ()
+
     def _get_method(self, name: str) -> Any:
         from guppylang_internals.tracing.state import get_tracing_state
         from guppylang_internals.tracing.unpacking import guppy_object_from_py
@@ -310,7 +312,7 @@ class ObjectUse(NamedTuple):
     called_func: CallableDef | None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GuppyObjectId:
     """Unique id for abstract GuppyObjects allocated during tracing."""
 
@@ -329,6 +331,10 @@ class GuppyObject(DunderMixin):
     They correspond to a single Hugr wire within the current dataflow graph.
     """
 
+    # Large comptime functions allocate one of these for every intermediate value, so
+    # we avoid the overhead of a per-instance `__dict__`
+    __slots__ = ("_id", "_ty", "_used", "_wire")
+
     #: The type of this object
     _ty: Type
 
@@ -396,6 +402,14 @@ class GuppyObject(DunderMixin):
         )
 
     def _use_wire(self, called_func: CallableDef | None) -> Wire:
+        self._mark_used(called_func)
+        return self._wire
+
+    def _mark_used(self, called_func: CallableDef | None) -> None:
+        """Records a use of this object.
+
+        Panics if the object is non-copyable and has already been used.
+        """
         # Panic if the value has already been used
         if self._used and not self._ty.copyable:
             use = self._used
@@ -419,7 +433,6 @@ class GuppyObject(DunderMixin):
             if not self._ty.droppable:
                 state = get_tracing_state()
                 state.unused_undroppable_objs.pop(self._id)
-        return self._wire
 
 
 class GuppyStructObject(DunderMixin):
@@ -1,4 +1,4 @@
-from collections.abc import Iterator
+from collections.abc import Hashable, Iterator
 from contextlib import contextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass, field
@@ -10,7 +10,11 @@ from guppylang_internals.definition.traced import CompiledTracedFunctionDef
 from guppylang_internals.error import InternalGuppyError
 
 if TYPE_CHECKING:
+    import ast
+
+    from guppylang_internals.checker.core import Variable
     from guppylang_internals.tracing.object import GuppyObject, GuppyObjectId
+    from guppylang_internals.tys.ty import Type
 
 
 @dataclass
@@ -35,6 +39,13 @@ class TracingState:
         default_factory=dict
     )
 
+    #: Cache of type checked calls to Guppy functions, indexed by the called function
+    #: and the argument types. Stores the dummy argument variables, the checked call
+    #: node, and the return type so that repeated calls only need to be compiled.
+    call_cache: "dict[Hashable, tuple[list[Variable], ast.expr, Type]]" = field(
+        default_factory=dict
+    )
+
 
 _STATE: ContextVar[TracingState | None] = ContextVar("_STATE", default=None)
 
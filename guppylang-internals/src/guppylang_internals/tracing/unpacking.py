@@ -13,6 +13,12 @@ from guppylang_internals.compiler.expr_compiler import python_value_to_hugr
 from guppylang_internals.error import GuppyComptimeError, GuppyError
 from guppylang_internals.std._internal.compiler.array import array_new, unpack_array
 from guppylang_internals.tracing.frozenlist import frozenlist
+from guppylang_internals.tracing.lazyarray import (
+    ArrayBuffer,
+    LazyArrayElement,
+    frozenlazyarraylist,
+    lazyarraylist,
+)
 from guppylang_internals.tracing.object import (
     GuppyEnumObject,
     GuppyObject,
@@ -27,7 +33,14 @@ from guppylang_internals.tys.builtin import (
     is_array_type,
 )
 from guppylang_internals.tys.const import ConstValue
-from guppylang_internals.tys.ty import EnumType, NoneType, StructType, TupleType
+from guppylang_internals.tys.ty import (
+    EnumType,
+    NoneType,
+    OpaqueType,
+    StructType,
+    TupleType,
+    Type,
+)
 
 P = TypeVar("P", bound=ops.DfParentOp)
 
@@ -72,6 +85,12 @@ def unpack_guppy_object(
                     # them as Guppy objects here
                     return obj
                 elem_ty = get_element_type(ty)
+                if _is_lazy_element_type(elem_ty):
+                    assert isinstance(ty, OpaqueType)
+                    buffer = ArrayBuffer(
+                        ty, elem_ty, length.value, obj._use_wire(None), builder
+                    )
+                    return (frozenlazyarraylist if frozen else lazyarraylist)(buffer)
                 elems = unpack_array(DFBuilder(builder), obj._use_wire(None))
                 obj_list = [
                     unpack_guppy_object(GuppyObject(elem_ty, wire), builder, frozen)
@@ -121,6 +140,13 @@ def guppy_object_from_py(
         case GuppyEnumObject(_ty=enum_ty, _wire=wire):
             return GuppyObject(enum_ty, wire)
         case list(vs) if len(vs) > 0:
+            # If the list still holds the elements of a lazily unpacked array, we can
+            # just hand back that array
+            if (buffer := _intact_buffer(vs)) and buffer.attached:
+                return GuppyObject(buffer.ty, buffer.repack())
+            for v in vs:
+                if isinstance(v, LazyArrayElement):
+                    v._buffer.unpack()
             objs = [guppy_object_from_py(v, builder, node, ctx) for v in vs]
             elem_ty = objs[0]._ty
             for i, obj in enumerate(objs[1:]):
@@ -193,6 +219,9 @@ def update_packed_value(v: Any, obj: "GuppyObject", builder: DfBase[P]) -> bool:
                     values[field.name] = obj
         case list(vs) if len(vs) > 0:
             assert is_array_type(obj._ty)
+            if (buffer := _intact_buffer(vs)) and buffer.repacked:
+                buffer.reattach(obj._use_wire(None))
+                return True
             elem_ty = get_element_type(obj._ty)
             wires = unpack_array(DFBuilder(builder), obj._use_wire(None))
             for i, (v, wire) in enumerate(zip(vs, wires, strict=True)):
@@ -202,3 +231,30 @@ def update_packed_value(v: Any, obj: "GuppyObject", builder: DfBase[P]) -> bool:
         case _:
             return False
     return True
+
+
+def _is_lazy_element_type(ty: Type) -> bool:
+    """Checks whether arrays with the given element type should be unpacked lazily.
+
+    We only do this for linear elements that are represented by a plain `GuppyObject`
+    after unpacking. Copyable elements can't be taken out of an array without a runtime
+    bounds check, and affine ones could be silently dropped while still inside the
+    array.
+    """
+    if ty.copyable or ty.droppable:
+        return False
+    match ty:
+        case NoneType() | TupleType() | StructType() | EnumType():
+            return False
+        case ty if is_array_type(ty):
+            return not isinstance(get_array_length(ty), ConstValue)
+    return True
+
+
+def _intact_buffer(vs: list[Any]) -> ArrayBuffer | None:
+    """Returns the `ArrayBuffer` whose elements are exactly the values in the given
+    list, if any."""
+    match vs[0]:
+        case LazyArrayElement(_buffer=buffer) if buffer.is_intact(vs):
+            return buffer
+    return None
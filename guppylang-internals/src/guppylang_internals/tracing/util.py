@@ -82,8 +82,10 @@ def get_calling_frame() -> FrameType | None:
     """Finds the first frame that called this function outside the compiler."""
     frame = inspect.currentframe()
     while frame:
-        module = inspect.getmodule(frame)
-        if module is None or not is_compiler_module(module):
+        # This is called for every use of a Guppy object, so we look up the module name
+        # in the frame globals instead of going through `inspect.getmodule` which scans
+        # `sys.modules` for the source file.
+        if not is_compiler_module_name(frame.f_globals.get("__name__", "")):
             return frame
         frame = frame.f_back
     return None
@@ -102,6 +104,10 @@ def remove_internal_frames(tb: TracebackType | None) -> TracebackType | None:
 
 def is_compiler_module(module: ModuleType) -> bool:
     """Checks whether a given Python module belongs to the Guppy compiler."""
-    return module.__name__.startswith(
-        "guppylang_internals."
-    ) or module.__name__.startswith("guppylang.")
+    return is_compiler_module_name(module.__name__)
+
+
+def is_compiler_module_name(name: str) -> bool:
+    """Checks whether the Python module with the given name belongs to the Guppy
+    compiler."""
+    return name.startswith(("guppylang_internals.", "guppylang."))
@@ -107,6 +107,10 @@ class ConstArg(ArgumentBase):
             case ConstValue(value=v, ty=NumericType(kind=NumericType.Kind.Nat)):
                 assert isinstance(v, int)
                 return ht.BoundedNatArg(n=v)
+            case BoundConstVar(idx=idx, ty=NumericType(kind=NumericType.Kind.Nat)):
+                # Only reachable when compiling a polymorphic function with nat
+                # parameters, see `guppylang_internals.monomorphization`
+                return ht.VariableArg(idx, ht.BoundedNatParam())
             case BoundConstVar():
                 raise InternalGuppyError(
                     "Tried to convert generic variable to Hugr. This should have been "
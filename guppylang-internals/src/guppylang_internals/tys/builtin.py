@@ -27,6 +27,7 @@ from guppylang_internals.tys.ty import (
     OpaqueType,
     TupleType,
     Type,
+    intern_type,
 )
 from guppylang_internals.wasm_util import WasmPlatform
 
@@ -316,29 +317,35 @@ def string_type() -> OpaqueType:
 
 
 def list_type(element_ty: Type) -> OpaqueType:
-    return OpaqueType([TypeArg(element_ty)], list_type_def)
+    return intern_type(OpaqueType([TypeArg(element_ty)], list_type_def))
 
 
 def array_type(element_ty: Type, length: int | Const) -> OpaqueType:
     if isinstance(length, int):
         length = ConstValue(nat_type(), length)
-    return OpaqueType([TypeArg(element_ty), ConstArg(length)], array_type_def)
+    return intern_type(
+        OpaqueType([TypeArg(element_ty), ConstArg(length)], array_type_def)
+    )
 
 
 def frozenarray_type(element_ty: Type, length: int | Const) -> OpaqueType:
     if isinstance(length, int):
         length = ConstValue(nat_type(), length)
-    return OpaqueType([TypeArg(element_ty), ConstArg(length)], frozenarray_type_def)
+    return intern_type(
+        OpaqueType([TypeArg(element_ty), ConstArg(length)], frozenarray_type_def)
+    )
 
 
 def sized_iter_type(iter_type: Type, size: int | Const) -> OpaqueType:
     if isinstance(size, int):
         size = ConstValue(nat_type(), size)
-    return OpaqueType([TypeArg(iter_type), ConstArg(size)], sized_iter_type_def)
+    return intern_type(
+        OpaqueType([TypeArg(iter_type), ConstArg(size)], sized_iter_type_def)
+    )
 
 
 def option_type(element_ty: Type) -> OpaqueType:
-    return OpaqueType([TypeArg(element_ty)], option_type_def)
+    return intern_type(OpaqueType([TypeArg(element_ty)], option_type_def))
 
 
 def is_bool_type(ty: Type) -> bool:
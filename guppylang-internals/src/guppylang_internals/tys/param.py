@@ -3,13 +3,15 @@ from collections.abc import Sequence
 from dataclasses import dataclass, field, replace
 from typing import TYPE_CHECKING, TypeAlias
 
+from hugr import tys as ht
 from typing_extensions import Self
 
 from guppylang_internals.ast_util import AstNode
 from guppylang_internals.checker.errors.generic import ExpectedError
 from guppylang_internals.checker.errors.type_errors import TypeMismatchError
-from guppylang_internals.error import GuppyError, GuppyTypeError
+from guppylang_internals.error import GuppyError, GuppyTypeError, InternalGuppyError
 from guppylang_internals.tys.arg import Argument, ConstArg, TypeArg
+from guppylang_internals.tys.common import ToHugrContext
 from guppylang_internals.tys.const import BoundConstVar, ExistentialConstVar
 from guppylang_internals.tys.errors import WrongNumberOfTypeArgsError
 from guppylang_internals.tys.var import ExistentialVar
@@ -76,6 +78,10 @@ class ParameterBase(ABC):
     def instantiate_bounds(self, inst: "PartialInst") -> Self:
         """Instantiates bound variables mentioned in parameter bounds"""
 
+    @abstractmethod
+    def to_hugr(self, ctx: ToHugrContext) -> ht.TypeParam:
+        """Computes the Hugr representation of the parameter."""
+
 
 @dataclass(frozen=True)
 class TypeParam(ParameterBase):
@@ -149,6 +155,13 @@ class TypeParam(ParameterBase):
         # For now, type parameters don't have any bounds that could be instantiated
         return self
 
+    def to_hugr(self, ctx: ToHugrContext) -> ht.TypeParam:
+        """Computes the Hugr representation of the parameter."""
+        raise InternalGuppyError(
+            "Tried to convert type parameter to Hugr. This should have been "
+            "monomorphized away."
+        )
+
     def __str__(self) -> str:
         """User-facing string representation of the parameter."""
         return self.name
@@ -213,6 +226,20 @@ class ConstParam(ParameterBase):
         instantiator = Instantiator(inst)
         return replace(self, ty=self.ty.transform(instantiator))
 
+    def to_hugr(self, ctx: ToHugrContext) -> ht.TypeParam:
+        """Computes the Hugr representation of the parameter.
+
+        Only `nat` parameters have a Hugr representation as bounded nat parameters.
+        """
+        from guppylang_internals.tys.ty import NumericType
+
+        if self.ty != NumericType(NumericType.Kind.Nat):
+            raise InternalGuppyError(
+                "Tried to convert non-nat const parameter to Hugr. This should have "
+                "been monomorphized away."
+            )
+        return ht.BoundedNatParam()
+
     def __str__(self) -> str:
         """User-facing string representation of the parameter."""
         return f"{self.name}: {self.ty}"
@@ -1,6 +1,6 @@
 import functools
 from collections.abc import Sequence
-from typing import Any
+from typing import Any, cast
 
 from guppylang_internals.error import InternalGuppyError
 from guppylang_internals.tys.arg import Argument, ConstArg, TypeArg
@@ -17,6 +17,7 @@ from guppylang_internals.tys.ty import (
     FunctionType,
     Type,
     TypeBase,
+    intern_type,
 )
 from guppylang_internals.tys.var import BoundVar, ExistentialVar
 
@@ -70,8 +71,10 @@ class Instantiator(Transformer):
             return arg.ty
 
         # Otherwise, lower the de Bruijn index
-        return BoundTypeVar(
-            ty.display_name, ty.idx - len(self.inst), ty.copyable, ty.droppable
+        return intern_type(
+            BoundTypeVar(
+                ty.display_name, ty.idx - len(self.inst), ty.copyable, ty.droppable
+            )
         )
 
     @transform.register
@@ -96,6 +99,37 @@ class Instantiator(Transformer):
         return None
 
 
+class ExistentialRenamer(Transformer):
+    """Type transformer that renames existential variables in order of occurrence.
+
+    Types that only differ in the identity of their existential variables are mapped to
+    the same type.
+    """
+
+    renaming: dict[ExistentialVar, ExistentialTypeVar | ExistentialConstVar]
+
+    def __init__(self) -> None:
+        self.renaming = {}
+
+    @functools.singledispatchmethod
+    def transform(self, ty: Any) -> Any | None:
+        return None
+
+    @transform.register
+    def _transform_ExistentialTypeVar(self, ty: ExistentialTypeVar) -> Type | None:
+        if ty not in self.renaming:
+            self.renaming[ty] = ExistentialTypeVar(
+                "?", len(self.renaming), ty.copyable, ty.droppable
+            )
+        return cast("ExistentialTypeVar", self.renaming[ty])
+
+    @transform.register
+    def _transform_ExistentialConstVar(self, c: ExistentialConstVar) -> Const | None:
+        if c not in self.renaming:
+            self.renaming[c] = ExistentialConstVar(c.ty, "?", len(self.renaming))
+        return cast("ExistentialConstVar", self.renaming[c])
+
+
 class BoundVarFinder(Visitor):
     """Type transformer that extracts bound variables."""
 
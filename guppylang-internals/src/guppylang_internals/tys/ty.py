@@ -1,15 +1,18 @@
+import itertools
 from abc import ABC, abstractmethod
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Hashable, Mapping, Sequence
 from dataclasses import dataclass, field, replace
 from enum import Enum, Flag, auto
-from functools import cached_property, total_ordering
-from typing import TYPE_CHECKING, ClassVar, TypeAlias, cast
+from functools import cached_property, total_ordering, wraps
+from typing import TYPE_CHECKING, Any, ClassVar, TypeAlias, TypeVar, cast
+from weakref import WeakValueDictionary
 
 import hugr.std.float
 import hugr.std.int
 from hugr import tys as ht
 
 from guppylang_internals.error import InternalGuppyError
+from guppylang_internals.profiling import count
 from guppylang_internals.tys.arg import Argument, ConstArg, TypeArg
 from guppylang_internals.tys.common import (
     ToHugr,
@@ -18,7 +21,13 @@ from guppylang_internals.tys.common import (
     Transformer,
     Visitor,
 )
-from guppylang_internals.tys.const import Const, ConstValue, ExistentialConstVar
+from guppylang_internals.tys.const import (
+    BoundConstVar,
+    Const,
+    ConstBase,
+    ConstValue,
+    ExistentialConstVar,
+)
 from guppylang_internals.tys.param import ConstParam, Parameter
 from guppylang_internals.tys.var import BoundVar, ExistentialVar
 
@@ -29,6 +38,46 @@ if TYPE_CHECKING:
     from guppylang_internals.definition.util import CheckedField
     from guppylang_internals.tys.subst import Inst, PartialInst, Subst
 
+#: Type variable ranging over Guppy types
+TypeT = TypeVar("TypeT", bound="TypeBase")
+
+#: Type variable ranging over Guppy types and constants
+TypeOrConstT = TypeVar("TypeOrConstT", bound="TypeBase | ConstBase")
+
+#: Type variable ranging over Hugr representations of types
+HugrTypeT = TypeVar("HugrTypeT", bound=ht.Type)
+
+
+def memoize_to_hugr(
+    to_hugr: "Callable[[TypeT, ToHugrContext], HugrTypeT]",
+) -> "Callable[[TypeT, ToHugrContext], HugrTypeT]":
+    """Decorator for `to_hugr` methods that reuses the Hugr representation computed
+    earlier for a structurally identical type.
+
+    Results are memoized in the `hugr_type_cache` of the context, if it has one. This
+    way, the cache is discarded together with the context once the Hugr is built.
+    """
+
+    @wraps(to_hugr)
+    def memoized(ty: "TypeT", ctx: ToHugrContext) -> HugrTypeT:
+        cache: dict[Hashable, tuple[TypeBase, ht.Type]] | None = getattr(
+            ctx, "hugr_type_cache", None
+        )
+        key = ty.intern_key
+        if cache is None or key is None:
+            return to_hugr(ty, ctx)
+        if key in cache:
+            count("to_hugr_cache_hits")
+            return cast("HugrTypeT", cache[key][1])
+        count("to_hugr_cache_misses")
+        hugr_ty = to_hugr(ty, ctx)
+        # We also store the type itself to keep the definitions referenced by the key
+        # alive, so their ids can't be reused
+        cache[key] = (ty, hugr_ty)
+        return hugr_ty
+
+    return memoized
+
 
 @dataclass(frozen=True)
 class TypeBase(ToHugr[ht.Type], Transformable["Type"], ABC):
@@ -82,6 +131,15 @@ class TypeBase(ToHugr[ht.Type], Transformable["Type"], ABC):
         """The bound type variables contained in this type."""
         return set()
 
+    @cached_property
+    def intern_key(self) -> Hashable | None:
+        """Hashable key identifying this type up to structural identity.
+
+        Returns `None` if the type contains components that cannot be hashed. See
+        `intern_type` for details.
+        """
+        return _type_key(self.cast())
+
     def substitute(self, subst: "Subst") -> "Type":
         """Substitutes existential variables in this type."""
         from guppylang_internals.tys.subst import Substituter
@@ -486,15 +544,16 @@ class FunctionType(ParametrizedTypeBase):
         return self._to_hugr_function_type(ctx)
 
     def to_hugr_poly(self, ctx: ToHugrContext) -> ht.PolyFuncType:
-        """Computes the Hugr `PolyFuncType` representation of the type."""
-        if self.parametrized:
-            raise InternalGuppyError(
-                "Tried to convert parametrised function type to Hugr. This should have "
-                "been monomorphized away."
-            )
+        """Computes the Hugr `PolyFuncType` representation of the type.
+
+        Parametrised function types are only supported if all of their parameters are
+        `nat`s. Other parameters should have been monomorphized away.
+        """
+        params = [param.to_hugr(ctx) for param in self.params]
         func_ty = self._to_hugr_function_type(ctx)
-        return ht.PolyFuncType(params=[], body=func_ty)
+        return ht.PolyFuncType(params=params, body=func_ty)
 
+    @memoize_to_hugr
     def _to_hugr_function_type(self, ctx: ToHugrContext) -> ht.FunctionType:
         """Helper method to compute the Hugr `FunctionType` representation of the type.
 
@@ -529,12 +588,14 @@ class FunctionType(ParametrizedTypeBase):
 
     def transform(self, transformer: Transformer) -> "Type":
         """Accepts a transformer on this type."""
-        return transformer.transform(self) or FunctionType(
-            [replace(inp, ty=inp.ty.transform(transformer)) for inp in self.inputs],
-            self.output.transform(transformer),
-            self.params,
-            comptime_args=self.comptime_args,
-            unitary_flags=self.unitary_flags,
+        return transformer.transform(self) or intern_type(
+            FunctionType(
+                [replace(inp, ty=inp.ty.transform(transformer)) for inp in self.inputs],
+                self.output.transform(transformer),
+                self.params,
+                comptime_args=self.comptime_args,
+                unitary_flags=self.unitary_flags,
+            )
         )
 
     def instantiate_partial(self, args: "PartialInst") -> "FunctionType":
@@ -555,15 +616,17 @@ class FunctionType(ParametrizedTypeBase):
             full_inst.append(arg)
 
         inst = Instantiator(full_inst)
-        return FunctionType(
-            [replace(inp, ty=inp.ty.transform(inst)) for inp in self.inputs],
-            self.output.transform(inst),
-            remaining_params,
-            # Comptime type arguments also need to be instantiated
-            comptime_args=[
-                cast("ConstArg", arg.transform(inst)) for arg in self.comptime_args
-            ],
-            unitary_flags=self.unitary_flags,
+        return intern_type(
+            FunctionType(
+                [replace(inp, ty=inp.ty.transform(inst)) for inp in self.inputs],
+                self.output.transform(inst),
+                remaining_params,
+                # Comptime type arguments also need to be instantiated
+                comptime_args=[
+                    cast("ConstArg", arg.transform(inst)) for arg in self.comptime_args
+                ],
+                unitary_flags=self.unitary_flags,
+            )
         )
 
     def instantiate(self, args: "Inst") -> "FunctionType":
@@ -623,14 +686,15 @@ class TupleType(ParametrizedTypeBase):
         """Casts an implementor of `TypeBase` into a `Type`."""
         return self
 
+    @memoize_to_hugr
     def to_hugr(self, ctx: ToHugrContext) -> ht.Tuple:
         """Computes the Hugr representation of the type."""
         return ht.Tuple(*row_to_hugr(self.element_types, ctx))
 
     def transform(self, transformer: Transformer) -> "Type":
         """Accepts a transformer on this type."""
-        return transformer.transform(self) or TupleType(
-            [ty.transform(transformer) for ty in self.element_types]
+        return transformer.transform(self) or intern_type(
+            TupleType([ty.transform(transformer) for ty in self.element_types])
         )
 
 
@@ -665,14 +729,15 @@ class OpaqueType(ParametrizedTypeBase):
         """Casts an implementor of `TypeBase` into a `Type`."""
         return self
 
+    @memoize_to_hugr
     def to_hugr(self, ctx: ToHugrContext) -> ht.Type:
         """Computes the Hugr representation of the type."""
         return self.defn.to_hugr(self.args, ctx)
 
     def transform(self, transformer: Transformer) -> "Type":
         """Accepts a transformer on this type."""
-        return transformer.transform(self) or OpaqueType(
-            [arg.transform(transformer) for arg in self.args], self.defn
+        return transformer.transform(self) or intern_type(
+            OpaqueType([arg.transform(transformer) for arg in self.args], self.defn)
         )
 
 
@@ -710,14 +775,15 @@ class StructType(ParametrizedTypeBase):
         """Casts an implementor of `TypeBase` into a `Type`."""
         return self
 
+    @memoize_to_hugr
     def to_hugr(self, ctx: ToHugrContext) -> ht.Tuple:
         """Computes the Hugr representation of the type."""
         return ht.Tuple(*(f.ty.to_hugr(ctx) for f in self.fields))
 
     def transform(self, transformer: Transformer) -> "Type":
         """Accepts a transformer on this type."""
-        return transformer.transform(self) or StructType(
-            [arg.transform(transformer) for arg in self.args], self.defn
+        return transformer.transform(self) or intern_type(
+            StructType([arg.transform(transformer) for arg in self.args], self.defn)
         )
 
 
@@ -771,6 +837,7 @@ class EnumType(ParametrizedTypeBase):
     def cast(self) -> "Type":
         return self
 
+    @memoize_to_hugr
     def to_hugr(self, ctx: ToHugrContext) -> ht.Sum:
         """Computes the Hugr representation of the type."""
         rows = [[f.ty.to_hugr(ctx) for f in v.fields] for v in self.variants_as_list]
@@ -778,8 +845,8 @@ class EnumType(ParametrizedTypeBase):
 
     def transform(self, transformer: Transformer) -> "Type":
         """Accepts a transformer on this type."""
-        return transformer.transform(self) or EnumType(
-            [arg.transform(transformer) for arg in self.args], self.defn
+        return transformer.transform(self) or intern_type(
+            EnumType([arg.transform(transformer) for arg in self.args], self.defn)
         )
 
 
@@ -835,106 +902,288 @@ def rows_to_hugr(rows: Sequence[TypeRow], ctx: ToHugrContext) -> list[ht.TypeRow
     return [row_to_hugr(row, ctx) for row in rows]
 
 
+class Unifier:
+    """Union-find based solver for existential type and const variables.
+
+    Existential variables that are unified with each other are merged into the same
+    equivalence class, and each class can be assigned at most one solution. Solutions
+    are stored as they are encountered and are only fully resolved (i.e. have the
+    solutions of nested variables substituted) when they are accessed.
+
+    Contrary to `unify`, this lets us solve variables incrementally without copying
+    the substitution or re-walking types after every step.
+    """
+
+    #: Parent pointers of the union-find forest. Variables without an entry are the
+    #: representatives of their equivalence class.
+    _parent: dict[ExistentialVar, ExistentialVar]
+
+    #: Solutions for the representatives of each equivalence class
+    _solutions: "dict[ExistentialVar, Type | Const]"
+
+    def __init__(self, subst: "Subst | None" = None) -> None:
+        self._parent = {}
+        self._solutions = dict(subst) if subst else {}
+
+    def __contains__(self, var: ExistentialVar) -> bool:
+        """Checks whether a variable has been unified with something else."""
+        return var in self._parent or var in self._solutions
+
+    def find(self, var: ExistentialVar) -> ExistentialVar:
+        """Returns the representative of the equivalence class of a variable."""
+        root = var
+        while (parent := self._parent.get(root)) is not None:
+            root = parent
+        # Path compression: Point everything on the path directly to the root
+        while var != root:
+            self._parent[var], var = root, self._parent[var]
+        return root
+
+    def resolve(self, x: "TypeOrConstT") -> "TypeOrConstT":
+        """Substitutes the solutions of all solved variables in a type or constant."""
+        if not x.unsolved_vars:
+            return x
+        return cast("TypeOrConstT", x.transform(_UnifierResolver(self)))
+
+    def subst(self) -> "Subst":
+        """Returns the substitution of all variables that have been unified so far."""
+        return {
+            var: self._resolve_var(var)
+            for var in dict.fromkeys(itertools.chain(self._parent, self._solutions))
+        }
+
+    def update(self, subst: "Subst") -> None:
+        """Adds the solutions from an existing substitution."""
+        for var, t in subst.items():
+            if not self.unify(cast("ExistentialTypeVar | ExistentialConstVar", var), t):
+                raise InternalGuppyError("Substitution conflicts with unifier")
+
+    def unify(self, s: Type | Const, t: Type | Const) -> bool:
+        """Unifies two types or constants, recording any solutions for variables.
+
+        Returns `False` if this isn't possible. In that case, the unifier might be left
+        with partial solutions.
+        """
+        # Make sure that s and t are either both constants or both types
+        assert isinstance(s, TypeBase) == isinstance(t, TypeBase)
+        # Interned types are shared, so identical objects are a common and cheap case
+        if s is t:
+            return True
+        match s, t:
+            case ExistentialTypeVar() | ExistentialConstVar() as s_var, t:
+                return self._unify_var(s_var, t)
+            case s, ExistentialTypeVar() | ExistentialConstVar() as t_var:
+                return self._unify_var(t_var, s)
+            case BoundVar(idx=s_idx), BoundVar(idx=t_idx):
+                return s_idx == t_idx
+            case ConstValue(value=c_value), ConstValue(value=d_value):
+                return bool(c_value == d_value)
+            case NumericType(kind=s_kind), NumericType(kind=t_kind):
+                return s_kind == t_kind
+            case NoneType(), NoneType():
+                return True
+            case FunctionType() as s, FunctionType() as t if s.params == t.params:
+                if len(s.inputs) != len(t.inputs):
+                    return False
+                for a, b in zip(s.inputs, t.inputs, strict=True):
+                    if a.ty.linear and b.ty.linear and a.flags != b.flags:
+                        return False
+                return self._unify_args(s, t)
+            case TupleType() as s, TupleType() as t:
+                return self._unify_args(s, t)
+            case OpaqueType() as s, OpaqueType() as t if s.defn == t.defn:
+                return self._unify_args(s, t)
+            case StructType() as s, StructType() as t if s.defn == t.defn:
+                return self._unify_args(s, t)
+            case EnumType() as s, EnumType() as t if s.defn == t.defn:
+                return self._unify_args(s, t)
+            case _:
+                return False
+
+    def _unify_var(
+        self, var: "ExistentialTypeVar | ExistentialConstVar", t: Type | Const
+    ) -> bool:
+        """Helper method for unification of variables."""
+        root = self.find(var)
+        if isinstance(root, ExistentialConstVar):
+            assert isinstance(t, ConstBase)
+            if not self.unify(root.ty, t.ty):
+                return False
+        if root in self._solutions:
+            return self.unify(self._solutions[root], t)
+        if isinstance(t, ExistentialVar):
+            t_root = self.find(t)
+            if t_root == root:
+                return True
+            if t_root in self._solutions and self._occurs(
+                root, self._solutions[t_root]
+            ):
+                return False
+            self._parent[root] = t_root
+            return True
+        if self._occurs(root, t):
+            return False
+        self._solutions[root] = t
+        return True
+
+    def _unify_args(self, s: ParametrizedType, t: ParametrizedType) -> bool:
+        """Helper method for unification of type arguments of parametrised types."""
+        if len(s.args) != len(t.args):
+            return False
+        for sa, ta in zip(s.args, t.args, strict=True):
+            match sa, ta:
+                case TypeArg(ty=sa_ty), TypeArg(ty=ta_ty):
+                    if not self.unify(sa_ty, ta_ty):
+                        return False
+                case ConstArg(const=sa_const), ConstArg(const=ta_const):
+                    if not self.unify(sa_const, ta_const):
+                        return False
+                case _:
+                    return False
+        return True
+
+    def _occurs(self, root: ExistentialVar, t: Type | Const) -> bool:
+        """Checks whether a variable occurs in a type or constant under the current
+        solutions."""
+        return root in self.resolve(t).unsolved_vars
+
+    def _resolve_var(self, var: ExistentialVar) -> Type | Const:
+        """Returns the fully resolved solution for a variable, or the representative of
+        its equivalence class if it hasn't been solved yet."""
+        root = self.find(var)
+        if root not in self._solutions:
+            if isinstance(root, ExistentialConstVar) and root.ty.unsolved_vars:
+                return replace(root, ty=self.resolve(root.ty))
+            return cast("ExistentialTypeVar | ExistentialConstVar", root)
+        solution = self._solutions[root]
+        if solution.unsolved_vars:
+            # Cache the resolved solution so we don't have to walk it again next time
+            solution = self._solutions[root] = self.resolve(solution)
+        return solution
+
+
+class _UnifierResolver(Transformer):
+    """Type transformer that substitutes the current solutions of a `Unifier`."""
+
+    def __init__(self, unifier: Unifier) -> None:
+        self.unifier = unifier
+
+    def transform(self, arg: Any) -> Any | None:
+        if isinstance(arg, ExistentialVar):
+            return self.unifier._resolve_var(arg)
+        # Don't descend into parts that don't contain any variables
+        if not arg.unsolved_vars:
+            return arg
+        return None
+
+
 def unify(s: Type | Const, t: Type | Const, subst: "Subst | None") -> "Subst | None":
     """Computes a most general unifier for two types or constants.
 
     Return a substitutions `subst` such that `s[subst] == t[subst]` or `None` if this
     not possible.
     """
-    # Make sure that s and t are either both constants or both types
-    assert isinstance(s, TypeBase) == isinstance(t, TypeBase)
     if subst is None:
         return None
-    match s, t:
-        case ExistentialVar(id=s_id), ExistentialVar(id=t_id) if s_id == t_id:
-            return subst
-        case ExistentialTypeVar() as s_var, t if isinstance(t, Type):
-            return _unify_type_var(s_var, t, subst)
-        case ExistentialConstVar() as s_var, t if isinstance(t, Const):
-            return _unify_const_var(s_var, t, subst)
-        case s, ExistentialTypeVar() as t_var if isinstance(s, Type):
-            return _unify_type_var(t_var, s, subst)
-        case s, ExistentialConstVar() as t_var if isinstance(s, Const):
-            return _unify_const_var(t_var, s, subst)
-        case BoundVar(idx=s_idx), BoundVar(idx=t_idx) if s_idx == t_idx:
-            return subst
-        case ConstValue(value=c_value), ConstValue(value=d_value) if c_value == d_value:
-            return subst
-        case NumericType(kind=s_kind), NumericType(kind=t_kind) if s_kind == t_kind:
-            return subst
-        case NoneType(), NoneType():
-            return subst
-        case FunctionType() as s, FunctionType() as t if s.params == t.params:
-            if len(s.inputs) != len(t.inputs):
-                return None
-            for a, b in zip(s.inputs, t.inputs, strict=True):
-                if a.ty.linear and b.ty.linear and a.flags != b.flags:
-                    return None
-            return _unify_args(s, t, subst)
-        case TupleType() as s, TupleType() as t:
-            return _unify_args(s, t, subst)
-        case OpaqueType() as s, OpaqueType() as t if s.defn == t.defn:
-            return _unify_args(s, t, subst)
-        case StructType() as s, StructType() as t if s.defn == t.defn:
-            return _unify_args(s, t, subst)
-        case EnumType() as s, EnumType() as t if s.defn == t.defn:
-            return _unify_args(s, t, subst)
-        case _:
-            return None
+    if s is t:
+        return subst
+    unifier = Unifier(subst)
+    if not unifier.unify(s, t):
+        return None
+    return unifier.subst()
 
 
-def _unify_type_var(var: ExistentialTypeVar, t: Type, subst: "Subst") -> "Subst | None":
-    """Helper function for unification of type variables."""
-    if var in subst:
-        return unify(subst[var], t, subst)
-    if isinstance(t, ExistentialTypeVar) and t in subst:
-        return unify(var, subst[t], subst)
-    if var in t.unsolved_vars:
-        return None
-    return {var: t, **subst}
+### Hash-consing of types
 
+#: Canonical representatives of all interned types, indexed by their `intern_key`.
+#: Entries are dropped as soon as the type is no longer referenced anywhere else.
+_INTERNED_TYPES: "WeakValueDictionary[Hashable, TypeBase]" = WeakValueDictionary()
 
-def _unify_const_var(
-    var: ExistentialConstVar, t: Const, subst: "Subst"
-) -> "Subst | None":
-    """Helper function for unification of const variables."""
-    from guppylang_internals.tys.subst import Substituter
 
-    subst = unify(var.ty, t.ty, subst)
-    if subst is None:
-        return None
-    # Update the existential type variables according to subst
-    var = replace(var, ty=var.ty.transform(Substituter(subst)))
-    t = t.transform(Substituter(subst))
-    if var in subst:
-        return unify(subst[var], t, subst)
+def intern_type(ty: TypeT) -> TypeT:
+    """Returns the canonical representative of a type.
 
-    if var in t.unsolved_vars:
-        return None
-    return {var: t, **subst}
+    Structurally identical types are mapped to the same object, so properties that are
+    cached on types (e.g. `copyable`, `hugr_bound`, or the fields of a struct type) only
+    need to be computed once per distinct type. It also makes equality checks between
+    interned types cheap, since the comparison short-circuits on identical objects.
+
+    Note that input names are part of the structural identity of function types, even
+    though they are ignored by `==`. Types that contain unhashable components are
+    returned unchanged.
+    """
+    key = ty.intern_key
+    if key is None:
+        return ty
+    return cast("TypeT", _INTERNED_TYPES.setdefault(key, ty))
+
+
+def _type_key(ty: Type) -> Hashable | None:
+    """Computes the `intern_key` of a type."""
+    match ty:
+        case NumericType(kind=kind):
+            return NumericType, kind
+        case NoneType(copyable=copyable, droppable=droppable):
+            return NoneType, copyable, droppable
+        case BoundTypeVar(display_name=name, idx=idx):
+            return BoundTypeVar, name, idx, ty.copyable, ty.droppable
+        case ExistentialTypeVar(display_name=name, id=var_id):
+            return ExistentialTypeVar, name, var_id, ty.copyable, ty.droppable
+        case FunctionType(params=[]):
+            inputs = tuple(
+                (inp.ty.intern_key, inp.flags, inp.name) for inp in ty.inputs
+            )
+            if any(key is None for key, _, _ in inputs):
+                return None
+            args = _args_key(ty.args)
+            if args is None:
+                return None
+            return FunctionType, inputs, args, ty.unitary_flags
+        case FunctionType():
+            # Parameters aren't hashable, so we don't intern generic functions
+            return None
+        case TupleType() | OpaqueType() | StructType() | EnumType():
+            args = _args_key(ty.args)
+            if args is None:
+                return None
+            # Definitions are compared by identity. They are kept alive by the interned
+            # type, so their id can't be reused while the key is in use.
+            defn = id(ty.defn) if not isinstance(ty, TupleType) else None
+            return type(ty), defn, args
+
+
+def _args_key(args: Sequence[Argument]) -> tuple[Hashable, ...] | None:
+    """Computes a hashable key for a sequence of type arguments."""
+    keys = []
+    for arg in args:
+        match arg:
+            case TypeArg(ty=ty):
+                key = ty.intern_key
+            case ConstArg(const=const):
+                key = _const_key(const)
+        if key is None:
+            return None
+        keys.append(key)
+    return tuple(keys)
 
 
-def _unify_args(
-    s: ParametrizedType, t: ParametrizedType, subst: "Subst"
-) -> "Subst | None":
-    """Helper function for unification of type arguments of parametrised types."""
-    if len(s.args) != len(t.args):
+def _const_key(const: Const) -> Hashable | None:
+    """Computes a hashable key for a constant in the type system."""
+    ty_key = const.ty.intern_key
+    if ty_key is None:
         return None
-    for sa, ta in zip(s.args, t.args, strict=True):
-        match sa, ta:
-            case TypeArg(ty=sa_ty), TypeArg(ty=ta_ty):
-                res = unify(sa_ty, ta_ty, subst)
-                if res is None:
-                    return None
-                subst = res
-            case ConstArg(const=sa_const), ConstArg(const=ta_const):
-                res = unify(sa_const, ta_const, subst)
-                if res is None:
-                    return None
-                subst = res
-            case _:
+    match const:
+        case ConstValue(value=value):
+            try:
+                hash(value)
+            except TypeError:
                 return None
-    return subst
+            # Include the Python type of the value since `1 == True`
+            return ConstValue, ty_key, type(value), value
+        case BoundConstVar(display_name=name, idx=idx):
+            return BoundConstVar, ty_key, name, idx
+        case ExistentialConstVar(display_name=name, id=var_id):
+            return ExistentialConstVar, ty_key, name, var_id
 
 
 ### Helpers for working with tuples of functions
@@ -13,7 +13,7 @@ from guppylang_internals.definition.common import DefId
 from guppylang_internals.definition.declaration import RawFunctionDecl
 from guppylang_internals.definition.enum import CheckedEnumDef
 from guppylang_internals.definition.function import RawFunctionDef
-from guppylang_internals.definition.value import CompiledCallableDef
+from guppylang_internals.definition.value import CallableDef
 from guppylang_internals.diagnostic import Error, Note
 from guppylang_internals.engine import DEF_STORE, ENGINE
 from guppylang_internals.error import GuppyError, pretty_errors
@@ -51,7 +51,9 @@ Out = TypeVar("Out")
 def _update_generator_metadata(hugr: Hugr[Any]) -> None:
     """Update the generator metadata of a Hugr to be
     guppylang rather than just internals."""
-    hugr.module_root.metadata[HugrGenerator] = GeneratorDesc(
+    # Go through the node data since metadata on `Node` handles of deserialized Hugrs
+    # (e.g. packages loaded from the compilation cache) isn't tied to the graph
+    hugr[hugr.module_root].metadata[HugrGenerator] = GeneratorDesc(
         name=f"guppylang (guppylang-internals-v{guppylang_internals.__version__})",
         version=Version.parse(guppylang.__version__),
     )
@@ -218,11 +220,12 @@ class GuppyFunctionDefinition(GuppyDefinition, Generic[P, Out]):
         pack = self.compile_function()
         # entrypoint cannot be polymorphic
         monomorphized_id = (self.id, ())
-        compiled_def = ENGINE.compiled.get(monomorphized_id)
-        if (
-            isinstance(compiled_def, CompiledCallableDef)
-            and len(compiled_def.ty.inputs) > 0
-        ):
+        # If the package was loaded from the compilation cache, there is no compiled
+        # definition, but the checked one has the same signature
+        compiled_def = ENGINE.compiled.get(monomorphized_id) or ENGINE.checked.get(
+            monomorphized_id
+        )
+        if isinstance(compiled_def, CallableDef) and len(compiled_def.ty.inputs) > 0:
             # Check if the entrypoint has arguments
             defined_at = cast("ast.FunctionDef", compiled_def.defined_at)
             start = to_span(defined_at.args.args[0])
@@ -77,6 +77,53 @@ Or update many options at once:
 See the :py:class:`EmulatorInstance` documentation for a full list of options and their
 defaults.
 
+Building an emulator instance runs the full selene build pipeline. When the same
+program is built repeatedly, e.g. in a parameter sweep across interpreter sessions,
+the built artifacts can be cached on disk by passing a builder with a cache directory:
+
+.. code-block:: python
+
+    from guppylang.emulator import EmulatorBuilder
+
+    builder = EmulatorBuilder().with_cache_dir("emulator_cache")
+    foo.emulator(n_qubits=1, builder=builder).run()
+
+
+Streaming results
+-----------------
+
+For large numbers of shots, keeping every shot in memory can be expensive.
+:py:meth:`EmulatorInstance.iter_shots` yields the results of each shot as soon as it
+completes, and :py:meth:`EmulatorInstance.run_stream` reduces them with one of the
+aggregators in :py:mod:`guppylang.emulator.aggregate`:
+
+.. code-block:: python
+
+    from guppylang.emulator.aggregate import RegisterCounts
+
+    foo.emulator(n_qubits=1).with_shots(10**6).run_stream(RegisterCounts())
+
+Shots can also be split into shards that are emulated concurrently via
+:py:meth:`EmulatorInstance.run_parallel`. For a fixed seed, the merged results are
+the same as those of ``.run()``:
+
+.. code-block:: python
+
+    foo.emulator(n_qubits=1).with_shots(10**6).with_seed(42).run_parallel(workers=8)
+
+
+For vectorised post-processing, results can be stored in a
+:py:class:`ColumnarResult` holding one NumPy array per tag, either via
+:py:meth:`EmulatorResult.to_columnar` or directly from the stream of shots:
+
+.. code-block:: python
+
+    from guppylang.emulator import ColumnarResult
+
+    result = ColumnarResult.from_shots(foo.emulator(n_qubits=1).iter_shots())
+    result.register_counts()
+    result.save("results.npz")
+
 
 Noisy simulation
 -----------------
@@ -134,15 +181,28 @@ Output is a uniform distribution over the two basis states of the qubit:
 
     [TracedState(probability=0.5, state=array([1.+0.j, 0.+0.j])),
     TracedState(probability=0.5, state=array([0.+0.j, 1.+0.j]))]
+
+Since every state holds the full vector of ``2 ** n_qubits`` amplitudes, extracting the
+states of all shots at once can exhaust memory for larger programs.
+:py:meth:`EmulatorResult.iter_partial_states` instead loads one state at a time,
+optionally memory-mapping the state files. Reductions like
+:py:meth:`EmulatorResult.state_probabilities` and
+:py:meth:`EmulatorResult.state_expectations` are computed on top of it:
+
+.. code-block:: python
+
+    res.state_expectations("q0", "Z")
 """
 
 from .builder import EmulatorBuilder
+from .columnar import ColumnarResult
 from .exceptions import EmulatorError
 from .instance import EmulatorInstance
 from .result import EmulatorResult, QsysShot, TaggedResult
 from .state import PartialState, PartialVector, StateVector, TracedState
 
 __all__ = [
+    "ColumnarResult",
     "EmulatorBuilder",
     "EmulatorError",
     "EmulatorInstance",
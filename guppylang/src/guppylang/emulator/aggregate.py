@@ -0,0 +1,110 @@
+"""
+Incremental aggregation of emulator shots.
+
+Aggregators consume the shots produced by :py:meth:`EmulatorInstance.iter_shots` one
+at a time, so summaries like register counts can be computed without keeping every
+shot in memory. See :py:meth:`EmulatorInstance.run_stream`.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from hugr.qsystem.result import DataPrimitive, QsysResult
+
+if TYPE_CHECKING:
+    from hugr.qsystem.result import QsysShot
+
+__all__ = [
+    "CollatedCounts",
+    "RegisterCounts",
+    "ShotAggregator",
+    "TagHistogram",
+]
+
+T = TypeVar("T")
+
+
+class ShotAggregator(ABC, Generic[T]):
+    """Reduces a stream of shots to a summary of type ``T``.
+
+    Shots are passed to :py:meth:`add` in the order in which they are emulated.
+    Memory usage should not grow with the number of shots.
+    """
+
+    @abstractmethod
+    def add(self, shot: QsysShot) -> None:
+        """Incorporates a single shot into the summary."""
+
+    @abstractmethod
+    def result(self) -> T:
+        """Returns the summary of all shots added so far."""
+
+
+class RegisterCounts(ShotAggregator[dict[str, Counter[str]]]):
+    """Counts register bitstrings over shots.
+
+    Streaming equivalent of :py:meth:`EmulatorResult.register_counts`.
+    """
+
+    def __init__(self, strict_names: bool = False, strict_lengths: bool = False):
+        self.strict_names = strict_names
+        self.strict_lengths = strict_lengths
+        self._counts: dict[str, Counter[str]] = {}
+        self._lengths: dict[str, int] = {}
+
+    def add(self, shot: QsysShot) -> None:
+        bitstrs = shot.to_register_bits()
+        for reg, bitstr in bitstrs.items():
+            if self.strict_lengths and self._lengths.get(reg, len(bitstr)) != len(
+                bitstr
+            ):
+                msg = "All register bitstrings must have the same length."
+                raise ValueError(msg)
+            self._lengths.setdefault(reg, len(bitstr))
+            self._counts.setdefault(reg, Counter())[bitstr] += 1
+        if self.strict_names and bitstrs.keys() != self._counts.keys():
+            msg = "All shots must have the same registers."
+            raise ValueError(msg)
+
+    def result(self) -> dict[str, Counter[str]]:
+        return self._counts
+
+
+class CollatedCounts(ShotAggregator[Counter[tuple[tuple[str, str], ...]]]):
+    """Counts collated bitstrings over shots.
+
+    Streaming equivalent of :py:meth:`EmulatorResult.collated_counts`.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Counter[tuple[tuple[str, str], ...]] = Counter()
+
+    def add(self, shot: QsysShot) -> None:
+        self._counts.update(QsysResult([shot]).collated_counts())
+
+    def result(self) -> Counter[tuple[tuple[str, str], ...]]:
+        return self._counts
+
+
+class TagHistogram(ShotAggregator[Counter[DataPrimitive | tuple[DataPrimitive, ...]]]):
+    """Counts how often each value was recorded for a given tag.
+
+    If a tag is written multiple times in a shot, only the last value is counted. Shots
+    that don't record the tag are skipped. List values are counted as tuples.
+    """
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self._counts: Counter[DataPrimitive | tuple[DataPrimitive, ...]] = Counter()
+
+    def add(self, shot: QsysShot) -> None:
+        values = shot.as_dict()
+        if self.tag in values:
+            value = values[self.tag]
+            self._counts[tuple(value) if isinstance(value, list) else value] += 1
+
+    def result(self) -> Counter[DataPrimitive | tuple[DataPrimitive, ...]]:
+        return self._counts
@@ -4,7 +4,16 @@ Compiling and building emulator instances for guppy programs.
 
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import importlib.metadata
+import json
+import re
+import shutil
+import tempfile
 from dataclasses import dataclass, replace
+from functools import cache
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import selene_sim
@@ -13,8 +22,7 @@ from typing_extensions import Self
 from .instance import EmulatorInstance
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
-    from pathlib import Path
+    from collections.abc import Mapping, Sequence
 
     from hugr.package import Package
     from selene_core import BuildPlanner, QuantumInterface, Utility
@@ -41,6 +49,9 @@ class EmulatorBuilder:
     _save_planner: bool = False
     _custom_args: dict[str, Any] | None = None
 
+    # persistent cache of built artifacts
+    _cache_dir: Path | None = None
+
     @property
     def name(self) -> str | None:
         """User specified name for the emulator instance. Defaults to None."""
@@ -62,6 +73,12 @@ class EmulatorBuilder:
         """Custom build arguments passed to selene_sim.build."""
         return dict(self._custom_args) if self._custom_args is not None else None
 
+    @property
+    def cache_dir(self) -> Path | None:
+        """Directory of a persistent cache of built emulator instances. Defaults to
+        None, in which case every call to `build` runs the full build pipeline."""
+        return self._cache_dir
+
     def with_name(self, value: str | None) -> Self:
         """Set the name for the emulator instance."""
         return replace(self, _name=value)
@@ -71,6 +88,24 @@ class EmulatorBuilder:
         see `EmulatorBuilder.build_dir`."""
         return replace(self, _build_dir=value)
 
+    def with_cache_dir(self, value: Path | str | None) -> Self:
+        """Set the directory in which built emulator instances are cached,
+        see `EmulatorBuilder.cache_dir`.
+
+        Builds are keyed by the serialized package together with the builder
+        options that affect the build output (name, interface, utilities, planner,
+        strictness and custom build arguments). Building a package that has been
+        built before with the same options returns an instance over the cached
+        artifacts instead of rebuilding. When the cache is enabled, instances are
+        built inside the cache directory and `build_dir` is ignored for cached
+        builds.
+
+        Options whose representation is not determined by their content (e.g.
+        objects without a custom ``__repr__``) cannot be part of a cache key, so
+        builds using them are never cached.
+        """
+        return replace(self, _cache_dir=Path(value) if value is not None else None)
+
     def with_verbose(self, value: bool) -> Self:
         """Set whether to print verbose output during the build process."""
         return replace(self, _verbose=value)
@@ -110,11 +145,42 @@ class EmulatorBuilder:
         Returns:
             An EmulatorInstance that can be used to run the compiled program.
         """
+        key = self._cache_key(package)
+        if key is None:
+            instance = self._build(package, self._build_dir)
+        else:
+            assert self._cache_dir is not None
+            entry = self._cache_dir / key
+            instance = _load_instance(entry)
+            if instance is None:
+                # Build into a private directory that is only moved into the cache
+                # once it is complete, so concurrent builds of the same package don't
+                # interfere with each other
+                self._cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = Path(tempfile.mkdtemp(prefix=f"{key}.", dir=self._cache_dir))
+                try:
+                    built = self._build(package, tmp)
+                    _store_instance(tmp, built)
+                    _commit_entry(tmp, entry)
+                    instance = _load_instance(entry)
+                except BaseException:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    raise
+                if instance is None:
+                    # The build couldn't be moved into the cache, so we keep using it
+                    # from its private directory
+                    instance = built
+                else:
+                    shutil.rmtree(tmp, ignore_errors=True)
+
+        return EmulatorInstance(_instance=instance, _n_qubits=n_qubits)
 
-        instance = selene_sim.build(  # type: ignore[attr-defined]
+    def _build(self, package: Package, build_dir: Path | None) -> Any:
+        """Runs the selene build pipeline."""
+        return selene_sim.build(  # type: ignore[attr-defined]
             package,
             name=self._name,
-            build_dir=self._build_dir,
+            build_dir=build_dir,
             interface=self._interface,
             utilities=self._utilities,
             verbose=self._verbose,
@@ -125,4 +191,171 @@ class EmulatorBuilder:
             **self._custom_args or {},
         )
 
-        return EmulatorInstance(_instance=instance, _n_qubits=n_qubits)
+    def _cache_key(self, package: Package) -> str | None:
+        """Computes the key under which the instance built from `package` is cached.
+
+        Returns `None` if the cache is disabled or if the build options can't be
+        identified by their content.
+        """
+        if self._cache_dir is None:
+            return None
+        options = [
+            self._name,
+            self._interface,
+            self._utilities,
+            self._planner,
+            self._strict,
+            sorted((self._custom_args or {}).items()),
+        ]
+        option_reprs = [repr(option) for option in options]
+        # The default `object.__repr__` includes the memory address of the object
+        if any(" at 0x" in r for r in option_reprs):
+            return None
+
+        hasher = hashlib.sha256()
+        plugins = [self._interface, self._planner, *(self._utilities or [])]
+        for version in _build_versions(plugins):
+            hasher.update(version.encode())
+        hasher.update(package.to_bytes())
+        for r in option_reprs:
+            hasher.update(r.encode())
+        return hasher.hexdigest()
+
+
+_MANIFEST = "guppy-cache.json"
+
+#: Distribution that provides the build pipeline
+_BUILD_DISTRIBUTION = "selene-sim"
+
+
+def _build_versions(plugins: Sequence[object]) -> list[str]:
+    """Returns the versions of all distributions that take part in a build.
+
+    These are the transitive requirements of selene-sim, e.g. the compiler from HUGR
+    to QIS and the runtime libraries, together with the distributions providing the
+    given plugins, e.g. custom utilities.
+    """
+    dists = set(_requirements(_BUILD_DISTRIBUTION))
+    providers = _packages_distributions()
+    for plugin in plugins:
+        if plugin is not None:
+            module = type(plugin).__module__.partition(".")[0]
+            dists.update(_normalize(d) for d in providers.get(module, []))
+    return [f"{dist}=={_version(dist)}" for dist in sorted(dists)]
+
+
+@cache
+def _packages_distributions() -> Mapping[str, list[str]]:
+    """Returns the distributions providing each top-level module.
+
+    Cached since this scans the metadata of all installed distributions.
+    """
+    return importlib.metadata.packages_distributions()
+
+
+def _version(dist: str) -> str | None:
+    """Returns the installed version of a distribution, or `None` if it is missing."""
+    try:
+        return importlib.metadata.version(dist)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+@cache
+def _requirements(dist: str) -> frozenset[str]:
+    """Returns a distribution together with its transitive requirements.
+
+    Optional requirements behind extras are ignored. Other environment markers are
+    not evaluated, so the result may include distributions that aren't installed.
+    """
+    todo, seen = [_normalize(dist)], set()
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            requirements = importlib.metadata.requires(name) or []
+        except importlib.metadata.PackageNotFoundError:
+            continue
+        todo += [
+            _normalize(re.split(r"[\s;<>=!~\[(]", req, maxsplit=1)[0])
+            for req in requirements
+            if "extra ==" not in req
+        ]
+    return frozenset(seen)
+
+
+def _normalize(dist: str) -> str:
+    """Normalizes a distribution name as described in PEP 503."""
+    return re.sub(r"[-_.]+", "-", dist).lower()
+
+
+def _read_manifest(entry: Path) -> tuple[Path, list[Path]] | None:
+    """Reads the executable and library search directories of a cached instance,
+    returning `None` if there is no complete entry."""
+    try:
+        manifest = json.loads((entry / _MANIFEST).read_text())
+        executable = entry / manifest["executable"]
+        library_search_dirs = [entry / p for p in manifest["library_search_dirs"]]
+    except Exception:  # noqa: BLE001
+        # A missing or corrupt entry is just treated like a cache miss
+        return None
+    if not executable.is_file() or not all(p.is_dir() for p in library_search_dirs):
+        return None
+    return executable, library_search_dirs
+
+
+def _load_instance(entry: Path) -> Any:
+    """Looks up a built instance in the cache, returning `None` if there is no
+    complete entry.
+
+    Every instance gets its own temporary directory for the results of its runs, so
+    instances loaded from the same entry can run concurrently. Like the build
+    directories created by selene when no `build_dir` is given, it lives outside of
+    the cache and isn't removed, since results may refer to files inside of it.
+    """
+    manifest = _read_manifest(entry)
+    if manifest is None:
+        return None
+    executable, library_search_dirs = manifest
+    return selene_sim.SeleneInstance(  # type: ignore[attr-defined]
+        root=entry,
+        artifacts=entry / "artifacts",
+        runs=Path(tempfile.mkdtemp(prefix="selene_runs_")),
+        executable=executable,
+        library_search_dirs=library_search_dirs,
+    )
+
+
+def _store_instance(root: Path, instance: Any) -> None:
+    """Records the information required to reconstruct a freshly built instance.
+
+    Paths inside of the build directory are stored relative to it, so the directory
+    can be moved into the cache afterwards.
+    """
+    manifest = {
+        "executable": str(Path(instance.executable).relative_to(root)),
+        "library_search_dirs": [
+            str(Path(p).relative_to(root)) if Path(p).is_relative_to(root) else str(p)
+            for p in instance.library_search_dirs
+        ],
+    }
+    (root / _MANIFEST).write_text(json.dumps(manifest))
+
+
+def _commit_entry(tmp: Path, entry: Path) -> None:
+    """Atomically moves a complete build into the cache.
+
+    If another process has committed the same entry in the meantime, its build is
+    kept and ours is discarded.
+    """
+    try:
+        tmp.replace(entry)
+    except OSError:
+        if _read_manifest(entry) is not None:
+            return
+        # The entry is incomplete, e.g. since it was written by an older version
+        shutil.rmtree(entry, ignore_errors=True)
+        with contextlib.suppress(OSError):
+            tmp.replace(entry)
@@ -0,0 +1,241 @@
+"""
+Columnar storage of emulation results.
+
+:py:class:`EmulatorResult` stores every shot as a list of tagged Python values, which
+makes post-processing of many shots slow. :py:class:`ColumnarResult` instead stores one
+NumPy array per tag with the shots along the first axis, so counts and conversions are
+vectorised operations.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from hugr.qsystem.result import REG_INDEX_PATTERN
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+    from hugr.qsystem.result import QsysShot
+    from pytket.backends.backendresult import BackendResult
+
+__all__ = ["ColumnarResult"]
+
+
+@dataclass(frozen=True)
+class ColumnarResult:
+    """Emulation results stored as one NumPy array per tag.
+
+    The array for a tag has the shots along its first axis. Tags holding single values
+    yield arrays of shape ``(shots,)`` and tags holding lists yield arrays of shape
+    ``(shots, length)``. Shots that don't record a tag are marked as missing in the
+    mask for that tag and are filled with zeros. If a tag is written multiple times in
+    a shot, the last value is stored.
+
+    Follows the register convention of :py:class:`EmulatorResult`, with the difference
+    that the width of a register is fixed across all shots. Registers assembled from
+    tags like ``reg[3]`` have the width of the largest index plus one, with unset bits
+    being ``0``.
+    """
+
+    #: Number of shots
+    n_shots: int
+
+    #: Mapping from tags to the values recorded in each shot
+    columns: dict[str, np.ndarray]
+
+    #: Mapping from tags to boolean arrays marking the shots that recorded the tag
+    masks: dict[str, np.ndarray]
+
+    @staticmethod
+    def from_shots(shots: Iterable[QsysShot]) -> ColumnarResult:
+        """Collects the given shots into columns.
+
+        The shots are only iterated once, so this can directly consume the stream
+        produced by :py:meth:`EmulatorInstance.iter_shots`.
+
+        Raises:
+            ValueError: If a tag holds lists of different lengths in different shots,
+                or a mix of lists and single values.
+        """
+        values: dict[str, list[Any]] = defaultdict(list)
+        indices: dict[str, list[int]] = defaultdict(list)
+        n_shots = 0
+        for shot in shots:
+            for tag, value in shot.as_dict().items():
+                values[tag].append(value)
+                indices[tag].append(n_shots)
+            n_shots += 1
+
+        columns, masks = {}, {}
+        for tag, vs in values.items():
+            try:
+                present = np.asarray(vs)
+            except ValueError:
+                present = np.asarray(vs, dtype=object)
+            if present.dtype == object:
+                msg = f"Values for tag `{tag}` must have the same length in all shots"
+                raise ValueError(msg)
+            column = np.zeros((n_shots, *present.shape[1:]), dtype=present.dtype)
+            column[indices[tag]] = present
+            mask = np.zeros(n_shots, dtype=bool)
+            mask[indices[tag]] = True
+            columns[tag], masks[tag] = column, mask
+        return ColumnarResult(n_shots, columns, masks)
+
+    @property
+    def tags(self) -> list[str]:
+        """The recorded tags, in order of their first occurrence."""
+        return list(self.columns)
+
+    def __getitem__(self, tag: str) -> np.ndarray:
+        return self.columns[tag]
+
+    def register_bits(self) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """Assembles the registers of each shot as boolean arrays.
+
+        Returns:
+            A dictionary mapping register names to a tuple of a boolean array of shape
+            ``(shots, width)`` holding the register bits, and a mask of the shots in
+            which the register was recorded.
+
+        Raises:
+            ValueError: If a register value is not in ``{0, 1}``, or if a register is
+                recorded both as a whole and via individual indices.
+        """
+        whole: dict[str, np.ndarray] = {}
+        indexed: dict[str, dict[int, np.ndarray]] = defaultdict(dict)
+        for tag, column in self.columns.items():
+            match = re.match(REG_INDEX_PATTERN, tag)
+            if match is not None:
+                reg, idx = match.groups()
+                indexed[reg][int(idx)] = _to_bits(column, tag)
+            else:
+                bits = _to_bits(column, tag)
+                whole[tag] = bits if bits.ndim == 2 else bits[:, np.newaxis]
+
+        registers: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for reg, bits in whole.items():
+            if reg in indexed:
+                msg = f"Register `{reg}` is recorded both as a whole and by index"
+                raise ValueError(msg)
+            registers[reg] = bits, self.masks[reg]
+        for reg, index_bits in indexed.items():
+            width = max(index_bits) + 1
+            reg_bits = np.zeros((self.n_shots, width), dtype=bool)
+            mask = np.zeros(self.n_shots, dtype=bool)
+            for idx, column in index_bits.items():
+                reg_bits[:, idx] = column
+                mask |= self.masks[f"{reg}[{idx}]"]
+            registers[reg] = reg_bits, mask
+        return registers
+
+    def packed_registers(self) -> dict[str, np.ndarray]:
+        """Packs the bits of each register into bytes in big-endian order.
+
+        Shots that don't record a register are filled with zeros.
+
+        Returns:
+            A dictionary mapping register names to ``uint8`` arrays of shape
+            ``(shots, ceil(width / 8))``.
+        """
+        return {
+            reg: np.packbits(bits, axis=1, bitorder="big")
+            for reg, (bits, _) in self.register_bits().items()
+        }
+
+    def register_counts(self) -> dict[str, Counter[str]]:
+        """Counts the bitstrings of each register over the shots in which it was
+        recorded.
+
+        Vectorised equivalent of :py:meth:`EmulatorResult.register_counts`.
+        """
+        counts = {}
+        for reg, (bits, mask) in self.register_bits().items():
+            width = bits.shape[1]
+            if 0 < width <= 63:
+                # Count the registers as integers, which is much faster than counting
+                # rows of a boolean array
+                weights = 1 << np.arange(width - 1, -1, -1, dtype=np.int64)
+                values, value_counts = np.unique(
+                    bits[mask] @ weights, return_counts=True
+                )
+                strs = [format(v, f"0{width}b") for v in values.tolist()]
+            else:
+                rows, value_counts = np.unique(bits[mask], axis=0, return_counts=True)
+                strs = ["".join("1" if b else "0" for b in row) for row in rows]
+            counts[reg] = Counter(dict(zip(strs, value_counts.tolist(), strict=True)))
+        return counts
+
+    def to_pytket(self) -> BackendResult:
+        """Convert results to a pytket BackendResult.
+
+        Returns:
+            BackendResult: A BackendResult object with the shots.
+
+        Raises:
+            ImportError: If pytket is not installed.
+            ValueError: If not all registers are present in all shots.
+        """
+        try:
+            from pytket._tket.unit_id import Bit
+            from pytket.backends.backendresult import BackendResult
+            from pytket.utils.outcomearray import OutcomeArray
+        except ImportError as e:
+            msg = "Pytket is an optional dependency, install with the `pytket` extra"
+            raise ImportError(msg) from e
+        registers = self.register_bits()
+        if not all(mask.all() for _, mask in registers.values()):
+            msg = "All shots must have the same registers."
+            raise ValueError(msg)
+        bits = [
+            Bit(reg, i)
+            for reg, (reg_bits, _) in registers.items()
+            for i in range(reg_bits.shape[1])
+        ]
+        all_bits = np.concatenate(
+            [np.zeros((self.n_shots, 0), dtype=bool)]
+            + [reg_bits for reg_bits, _ in registers.values()],
+            axis=1,
+        )
+        outcomes = OutcomeArray(
+            np.packbits(all_bits, axis=1, bitorder="big"), width=len(bits)
+        )
+        return BackendResult(shots=outcomes, c_bits=bits)
+
+    def save(self, path: Path | str) -> None:
+        """Stores the results in a compressed NumPy ``.npz`` file."""
+        # Tags are not necessarily valid file names inside the archive, so we store
+        # them separately and index the columns by position
+        arrays: dict[str, Any] = {
+            "n_shots": np.asarray(self.n_shots),
+            "tags": np.asarray(self.tags, dtype=str),
+        }
+        for i, tag in enumerate(self.tags):
+            arrays[f"column_{i}"] = self.columns[tag]
+            arrays[f"mask_{i}"] = self.masks[tag]
+        np.savez_compressed(path, **arrays)
+
+    @staticmethod
+    def load(path: Path | str) -> ColumnarResult:
+        """Loads results that were stored via :py:meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            tags = [str(tag) for tag in data["tags"]]
+            return ColumnarResult(
+                int(data["n_shots"]),
+                {tag: data[f"column_{i}"] for i, tag in enumerate(tags)},
+                {tag: data[f"mask_{i}"] for i, tag in enumerate(tags)},
+            )
+
+
+def _to_bits(column: np.ndarray, tag: str) -> np.ndarray:
+    """Converts a column of register values into a boolean array."""
+    if not np.isin(column, (0, 1)).all():
+        msg = f"Expected bit data for register `{tag}`"
+        raise ValueError(msg)
+    return column.astype(bool)
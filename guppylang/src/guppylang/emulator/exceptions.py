@@ -7,21 +7,33 @@ class EmulatorError(Exception):
     completed_shots: EmulatorResult
     failing_shot: QsysShot
     underlying_exception: Exception | None
+    #: When shots are run in parallel shards, the errors of all failing shards in shot
+    #: order. The failing shot and underlying exception are those of the first one.
+    shard_errors: list["EmulatorError"]
 
     def __init__(
         self,
         completed_shots: EmulatorResult,
         failing_shot: QsysShot,
         underlying_exception: Exception | None = None,
+        failed_shot_index: int | None = None,
+        shard_errors: list["EmulatorError"] | None = None,
     ):
         super().__init__(str(underlying_exception))
         self.completed_shots = completed_shots
         self.failing_shot = failing_shot
         self.underlying_exception = underlying_exception
+        self._failed_shot_index = failed_shot_index
+        self.shard_errors = shard_errors or []
 
     @property
     def failed_shot_index(self) -> int:
-        """The index of the shot that failed."""
+        """The index of the shot that failed.
+
+        When streaming shots, completed shots are not retained, so the index is
+        recorded separately."""
+        if self._failed_shot_index is not None:
+            return self._failed_shot_index
         return len(self.completed_shots.results)
 
 
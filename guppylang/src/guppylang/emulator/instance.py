@@ -4,9 +4,14 @@ Configuring and executing emulator instances for guppy programs.
 
 from __future__ import annotations
 
+import queue
+import tempfile
+import threading
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, replace
-from typing import TYPE_CHECKING, Any, cast
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
 from hugr.qsystem.result import QsysShot
 from selene_sim.backends.bundled_error_models import IdealErrorModel
@@ -22,7 +27,6 @@ from .result import EmulatorResult
 if TYPE_CHECKING:
     import datetime
     from collections.abc import Iterator
-    from pathlib import Path
 
     from hugr.qsystem.result import TaggedResult
     from selene_core.error_model import ErrorModel
@@ -30,6 +34,10 @@ if TYPE_CHECKING:
     from selene_core.simulator import Simulator
     from selene_sim.instance import SeleneInstance
 
+    from .aggregate import ShotAggregator
+
+T = TypeVar("T")
+
 
 @dataclass(frozen=True)
 class _Options:
@@ -214,10 +222,29 @@ class EmulatorInstance:
     def run(self) -> EmulatorResult:
         """Run the emulator instance and return the results.
         By default runs one shot, this can be configured with `with_shots()`."""
-        result_stream = self._run_instance()
-
         all_results: list[QsysShot] = []
-        for shot in self._iterate_shots(result_stream):
+        try:
+            # Shots that complete before a failure are kept in `all_results`
+            all_results.extend(self.iter_shots())
+        except EmulatorError as e:
+            raise EmulatorError(
+                completed_shots=EmulatorResult(all_results),
+                failing_shot=e.failing_shot,
+                underlying_exception=e.underlying_exception,
+            ) from None
+        return EmulatorResult(all_results)
+
+    def iter_shots(self) -> Iterator[QsysShot]:
+        """Run the emulator instance and yield the results of each shot as soon as it
+        completes.
+
+        Unlike :py:meth:`run`, shots are not retained after they have been yielded, so
+        memory usage does not grow with the number of shots. If a shot fails, an
+        :py:class:`EmulatorError` is raised that records the index of the failing shot,
+        but does not include any completed shots.
+        """
+        result_stream = self._run_instance()
+        for index, shot in enumerate(self._iterate_shots(result_stream)):
             shot_results = QsysShot()
             try:
                 for tag, value in shot:
@@ -226,13 +253,156 @@ class EmulatorInstance:
                 # In this case, casting a wide net on exceptions is
                 # suitable.
                 raise EmulatorError(
-                    completed_shots=EmulatorResult(all_results),
+                    completed_shots=EmulatorResult(),
                     failing_shot=shot_results,
                     underlying_exception=e,
+                    failed_shot_index=index,
                 ) from None
-            all_results.append(shot_results)
+            yield shot_results
+
+    def run_stream(self, aggregator: ShotAggregator[T]) -> T:
+        """Run the emulator instance and reduce the shots with the given aggregator
+        as they arrive.
+
+        For example, register counts over many shots can be computed in constant
+        memory via:
+
+        .. code-block:: python
+
+            from guppylang.emulator.aggregate import RegisterCounts
+
+            foo.emulator(n_qubits=1).with_shots(10**6).run_stream(RegisterCounts())
+        """
+        for shot in self.iter_shots():
+            aggregator.add(shot)
+        return aggregator.result()
+
+    def run_parallel(self, workers: int) -> EmulatorResult:
+        """Run the emulator instance with the shots split across `workers` shards that
+        are emulated concurrently, and return the merged results in shot order.
+
+        Each shard runs a contiguous range of shot numbers in its own selene
+        process(es). Since the random seed of every shot is derived from the seed of
+        the instance and the shot number, the results are identical to those of
+        :py:meth:`run` for a fixed seed, independent of the number of workers.
+
+        Unlike :py:meth:`run`, a failing shot only aborts the remaining shots of its
+        own shard. If any shard fails, an :py:class:`EmulatorError` is raised after all
+        other shards have finished. Its completed shots include the shots of all
+        shards, and its `shard_errors` hold the errors of each failing shard.
+        """
+        all_results: list[QsysShot] = []
+        try:
+            all_results.extend(self.iter_shots_parallel(workers))
+        except EmulatorError as e:
+            raise EmulatorError(
+                completed_shots=EmulatorResult(all_results),
+                failing_shot=e.failing_shot,
+                underlying_exception=e.underlying_exception,
+                failed_shot_index=e.failed_shot_index,
+                shard_errors=e.shard_errors,
+            ) from None
         return EmulatorResult(all_results)
 
+    def iter_shots_parallel(self, workers: int) -> Iterator[QsysShot]:
+        """Run the emulator instance with the shots split across `workers` concurrently
+        emulated shards, and yield the results of each shot in shot order.
+
+        Shots are yielded as soon as they and all previous shots have completed, so
+        only shots of later shards that complete early are buffered. See
+        :py:meth:`run_parallel` for how shots are sharded and failures are reported.
+        The event hook of the instance is shared by all shards.
+        """
+        if workers < 1:
+            raise ValueError("Number of workers must be positive")
+        shards = self._shards(workers)
+        if not shards:
+            return
+        queues: list[queue.Queue[QsysShot | Exception | None]] = [
+            queue.Queue() for _ in shards
+        ]
+        stop = threading.Event()
+        progress_bar = (
+            tqdm(total=self.shots, desc="Emulating shots")
+            if self._options._display_progress_bar
+            else None
+        )
+
+        def run_shard(shard: EmulatorInstance, q: queue.Queue[Any]) -> None:
+            try:
+                for shot in shard.iter_shots():
+                    q.put(shot)
+                    if progress_bar is not None:
+                        progress_bar.update()
+                    if stop.is_set():
+                        break
+            except Exception as e:  # noqa: BLE001
+                # Errors are passed on to the consumer
+                q.put(e)
+            finally:
+                q.put(None)
+
+        errors: list[EmulatorError] = []
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            try:
+                for (_, shard), q in zip(shards, queues, strict=True):
+                    executor.submit(run_shard, shard, q)
+                for (start, _), q in zip(shards, queues, strict=True):
+                    while (item := q.get()) is not None:
+                        if isinstance(item, EmulatorError):
+                            errors.append(
+                                EmulatorError(
+                                    completed_shots=EmulatorResult(),
+                                    failing_shot=item.failing_shot,
+                                    underlying_exception=item.underlying_exception,
+                                    failed_shot_index=start + item.failed_shot_index,
+                                )
+                            )
+                        elif isinstance(item, Exception):
+                            raise item
+                        else:
+                            yield item
+            finally:
+                # Make the remaining shards exit early if the consumer stopped
+                stop.set()
+                if progress_bar is not None:
+                    progress_bar.close()
+
+        if errors:
+            raise EmulatorError(
+                completed_shots=EmulatorResult(),
+                failing_shot=errors[0].failing_shot,
+                underlying_exception=errors[0].underlying_exception,
+                failed_shot_index=errors[0].failed_shot_index,
+                shard_errors=errors,
+            )
+
+    def _shards(self, workers: int) -> list[tuple[int, EmulatorInstance]]:
+        """Splits the shots into at most `workers` contiguous shards.
+
+        Returns the index of the first shot of each shard together with an instance
+        running the shots of the shard. Every shard gets a separate directory for its
+        selene runs, so that shards don't race on creating run directories.
+        """
+        n_shards = min(workers, self.shots)
+        if n_shards == 0:
+            return []
+        shard_size, remainder = divmod(self.shots, n_shards)
+        shards = []
+        start = 0
+        for i in range(n_shards):
+            n_shots = shard_size + (i < remainder)
+            runs = Path(tempfile.mkdtemp(prefix="shard-", dir=self._instance.runs))
+            shard = replace(self, _instance=replace(self._instance, runs=runs))
+            shard = shard._with_option(
+                _shots=n_shots,
+                _shot_offset=self.shot_offset + start * self.shot_increment,
+                _display_progress_bar=False,
+            )
+            shards.append((start, shard))
+            start += n_shots
+        return shards
+
     def _run_instance(self) -> Iterator[Iterator[TaggedResult]]:
         """Run the Selene instance with the given simulator lazily."""
         return self._instance.run_shots(
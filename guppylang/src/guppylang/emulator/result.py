@@ -4,15 +4,19 @@ Emulation results and post-processing.
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+import numpy as np
 from hugr.qsystem.result import QsysResult, QsysShot, TaggedResult
 from selene_sim.backends.bundled_simulators import Quest
 
+from .columnar import ColumnarResult
 from .state import PartialVector
 
 if TYPE_CHECKING:
     from collections import Counter
+    from collections.abc import Iterator, Sequence
 
     from hugr.qsystem.result import DataValue
     from pytket.backends.backendresult import BackendResult
@@ -92,6 +96,13 @@ class EmulatorResult(QsysResult):
     def collated_digitstring_counts(self) -> Counter[tuple[tuple[str, str], ...]]:
         return super().collated_digitstring_counts()
 
+    def to_columnar(self) -> ColumnarResult:
+        """Convert results to columnar storage with one NumPy array per tag.
+
+        See :py:class:`ColumnarResult` for vectorised post-processing of many shots.
+        """
+        return ColumnarResult.from_shots(self.results)
+
     def partial_state_dicts(self) -> list[dict[str, PartialVector]]:
         """Extract state results from shot results in to dictionaries.
 
@@ -127,3 +138,105 @@ class EmulatorResult(QsysResult):
                 for shot in self.results
             ]
         return self._partial_states
+
+    def iter_partial_states(
+        self, mmap: bool = False, cleanup: bool = False
+    ) -> Iterator[tuple[int, str, PartialVector]]:
+        """Lazily extract state results from shot results, one state at a time.
+
+        Unlike :py:meth:`partial_states`, states are not retained after they have been
+        yielded, so only a single state is held in memory at a time. If the states
+        have already been extracted via :py:meth:`partial_states`, those are yielded.
+
+        Note that the state files are kept by default, whereas :py:meth:`partial_states`
+        removes them once they have been read. This way, the states can be iterated
+        over repeatedly, e.g. by the reductions :py:meth:`state_probabilities` and
+        :py:meth:`state_expectations`. Pass `cleanup=True` to free the disk space
+        taken up by the state files on the last pass over the states.
+
+        Args:
+            mmap: Whether to memory-map the state files instead of reading them into
+                memory. Can't be combined with `cleanup`.
+            cleanup: Whether to remove each state file after it has been read. The
+                states can then not be extracted again.
+
+        Yields:
+            Tuples of (shot index, string tag, PartialVector).
+        """
+        if mmap and cleanup:
+            raise ValueError("Memory-mapped state files can't be cleaned up")
+        if self._partial_states is not None:
+            for shot_idx, states in enumerate(self._partial_states):
+                for tag, state in states:
+                    yield shot_idx, tag, state
+            return
+        for shot_idx, shot in enumerate(self.results):
+            if mmap:
+                for tag, path in _state_files(shot):
+                    yield shot_idx, tag, PartialVector.from_file(path, mmap=True)
+            else:
+                for tag, inner in Quest.extract_states(shot, cleanup=cleanup):
+                    yield shot_idx, tag, PartialVector._from_inner(inner)
+
+    def state_probabilities(
+        self, tag: str, qubits: Sequence[int] | None = None, mmap: bool = False
+    ) -> np.ndarray:
+        """Marginal computational basis probabilities of all states recorded with the
+        given tag, see :py:meth:`PartialVector.probabilities`.
+
+        States are loaded one at a time, see :py:meth:`iter_partial_states`.
+
+        Returns:
+            Array of shape ``(n_states, 2 ** len(qubits))`` with one row for each
+            state in shot order. If `qubits` is not given, all qubits specified in the
+            `state_result` call are included. If there are no states with the tag,
+            the number of qubits is unknown in that case, so an array of shape
+            ``(0, 0)`` is returned.
+        """
+        rows = [
+            state.probabilities(qubits)
+            for _, state_tag, state in self.iter_partial_states(mmap=mmap)
+            if state_tag == tag
+        ]
+        if rows:
+            return np.array(rows)
+        width = 1 << len(qubits) if qubits is not None else 0
+        return np.zeros((0, width))
+
+    def state_expectations(
+        self, tag: str, pauli: str, mmap: bool = False
+    ) -> np.ndarray:
+        """Expectation values of a Pauli string for all states recorded with the given
+        tag, see :py:meth:`PartialVector.expectation`.
+
+        States are loaded one at a time, see :py:meth:`iter_partial_states`.
+
+        Returns:
+            Array with one expectation value for each state in shot order.
+        """
+        return np.array(
+            [
+                state.expectation(pauli)
+                for _, state_tag, state in self.iter_partial_states(mmap=mmap)
+                if state_tag == tag
+            ],
+            dtype=float,
+        )
+
+
+def _state_files(shot: QsysShot) -> Iterator[tuple[str, Path]]:
+    """Yields the tags and files of the state results recorded in a shot.
+
+    Selects the same entries as `Quest.extract_states`, but doesn't read the files.
+    """
+    # The plugin doesn't expose its tag convention publicly, so we import it lazily to
+    # keep the rest of this module working if it is moved
+    from selene_quest_plugin.plugin import _state_tag
+
+    for tag, value in shot.entries:
+        if (
+            (state_tag := _state_tag(tag)) is not None
+            and isinstance(value, str)
+            and (path := Path(value)).is_file()
+        ):
+            yield state_tag, path
@@ -4,14 +4,19 @@ Debug querying the internal state of the emulator.
 
 from __future__ import annotations
 
+import struct
 from dataclasses import dataclass
-from typing import Protocol, TypeVar
+from typing import TYPE_CHECKING, Protocol, TypeVar
 
 import numpy as np
 import numpy.typing as npt
 from selene_quest_plugin.state import SeleneQuestState, TracedState
 from typing_extensions import Self
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
 __all__ = [
     "NotSingleStateError",
     "PartialState",
@@ -134,10 +139,154 @@ class PartialVector(PartialState[StateVector]):
     def state_distribution(
         self, zero_threshold: float = 1e-12
     ) -> list[TracedState[StateVector]]:
-        out = self._inner.get_state_vector_distribution(zero_threshold=zero_threshold)
+        # The reduced density matrix is M M^dagger, where the rows of M are indexed by
+        # the specified and the columns by the traced out qubits. Its eigenvectors are
+        # the left singular vectors of M, so we decompose whichever of the two is
+        # smaller. The number of branches is bounded by the smaller dimension of M.
+        matrix = self._matrix()
+        if matrix.shape[0] <= matrix.shape[1]:
+            probs, vectors = np.linalg.eigh(matrix @ matrix.conj().T)
+        else:
+            vectors, singular_values, _ = np.linalg.svd(matrix, full_matrices=False)
+            probs = singular_values**2
+        probs = np.abs(probs)
+
+        # Prune negligible branches before materialising their vectors, most likely
+        # branches first
+        keep = probs >= probs.max() * zero_threshold
+        order = np.argsort(-probs[keep], kind="stable")
+        probs, vectors = probs[keep][order], vectors[:, keep][:, order]
+
+        if zero_threshold > 0:
+            # Set small (relative) components to zero for a cleaner output
+            cutoff = np.abs(vectors).max() * zero_threshold
+            vectors.real[np.abs(vectors.real) < cutoff] = 0
+            vectors.imag[np.abs(vectors.imag) < cutoff] = 0
+            # Fix the global phase by making the first non-zero component of each
+            # vector real and positive
+            first = vectors[np.argmax(vectors != 0, axis=0), np.arange(len(probs))]
+            vectors *= np.conj(first / np.abs(first))
 
         # force float to remove numpy types
-        return [TracedState(float(st.probability), st.state) for st in out]
+        return [
+            TracedState(float(p), vectors[:, i]) for i, p in enumerate(probs.tolist())
+        ]
+
+    def density_matrix(
+        self, zero_threshold: float = 1e-12
+    ) -> npt.NDArray[np.complex128]:
+        """Reduced density matrix of the specified qubits, with all other qubits
+        traced out.
+
+        Unlike :py:meth:`state_distribution`, this doesn't decompose the mixed state
+        into branches.
+
+        Args:
+            zero_threshold: Threshold relative to the largest entry below which
+                entries are set to zero. Defaults to 1e-12.
+        Returns:
+            Matrix of shape ``(2 ** k, 2 ** k)`` for ``k`` specified qubits, with the
+            first specified qubit as the most significant bit of the indices.
+        """
+        matrix = self._matrix()
+        rho: npt.NDArray[np.complex128] = matrix @ matrix.conj().T
+        if zero_threshold > 0:
+            cutoff = np.abs(rho).max() * zero_threshold
+            rho.real[np.abs(rho.real) < cutoff] = 0
+            rho.imag[np.abs(rho.imag) < cutoff] = 0
+        return rho
+
+    def probabilities(
+        self, qubits: Sequence[int] | None = None
+    ) -> npt.NDArray[np.float64]:
+        """Marginal probabilities of measuring the given specified qubits in the
+        computational basis, with all other qubits traced out.
+
+        Args:
+            qubits: Positions in :py:attr:`specified_qubits` of the qubits to compute
+                the probabilities for. Defaults to all specified qubits.
+        Returns:
+            Array of length ``2 ** len(qubits)`` indexed by the measured bitstring, with
+            the first given qubit as the most significant bit.
+        """
+        positions = range(len(self.specified_qubits)) if qubits is None else qubits
+        axes = [self._axis(self.specified_qubits[i]) for i in positions]
+        probs = np.abs(self._tensor()) ** 2
+        traced = tuple(ax for ax in range(self.total_qubits) if ax not in axes)
+        marginal = probs.sum(axis=traced)
+        # After summing, the remaining axes are in increasing order
+        order = np.argsort(np.argsort(axes))
+        return np.transpose(marginal, order).reshape(-1)
+
+    def expectation(self, pauli: str) -> float:
+        """Expectation value of a Pauli string on the specified qubits.
+
+        Args:
+            pauli: String over ``"IXYZ"`` with one character for each of the
+                :py:attr:`specified_qubits`, in the same order.
+        """
+        if len(pauli) != len(self.specified_qubits) or not set(pauli) <= set("IXYZ"):
+            raise ValueError(
+                f"Expected a Pauli string over `IXYZ` of length "
+                f"{len(self.specified_qubits)}, got `{pauli}`."
+            )
+        psi = self._tensor()
+        phi = psi
+        for qubit, op in zip(self.specified_qubits, pauli, strict=True):
+            axis = self._axis(qubit)
+            # Diagonal factors of the Pauli, broadcast along the axis of the qubit
+            shape = [1] * self.total_qubits
+            shape[axis] = 2
+            if op == "X":
+                phi = np.flip(phi, axis=axis)
+            elif op == "Y":
+                phi = np.flip(phi, axis=axis) * np.array([-1j, 1j]).reshape(shape)
+            elif op == "Z":
+                phi = phi * np.array([1, -1]).reshape(shape)
+        return float(np.vdot(psi, phi).real)
+
+    def _matrix(self) -> npt.NDArray[np.complex128]:
+        """The base state as a matrix whose rows are indexed by the specified qubits,
+        with the first one as the most significant bit, and whose columns are indexed
+        by the traced out qubits."""
+        specified = [self._axis(q) for q in self.specified_qubits]
+        traced = [ax for ax in range(self.total_qubits) if ax not in specified]
+        tensor = np.transpose(self._tensor(), specified + traced)
+        return tensor.reshape(1 << len(specified), 1 << len(traced))
+
+    def _tensor(self) -> npt.NDArray[np.complex128]:
+        """The base state as a tensor with one axis per qubit."""
+        state = np.asarray(self._inner.state, dtype=np.complex128)
+        return state.reshape([2] * self.total_qubits)
+
+    def _axis(self, qubit: int) -> int:
+        """The axis of a qubit in the tensor returned by :py:meth:`_tensor`.
+
+        Qubit 0 is the least significant bit of the state vector index."""
+        return self.total_qubits - 1 - qubit
+
+    @classmethod
+    def from_file(cls, path: Path, mmap: bool = False) -> Self:
+        """Load a state that was written by the Quest simulator.
+
+        Args:
+            path: The state file, as recorded in the results of a shot.
+            mmap: Whether to memory-map the base state instead of reading it into
+                memory. The file must not be removed while the state is in use.
+        """
+        if not mmap:
+            return cls._from_inner(
+                SeleneQuestState.parse_from_file(path, cleanup=False)
+            )
+        total_qubits, specified_qubits, offset = _read_state_header(path)
+        state = np.memmap(
+            path,
+            dtype=np.complex128,
+            mode="r",
+            offset=offset,
+            shape=(1 << total_qubits,),
+        )
+        return cls._from_inner(SeleneQuestState(state, total_qubits, specified_qubits))
 
     @classmethod
     def _from_inner(cls, inner: SeleneQuestState) -> Self:
@@ -152,3 +301,39 @@ class PartialVector(PartialState[StateVector]):
             f"PartialVector(total_qubits={self.total_qubits}, "
             f"specified_qubits={self.specified_qubits})"
         )
+
+
+#: Layout of the state files written by the Quest simulator, as read by
+#: `SeleneQuestState.parse_from_file`: The magic bytes are followed by the total number
+#: of qubits, the number of specified qubits, the specified qubits and the state vector.
+_STATE_FILE_MAGIC = b"selene-quest"
+_STATE_FILE_COUNTS = struct.Struct("<QQ")
+_STATE_FILE_QUBIT = struct.Struct("<Q")
+
+
+def _read_state_header(path: Path) -> tuple[int, list[int], int]:
+    """Reads the header of a state file written by the Quest simulator.
+
+    Returns the total number of qubits, the specified qubits and the offset of the state
+    vector in the file. Raises a `ValueError` if the file doesn't have the expected
+    layout, e.g. since the simulator changed its format.
+    """
+    with path.open("rb") as f:
+        if f.read(len(_STATE_FILE_MAGIC)) != _STATE_FILE_MAGIC:
+            raise ValueError(f"Invalid state file format: {path}")
+        counts = f.read(_STATE_FILE_COUNTS.size)
+        if len(counts) != _STATE_FILE_COUNTS.size:
+            raise ValueError(f"Truncated state file header: {path}")
+        total_qubits, n_specified = _STATE_FILE_COUNTS.unpack(counts)
+        qubits = f.read(_STATE_FILE_QUBIT.size * n_specified)
+        if len(qubits) != _STATE_FILE_QUBIT.size * n_specified:
+            raise ValueError(f"Truncated state file header: {path}")
+        specified_qubits = [q for (q,) in _STATE_FILE_QUBIT.iter_unpack(qubits)]
+        offset = f.tell()
+    expected_size = offset + np.dtype(np.complex128).itemsize * (1 << total_qubits)
+    if path.stat().st_size != expected_size:
+        raise ValueError(
+            f"State file {path} has size {path.stat().st_size}, but its header "
+            f"describes a state of {total_qubits} qubits ({expected_size} bytes)"
+        )
+    return total_qubits, specified_qubits, offset
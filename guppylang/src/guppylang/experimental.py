@@ -2,5 +2,14 @@ from guppylang_internals.experimental import (
     disable_experimental_features,
     enable_experimental_features,
 )
+from guppylang_internals.monomorphization import (
+    disable_lazy_monomorphization,
+    enable_lazy_monomorphization,
+)
 
-__all__ = ("disable_experimental_features", "enable_experimental_features")
+__all__ = (
+    "disable_experimental_features",
+    "disable_lazy_monomorphization",
+    "enable_experimental_features",
+    "enable_lazy_monomorphization",
+)
@@ -26,6 +26,8 @@ def create_bencher_BMF(pytest_benchmark_file: str, bencher_file: str) -> None:
             if extra_info.get("nodes"):
                 nodes_info = extra_info["nodes"]
                 BMF[name]["hugr_nodes"] = {"value": nodes_info}
+            if extra_info.get("peak_memory"):
+                BMF[name]["peak_memory"] = {"value": extra_info["peak_memory"]}
 
     with Path(bencher_file).open("w") as bmf_file:
         json.dump(BMF, bmf_file)
@@ -0,0 +1,191 @@
+"""Benchmarks sweeping the size of generated programs along different dimensions.
+
+Each program is type checked and compiled in separate benchmarks so that regressions
+in the scaling of individual compiler phases can be told apart. Alongside the timings,
+the peak memory usage of each phase and the size of the resulting Hugr are stored in
+the `extra_info` of the benchmark.
+"""
+
+from collections.abc import Callable
+
+import pytest
+
+from tests.benchmarks.util import bench_check, bench_compile, load_guppy_module
+
+
+def many_functions(n: int) -> str:
+    """A chain of `n` functions, each calling the previous one."""
+    source = """
+    @guppy
+    def f0(x: int) -> int:
+        return x
+    """
+    for i in range(1, n):
+        source += f"""
+    @guppy
+    def f{i}(x: int) -> int:
+        return f{i - 1}(x) + {i}
+    """
+    return source + f"main = f{n - 1}\n"
+
+
+def many_blocks(n: int) -> str:
+    """A single function with `n` consecutive branches."""
+    branch = """
+        if b:
+            x += 1
+        else:
+            x -= 1"""
+    return f"""
+    @guppy
+    def main(b: bool, x: int) -> int:{branch * n}
+        return x
+    """
+
+
+def long_array(n: int) -> str:
+    """An array literal with `n` elements."""
+    elems = ", ".join(str(i) for i in range(n))
+    return f"""
+    @guppy
+    def main() -> int:
+        xs = array({elems})
+        s = 0
+        for x in xs:
+            s += x
+        return s
+    """
+
+
+def many_instantiations(n: int) -> str:
+    """A nat-generic function that is instantiated with `n` different array lengths."""
+    calls = "".join(
+        f"""
+        s += first(array({", ".join(["0"] * (k + 1))}))"""
+        for k in range(n)
+    )
+    return f"""
+    N = guppy.nat_var("N")
+
+    @guppy
+    def first(xs: array[int, N]) -> int:
+        return xs[0]
+
+    @guppy
+    def main() -> int:
+        s = 0{calls}
+        return s
+    """
+
+
+def long_trace(n: int) -> str:
+    """A comptime function emitting `2 * n` gates."""
+    return f"""
+    @guppy.comptime
+    def main(q1: qubit, q2: qubit) -> None:
+        for _ in range({n}):
+            h(q1)
+            cx(q1, q2)
+    """
+
+
+def big_circuit(n: int) -> str:
+    """A pytket circuit with `n` layers on 10 qubits."""
+    return f"""
+    from pytket import Circuit
+
+    circ = Circuit(10)
+    for i in range({n}):
+        circ.H(i % 10)
+        circ.CX(i % 10, (i + 1) % 10)
+        circ.Rz(0.1 * i, (i + 2) % 10)
+
+    pytket_circ = guppy.load_pytket("pytket_circ", circ)
+
+    @guppy
+    def main(qs: array[qubit, 10]) -> None:
+        pytket_circ(qs)
+    """
+
+
+def nested_structs(n: int) -> str:
+    """A struct nested `n` levels deep that is constructed and projected."""
+    source = """
+    @guppy.struct
+    class S0:
+        x: int
+    """
+    for i in range(1, n):
+        source += f"""
+    @guppy.struct
+    class S{i}:
+        inner: S{i - 1}
+        x: int
+    """
+    value = "S0(x)"
+    for i in range(1, n):
+        value = f"S{i}({value}, x)"
+    return (
+        source
+        + f"""
+    @guppy
+    def main(x: int) -> int:
+        s = {value}
+        return s{".inner" * (n - 1)}.x
+    """
+    )
+
+
+def nested_generic_calls(n: int) -> str:
+    """A chain of `n` nested generic calls whose type is inferred from the context."""
+    value = "nothing()"
+    for _ in range(n):
+        value = f"wrap({value})"
+    return f"""
+    from guppylang.std.option import Option, nothing
+
+    T = guppy.type_var("T")
+
+    @guppy
+    def wrap(x: Option[T]) -> Option[T]:
+        return x
+
+    @guppy
+    def main() -> Option[int]:
+        x: Option[int] = {value}
+        return x
+    """
+
+
+PROGRAMS: dict[str, tuple[Callable[[int], str], list[int]]] = {
+    "functions": (many_functions, [10, 50, 200]),
+    "blocks": (many_blocks, [10, 50, 200]),
+    "array_length": (long_array, [10, 100, 1000]),
+    "instantiations": (many_instantiations, [5, 20, 50]),
+    "trace_length": (long_trace, [100, 500, 2000]),
+    "circuit_size": (big_circuit, [10, 100, 500]),
+    "struct_depth": (nested_structs, [2, 6, 10]),
+    "call_depth": (nested_generic_calls, [5, 20, 50]),
+}
+
+SIZES = [
+    pytest.param(name, n, id=f"{name}-{n}")
+    for name, (_, sizes) in PROGRAMS.items()
+    for n in sizes
+]
+
+
+@pytest.mark.parametrize(("program", "size"), SIZES)
+def test_scaling_check(benchmark, tmp_path, program: str, size: int) -> None:
+    make_source, _ = PROGRAMS[program]
+    module = load_guppy_module(make_source(size), tmp_path)
+    benchmark.group = f"check-{program}"
+    bench_check(benchmark, module.main)
+
+
+@pytest.mark.parametrize(("program", "size"), SIZES)
+def test_scaling_compile(benchmark, tmp_path, program: str, size: int) -> None:
+    make_source, _ = PROGRAMS[program]
+    module = load_guppy_module(make_source(size), tmp_path)
+    benchmark.group = f"compile-{program}"
+    bench_compile(benchmark, module.main)
@@ -0,0 +1,77 @@
+"""Helpers for benchmarking the individual compiler phases on generated programs."""
+
+import importlib.util
+import itertools
+import sys
+import textwrap
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from guppylang_internals.engine import ENGINE
+
+# Number of measured rounds per benchmark. The scaling benchmarks are comparatively
+# expensive, so we don't let pytest-benchmark calibrate the number of rounds itself.
+ROUNDS = 3
+
+_module_ids = itertools.count()
+
+GUPPY_PRELUDE = """\
+from guppylang.decorator import guppy
+from guppylang.std.builtins import array, comptime, nat, owned, py
+from guppylang.std.quantum import cx, discard, discard_array, h, measure, qubit
+"""
+
+
+def load_guppy_module(source: str, tmp_path: Path) -> ModuleType:
+    """Imports a Python module with the given Guppy source code.
+
+    Guppy needs to be able to look up the source of definitions, so the code is written
+    to a file in `tmp_path` instead of being passed to `exec`.
+    """
+    name = f"guppy_bench_{next(_module_ids)}"
+    path = tmp_path / f"{name}.py"
+    path.write_text(GUPPY_PRELUDE + textwrap.dedent(source))
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def record_peak_memory(
+    benchmark: Any, f: Callable[[], Any], setup: Callable[[], Any]
+) -> None:
+    """Runs `f` once outside of the timed rounds and records its peak memory usage in
+    bytes."""
+    setup()
+    tracemalloc.start()
+    try:
+        f()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["peak_memory"] = peak
+
+
+def bench_check(benchmark: Any, defn: Any) -> None:
+    """Benchmarks type checking of a Guppy definition from a cold engine."""
+    record_peak_memory(benchmark, defn.check, setup=ENGINE.reset)
+    benchmark.pedantic(defn.check, setup=ENGINE.reset, rounds=ROUNDS)
+
+
+def bench_compile(benchmark: Any, defn: Any) -> None:
+    """Benchmarks lowering of an already checked Guppy definition to Hugr."""
+
+    def setup() -> None:
+        ENGINE.reset()
+        defn.check()
+
+    record_peak_memory(benchmark, defn.compile_function, setup=setup)
+    hugr = benchmark.pedantic(defn.compile_function, setup=setup, rounds=ROUNDS)
+    benchmark.extra_info["nodes"] = hugr.modules[0].num_nodes()
+    benchmark.extra_info["bytes"] = len(hugr.to_bytes())
@@ -0,0 +1,56 @@
+"""Unit tests for guppylang.emulator.aggregate module."""
+
+from __future__ import annotations
+
+from collections import Counter
+
+import pytest
+from guppylang.emulator.aggregate import (
+    CollatedCounts,
+    RegisterCounts,
+    ShotAggregator,
+    TagHistogram,
+)
+from guppylang.emulator.result import EmulatorResult, QsysShot
+
+SHOTS = [
+    QsysShot([("c", [0, 1]), ("b[1]", 1), ("n", 3)]),
+    QsysShot([("c", [1, 1]), ("b[0]", 1), ("n", 3)]),
+    QsysShot([("c", [0, 1]), ("n", 4), ("n", [1, 2])]),
+]
+
+
+def aggregate(aggregator: ShotAggregator, shots: list[QsysShot]):
+    for shot in shots:
+        aggregator.add(shot)
+    return aggregator.result()
+
+
+def test_register_counts():
+    shots = [QsysShot([("c", [0, 1]), ("b[1]", 1)]), QsysShot([("c", [1, 1])])]
+    assert (
+        aggregate(RegisterCounts(), shots)
+        == EmulatorResult(shots).register_counts()
+        == {"c": Counter({"01": 1, "11": 1}), "b": Counter({"01": 1})}
+    )
+
+
+def test_register_counts_strict():
+    shots = [QsysShot([("c", [0, 1])]), QsysShot([("c", [1])])]
+    with pytest.raises(ValueError, match="same length"):
+        aggregate(RegisterCounts(strict_lengths=True), shots)
+
+    shots = [QsysShot([("c", [0, 1])]), QsysShot([("d", [1])])]
+    with pytest.raises(ValueError, match="same registers"):
+        aggregate(RegisterCounts(strict_names=True), shots)
+
+
+def test_collated_counts():
+    shots = [QsysShot([("a", 1), ("a", 0)]), QsysShot([("a", [1, 0])])]
+    assert aggregate(CollatedCounts(), shots) == EmulatorResult(shots).collated_counts()
+    assert aggregate(CollatedCounts(), shots) == Counter({(("a", "10"),): 2})
+
+
+def test_tag_histogram():
+    assert aggregate(TagHistogram("n"), SHOTS) == Counter({3: 2, (1, 2): 1})
+    assert aggregate(TagHistogram("missing"), SHOTS) == Counter()
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
-from guppylang.emulator.builder import EmulatorBuilder
+from guppylang.emulator.builder import EmulatorBuilder, _requirements, _store_instance
 
 
 def test_emulator_builder_default_initialization():
@@ -27,6 +28,7 @@ def test_emulator_builder_default_initialization():
     assert builder._strict is False
     assert builder._save_planner is False
     assert builder._custom_args is None
+    assert builder._cache_dir is None
 
 
 @patch("guppylang.emulator.builder.selene_sim")
@@ -187,3 +189,172 @@ def test_emulator_builder_reuse():
         assert calls[1].kwargs["name"] == "reusable"
         assert calls[0].kwargs["verbose"] is True
         assert calls[1].kwargs["verbose"] is True
+
+
+def _fake_build(lib_dir: Path):
+    """Mimics `selene_sim.build` by writing an executable into the build dir."""
+
+    def build(package, build_dir, **kwargs):
+        executable = build_dir / "artifacts" / "program.selene.x"
+        executable.parent.mkdir(parents=True)
+        executable.write_bytes(package.to_bytes())
+        return SimpleNamespace(executable=executable, library_search_dirs=[lib_dir])
+
+    return build
+
+
+@patch("guppylang.emulator.builder.selene_sim")
+@patch("guppylang.emulator.builder.EmulatorInstance")
+def test_emulator_builder_cache(mock_emulator_instance, mock_selene_sim, tmp_path):
+    """Test that cached builds are reused."""
+    mock_selene_sim.build.side_effect = _fake_build(tmp_path)
+    package = Mock()
+    package.to_bytes.return_value = b"package"
+    cache_dir = tmp_path / "cache"
+    builder = EmulatorBuilder().with_cache_dir(cache_dir)
+
+    builder.build(package, 3)
+    assert mock_selene_sim.build.call_count == 1
+    [entry] = cache_dir.iterdir()
+    # The build happens in a temporary directory that is then moved into the cache
+    build_dir = mock_selene_sim.build.call_args.kwargs["build_dir"]
+    assert build_dir.parent == cache_dir
+    assert build_dir != entry
+
+    # Building again, also with options that don't affect the output, is a hit
+    builder.with_verbose(True).build(package, 5)
+    assert mock_selene_sim.build.call_count == 1
+    assert mock_selene_sim.SeleneInstance.call_count == 2
+    runs_dirs = []
+    for call in mock_selene_sim.SeleneInstance.call_args_list:
+        kwargs = dict(call.kwargs)
+        runs_dirs.append(kwargs.pop("runs"))
+        assert kwargs == {
+            "root": entry,
+            "artifacts": entry / "artifacts",
+            "executable": entry / "artifacts" / "program.selene.x",
+            "library_search_dirs": [tmp_path],
+        }
+    # Every instance gets its own runs directory outside of the cache
+    assert not any(runs.is_relative_to(cache_dir) for runs in runs_dirs)
+    assert runs_dirs[0] != runs_dirs[1]
+    mock_emulator_instance.assert_called_with(
+        _instance=mock_selene_sim.SeleneInstance.return_value, _n_qubits=5
+    )
+
+    # Changing the package or the build options is a miss
+    builder.with_build_arg("build_method", "via-llvm-ir").build(package, 3)
+    package.to_bytes.return_value = b"other package"
+    builder.build(package, 3)
+    assert mock_selene_sim.build.call_count == 3
+    assert len(list(cache_dir.iterdir())) == 3
+
+
+@patch("guppylang.emulator.builder.selene_sim")
+@patch("guppylang.emulator.builder.EmulatorInstance")
+def test_emulator_builder_cache_incomplete_entry(
+    mock_emulator_instance, mock_selene_sim, tmp_path
+):
+    """Test that entries with missing artifacts are rebuilt."""
+    mock_selene_sim.build.side_effect = _fake_build(tmp_path)
+    package = Mock()
+    package.to_bytes.return_value = b"package"
+    builder = EmulatorBuilder().with_cache_dir(tmp_path / "cache")
+
+    builder.build(package, 3)
+    [entry] = (tmp_path / "cache").iterdir()
+    (entry / "artifacts" / "program.selene.x").unlink()
+    builder.build(package, 3)
+    assert mock_selene_sim.build.call_count == 2
+    assert (entry / "artifacts" / "program.selene.x").is_file()
+    assert list((tmp_path / "cache").iterdir()) == [entry]
+
+
+@patch("guppylang.emulator.builder.selene_sim")
+@patch("guppylang.emulator.builder.EmulatorInstance")
+def test_emulator_builder_cache_concurrent_build(
+    mock_emulator_instance, mock_selene_sim, tmp_path
+):
+    """Test that a build committed by another process in the meantime is kept."""
+    package = Mock()
+    package.to_bytes.return_value = b"package"
+    builder = EmulatorBuilder().with_cache_dir(tmp_path / "cache")
+    entry = tmp_path / "cache" / builder._cache_key(package)
+    fake_build = _fake_build(tmp_path)
+
+    def racing_build(package, build_dir, **kwargs):
+        # Another process finishes the same build while we are still building
+        other_dir = tmp_path / "other"
+        other_dir.mkdir()
+        _store_instance(other_dir, fake_build(package, other_dir))
+        other_dir.rename(entry)
+        return fake_build(package, build_dir)
+
+    mock_selene_sim.build.side_effect = racing_build
+    builder.build(package, 3)
+    assert list((tmp_path / "cache").iterdir()) == [entry]
+    assert mock_selene_sim.SeleneInstance.call_args.kwargs["root"] == entry
+
+
+@patch("guppylang.emulator.builder.selene_sim")
+@patch("guppylang.emulator.builder.EmulatorInstance")
+def test_emulator_builder_cache_commit_failure(
+    mock_emulator_instance, mock_selene_sim, tmp_path
+):
+    """Test that the fresh build is used if it can't be moved into the cache."""
+    mock_selene_sim.build.side_effect = _fake_build(tmp_path)
+    package = Mock()
+    package.to_bytes.return_value = b"package"
+    builder = EmulatorBuilder().with_cache_dir(tmp_path / "cache")
+
+    with patch("guppylang.emulator.builder._commit_entry"):
+        builder.build(package, 3)
+    mock_selene_sim.SeleneInstance.assert_not_called()
+    instance = mock_emulator_instance.call_args.kwargs["_instance"]
+    assert instance.executable.is_file()
+
+
+@patch("guppylang.emulator.builder.selene_sim")
+@patch("guppylang.emulator.builder.EmulatorInstance")
+def test_emulator_builder_cache_versions(
+    mock_emulator_instance, mock_selene_sim, tmp_path
+):
+    """Test that upgrading a distribution involved in the build is a miss."""
+    mock_selene_sim.build.side_effect = _fake_build(tmp_path)
+    package = Mock()
+    package.to_bytes.return_value = b"package"
+    builder = EmulatorBuilder().with_cache_dir(tmp_path / "cache")
+
+    assert "selene-hugr-qis-compiler" in _requirements("selene-sim")
+    builder.build(package, 3)
+    # Scanning the installed distributions is only done once
+    with patch("importlib.metadata.packages_distributions") as scan:
+        builder.build(package, 3)
+    scan.assert_not_called()
+    versions = ["selene-hugr-qis-compiler==999"]
+    with patch("guppylang.emulator.builder._build_versions", return_value=versions):
+        builder.build(package, 3)
+    assert mock_selene_sim.build.call_count == 2
+
+
+@patch("guppylang.emulator.builder.selene_sim")
+@patch("guppylang.emulator.builder.EmulatorInstance")
+def test_emulator_builder_cache_unkeyable_option(
+    mock_emulator_instance, mock_selene_sim, tmp_path
+):
+    """Test that builds with options lacking a content-based repr are not cached."""
+    package = Mock()
+    package.to_bytes.return_value = b"package"
+    build_dir = tmp_path / "build"
+    builder = (
+        EmulatorBuilder()
+        .with_cache_dir(tmp_path / "cache")
+        .with_build_dir(build_dir)
+        .with_build_arg("custom", object())
+    )
+
+    builder.build(package, 3)
+    builder.build(package, 3)
+    assert mock_selene_sim.build.call_count == 2
+    assert mock_selene_sim.build.call_args.kwargs["build_dir"] == build_dir
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,82 @@
+"""Unit tests for guppylang.emulator.columnar module."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from guppylang.emulator.columnar import ColumnarResult
+from guppylang.emulator.result import EmulatorResult, QsysShot
+
+SHOTS = [
+    QsysShot([("c", [0, 1]), ("b[2]", 1), ("x", 1.5)]),
+    QsysShot([("c", [1, 1]), ("b[0]", 1), ("b[2]", 0), ("x", 2.5)]),
+    QsysShot([("c", [0, 1]), ("b[2]", 1)]),
+]
+
+
+def test_columns():
+    result = ColumnarResult.from_shots(SHOTS)
+    assert result.n_shots == 3
+    assert result.tags == ["c", "b[2]", "x", "b[0]"]
+    np.testing.assert_array_equal(result["c"], [[0, 1], [1, 1], [0, 1]])
+    np.testing.assert_array_equal(result["x"], [1.5, 2.5, 0])
+    np.testing.assert_array_equal(result.masks["x"], [True, True, False])
+    np.testing.assert_array_equal(result.masks["b[0]"], [False, True, False])
+
+
+def test_ragged():
+    shots = [QsysShot([("c", [0, 1])]), QsysShot([("c", [1])])]
+    with pytest.raises(ValueError, match="same length"):
+        ColumnarResult.from_shots(shots)
+
+
+def test_register_counts():
+    shots = [
+        QsysShot([("c", [0, 1]), ("b[2]", 1), ("d", 1)]),
+        QsysShot([("c", [1, 1]), ("b[2]", 0)]),
+        QsysShot([("c", [0, 1]), ("b[2]", 1), ("d", 0)]),
+    ]
+    columnar = EmulatorResult(shots).to_columnar()
+    assert columnar.register_counts() == EmulatorResult(shots).register_counts()
+
+
+def test_register_width_is_fixed():
+    shots = [QsysShot([("b[2]", 1)]), QsysShot([("b[0]", 1), ("b[2]", 0)])]
+    assert ColumnarResult.from_shots(shots).register_counts() == {
+        "b": {"001": 1, "100": 1}
+    }
+
+
+def test_packed_registers():
+    shots = [QsysShot([("c", [0, 1])]), QsysShot([("c", [1, 1])])]
+    packed = ColumnarResult.from_shots(shots).packed_registers()
+    np.testing.assert_array_equal(packed["c"], [[0b01000000], [0b11000000]])
+
+
+def test_register_bits_invalid():
+    result = ColumnarResult.from_shots(SHOTS)
+    with pytest.raises(ValueError, match="Expected bit data"):
+        result.register_bits()
+
+
+def test_to_pytket():
+    shots = [
+        QsysShot([("c", [0, 1]), ("d", 1)]),
+        QsysShot([("c", [1, 1]), ("d", 0)]),
+    ]
+    expected = EmulatorResult(shots).to_pytket()
+    actual = ColumnarResult.from_shots(shots).to_pytket()
+    assert actual.get_bitlist() == expected.get_bitlist()
+    assert actual.get_shots().tolist() == expected.get_shots().tolist()
+
+
+def test_save_load(tmp_path):
+    result = ColumnarResult.from_shots(SHOTS)
+    path = tmp_path / "results.npz"
+    result.save(path)
+    loaded = ColumnarResult.load(path)
+    assert loaded.n_shots == result.n_shots
+    assert loaded.tags == result.tags
+    for tag in result.tags:
+        np.testing.assert_array_equal(loaded[tag], result[tag])
+        np.testing.assert_array_equal(loaded.masks[tag], result.masks[tag])
@@ -4,8 +4,12 @@ from __future__ import annotations
 
 from unittest.mock import Mock, patch
 
+import numpy as np
+import pytest
 from guppylang.emulator.result import EmulatorResult
 
+from .test_state import write_state_file
+
 
 @patch("guppylang.emulator.result.Quest")
 def test_emulator_result_methods_comprehensive(mock_quest):
@@ -48,3 +52,30 @@ def test_emulator_result_methods_comprehensive(mock_quest):
         assert mock_quest.extract_states.call_count == 2
         # Verify PartialVector._from_inner called for each state
         assert mock_pv._from_inner.call_count == 3
+
+
+def test_iter_partial_states(tmp_path):
+    """Test lazy extraction and reductions of state results from files."""
+    shots = []
+    for i, state in enumerate([[1, 0, 0, 0], [0, 0, 0, 1], [0, 1, 0, 0]]):
+        path = tmp_path / f"state{i}.bin"
+        write_state_file(path, np.array(state), 2, [1])
+        shots.append([("c", 0), ("STATE:s", str(path))])
+    result = EmulatorResult(shots)
+
+    states = list(result.iter_partial_states(mmap=True))
+    assert [(shot, tag) for shot, tag, _ in states] == [(0, "s"), (1, "s"), (2, "s")]
+    assert np.allclose(result.state_probabilities("s"), [[1, 0], [0, 1], [1, 0]])
+    assert np.allclose(result.state_expectations("s", "Z"), [1, -1, 1])
+    assert result.state_probabilities("missing", [0]).shape == (0, 2)
+    assert result.state_probabilities("missing").shape == (0, 0)
+
+    # Without mmap, the states are read by the Quest plugin and files are kept
+    assert len(list(result.iter_partial_states())) == 3
+    assert all(path.is_file() for path in tmp_path.iterdir())
+
+    with pytest.raises(ValueError, match="can't be cleaned up"):
+        next(result.iter_partial_states(mmap=True, cleanup=True))
+    assert len(list(result.iter_partial_states(cleanup=True))) == 3
+    assert list(tmp_path.iterdir()) == []
+    assert list(result.iter_partial_states()) == []
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import struct
 from unittest.mock import Mock, patch
 
 import numpy as np
@@ -87,3 +88,100 @@ def test_partial_vector_as_single_state():
     result = pv.as_single_state(zero_threshold=1e-10)
 
     assert np.allclose(result, state)
+
+
+PAULIS = {
+    "I": np.eye(2),
+    "X": np.array([[0, 1], [1, 0]]),
+    "Y": np.array([[0, -1j], [1j, 0]]),
+    "Z": np.diag([1, -1]),
+}
+
+
+def random_partial_vector(total_qubits: int, specified_qubits: list[int]):
+    rng = np.random.default_rng(0)
+    state = rng.normal(size=1 << total_qubits) + 1j * rng.normal(size=1 << total_qubits)
+    return PartialVector(state / np.linalg.norm(state), total_qubits, specified_qubits)
+
+
+def density_matrix(pv: PartialVector) -> np.ndarray:
+    return sum(
+        st.probability * np.outer(st.state, st.state.conj())
+        for st in pv.state_distribution()
+    )
+
+
+def test_partial_vector_probabilities():
+    pv = random_partial_vector(4, [2, 0])
+    probs = np.diag(density_matrix(pv)).real
+    assert np.allclose(pv.probabilities(), probs)
+    assert np.allclose(pv.probabilities([1, 0]), probs.reshape(2, 2).T.reshape(-1))
+    assert np.allclose(pv.probabilities([0]), probs.reshape(2, 2).sum(axis=1))
+
+
+@pytest.mark.parametrize("pauli", ["IZ", "XI", "YY", "XZ", "ZY"])
+def test_partial_vector_expectation(pauli: str):
+    pv = random_partial_vector(3, [2, 0])
+    op = np.kron(PAULIS[pauli[0]], PAULIS[pauli[1]])
+    assert np.isclose(pv.expectation(pauli), np.trace(density_matrix(pv) @ op).real)
+
+
+def test_partial_vector_expectation_invalid():
+    pv = random_partial_vector(2, [0])
+    with pytest.raises(ValueError, match="Pauli string"):
+        pv.expectation("XX")
+
+
+def write_state_file(path, state: np.ndarray, total: int, specified: list[int]):
+    with path.open("wb") as f:
+        f.write(b"selene-quest")
+        f.write(struct.pack("<QQ", total, len(specified)))
+        f.write(struct.pack(f"<{len(specified)}Q", *specified))
+        f.write(state.astype(np.complex128).tobytes())
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_partial_vector_from_file(tmp_path, mmap: bool):
+    pv = random_partial_vector(3, [1, 2])
+    path = tmp_path / "state.bin"
+    write_state_file(path, pv._inner.state, 3, [1, 2])
+
+    loaded = PartialVector.from_file(path, mmap=mmap)
+    assert isinstance(loaded._inner.state, np.memmap) == mmap
+    assert loaded.total_qubits == 3
+    assert loaded.specified_qubits == [1, 2]
+    assert np.allclose(loaded._inner.state, pv._inner.state)
+
+
+@pytest.mark.parametrize(
+    ("contents", "match"),
+    [
+        (b"selene-qest", "Invalid state file format"),
+        (b"selene-quest" + struct.pack("<Q", 3), "Truncated"),
+        (b"selene-quest" + struct.pack("<QQQ", 3, 2, 1), "Truncated"),
+        (b"selene-quest" + struct.pack("<QQQ", 1, 1, 0) + bytes(16), "has size 52"),
+    ],
+)
+def test_partial_vector_from_file_invalid(tmp_path, contents: bytes, match: str):
+    path = tmp_path / "state.bin"
+    path.write_bytes(contents)
+    with pytest.raises(ValueError, match=match):
+        PartialVector.from_file(path, mmap=True)
+
+
+@pytest.mark.parametrize(
+    ("total_qubits", "specified_qubits"), [(3, [1]), (4, [3, 0]), (5, [4, 0, 1, 2])]
+)
+def test_partial_vector_density_matrix(total_qubits, specified_qubits):
+    pv = random_partial_vector(total_qubits, specified_qubits)
+    rho = pv.density_matrix()
+    assert np.allclose(rho, pv._inner.get_density_matrix())
+    assert np.allclose(rho, density_matrix(pv))
+
+    # The number of branches is bounded by the dimension of the traced out qubits
+    n_traced = total_qubits - len(specified_qubits)
+    dist = pv.state_distribution()
+    assert len(dist) == min(1 << n_traced, 1 << len(specified_qubits))
+    probs = [st.probability for st in dist]
+    assert probs == sorted(probs, reverse=True)
+    assert np.isclose(sum(probs), 1)
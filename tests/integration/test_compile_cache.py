@@ -0,0 +1,108 @@
+from types import ModuleType
+
+import pytest
+
+from guppylang.decorator import guppy
+from guppylang.std.builtins import comptime, py
+from guppylang_internals.compile_cache import (
+    disable_compile_cache,
+    enable_compile_cache,
+)
+from guppylang_internals.debug_mode import (
+    debug_mode_enabled,
+    turn_off_debug_mode,
+    turn_on_debug_mode,
+)
+from guppylang_internals.engine import ENGINE
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    # Packages are never cached in debug mode, which other test modules may enable
+    debug = debug_mode_enabled()
+    turn_off_debug_mode()
+    enable_compile_cache(tmp_path)
+    yield tmp_path
+    disable_compile_cache()
+    if debug:
+        turn_on_debug_mode()
+
+
+def test_cache_hit(validate, cache_dir):
+    @guppy
+    def foo(x: int) -> int:
+        return x + 1
+
+    @guppy
+    def main() -> int:
+        return foo(1)
+
+    package = main.compile()
+    validate(package)
+    assert ENGINE.compiled
+    assert len(list(cache_dir.iterdir())) == 1
+
+    cached = main.compile()
+    validate(cached)
+    assert not ENGINE.compiled
+    assert cached.modules[0].entrypoint == package.modules[0].entrypoint
+    assert cached.modules[0].num_nodes() == package.modules[0].num_nodes()
+
+
+def test_captured_value_changes_key(validate, cache_dir):
+    n = 1
+
+    @guppy
+    def main() -> int:
+        return py(n)
+
+    validate(main.compile())
+    n = 2
+    validate(main.compile())
+    assert ENGINE.compiled
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_captured_module_not_cached(validate, cache_dir):
+    cfgmod = ModuleType("cfgmod")
+    cfgmod.VALUE = 1111111  # type: ignore[attr-defined]
+
+    @guppy
+    def main() -> int:
+        return comptime(cfgmod.VALUE)
+
+    package = main.compile()
+    validate(package)
+    assert "1111111" in package.to_str()
+
+    # Simulate a new session in which the module constant has been changed
+    ENGINE.reset()
+    cfgmod.VALUE = 2222222  # type: ignore[attr-defined]
+    package = main.compile()
+    validate(package)
+    assert "2222222" in package.to_str()
+    assert ENGINE.compiled
+    assert not list(cache_dir.iterdir())
+
+
+def test_comptime_not_cached(validate, cache_dir):
+    @guppy.comptime
+    def main() -> int:
+        return 1
+
+    validate(main.compile())
+    validate(main.compile())
+    assert ENGINE.compiled
+    assert not list(cache_dir.iterdir())
+
+
+def test_entrypoint_args_error_on_hit(cache_dir):
+    from guppylang_internals.error import GuppyError
+
+    @guppy
+    def main(x: int) -> int:
+        return x
+
+    main.compile_function()
+    with pytest.raises(GuppyError):
+        main.compile()
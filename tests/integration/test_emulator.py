@@ -24,7 +24,8 @@ from guppylang.std.quantum import (
 from guppylang.std.angles import angle, pi
 from guppylang.std.qsystem import zz_max, zz_phase, phased_x, rz as qsystem_rz
 from guppylang.std.qsystem.utils import get_current_shot
-from guppylang.emulator import EmulatorResult, EmulatorError
+from guppylang.emulator import EmulatorBuilder, EmulatorResult, EmulatorError
+from guppylang.emulator.aggregate import RegisterCounts
 from guppylang.emulator.state import StateVector
 
 from selene_sim.backends.bundled_runtimes import SoftRZRuntime
@@ -325,6 +326,104 @@ def test_user_panic() -> None:
     assert exception.failing_shot.entries == [("before", 9)]
 
 
+def test_iter_shots_user_panic() -> None:
+    @guppy
+    def main() -> None:
+        current_shot = get_current_shot()
+        result("before", current_shot)
+        if current_shot == 3:
+            panic("Panic at shot 3!")
+        result("after", current_shot)
+
+    shots = []
+
+    def consume() -> None:
+        shots.extend(
+            shot.entries for shot in main.emulator(1).with_shots(10).iter_shots()
+        )
+
+    with pytest.raises(EmulatorError, match="Panic at shot 3!") as exc_info:
+        consume()
+
+    assert shots == [[("before", i), ("after", i)] for i in range(3)]
+    exception: EmulatorError = exc_info.value
+    assert exception.failed_shot_index == 3
+    assert exception.completed_shots == EmulatorResult()
+    assert exception.failing_shot.entries == [("before", 3)]
+
+
+def test_run_stream() -> None:
+    @guppy
+    def main() -> None:
+        q0, q1 = qubit(), qubit()
+        h(q0)
+        cx(q0, q1)
+        result("c", array(measure(q0), measure(q1)))
+
+    emulator = main.emulator(2).with_shots(50).with_seed(1)
+    counts = emulator.run_stream(RegisterCounts())
+    assert counts == emulator.run().register_counts()
+    assert counts["c"].keys() <= {"00", "11"}
+    assert counts["c"].total() == 50
+
+
+@pytest.mark.parametrize(("workers", "shots"), [(1, 10), (3, 10), (20, 10), (2, 0)])
+def test_run_parallel(workers: int, shots: int) -> None:
+    @guppy
+    def main() -> None:
+        q = qubit()
+        h(q)
+        result("shot", get_current_shot())
+        result("c", measure(q))
+
+    emulator = main.emulator(1).with_shots(shots).with_seed(7).with_shot_offset(5)
+    parallel = emulator.run_parallel(workers)
+    assert parallel.results == emulator.run().results
+    assert [shot.as_dict()["shot"] for shot in parallel.results] == list(
+        range(5, 5 + shots)
+    )
+
+
+def test_run_parallel_user_panic() -> None:
+    @guppy
+    def main() -> None:
+        current_shot = get_current_shot()
+        result("before", current_shot)
+        if current_shot % 4 == 1:
+            panic("Panic!")
+        result("after", current_shot)
+
+    with pytest.raises(EmulatorError, match="Panic!") as exc_info:
+        main.emulator(1).with_shots(8).run_parallel(2)
+
+    # Shard 0 runs shots 0-3 and fails at shot 1, shard 1 runs shots 4-7 and fails at
+    # shot 5
+    exception: EmulatorError = exc_info.value
+    assert exception.failed_shot_index == 1
+    assert exception.failing_shot.entries == [("before", 1)]
+    assert [e.failed_shot_index for e in exception.shard_errors] == [1, 5]
+    assert [shot.entries for shot in exception.completed_shots.results] == [
+        [("before", 0), ("after", 0)],
+        [("before", 4), ("after", 4)],
+    ]
+
+
+def test_build_cache(tmp_path) -> None:
+    @guppy
+    def main() -> None:
+        q = qubit()
+        x(q)
+        result("c", measure(q))
+
+    builder = EmulatorBuilder().with_cache_dir(tmp_path)
+    first = main.emulator(1, builder=builder)
+    second = main.emulator(1, builder=builder)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert second._instance.executable == first._instance.executable
+    assert second._instance.runs != first._instance.runs
+    assert second.with_shots(3).run().register_counts() == {"c": {"1": 3}}
+
+
 def test_friendly_emulator_panic() -> None:
     """Test a panic as issued by the emulator due to a configuration
     issue.
@@ -426,3 +525,27 @@ def test_state_qubit_order():
 
     assert pytest.approx(statevector_probabilities(state_noswap)) == [0, 1, 0, 0]
     assert pytest.approx(statevector_probabilities(state_swap)) == [0, 0, 1, 0]
+
+
+def test_state_file_format():
+    """Test that state files written by the Quest simulator are memory-mapped
+    consistently with the plugin's own parser."""
+
+    @guppy
+    def main() -> None:
+        qs = array(qubit() for _ in range(3))
+        h(qs[0])
+        cx(qs[0], qs[2])
+        state_result("s", qs[2], qs[0])
+        discard_array(qs)
+
+    results = main.emulator(3).statevector_sim().with_shots(2).with_seed(1).run()
+    mapped = list(results.iter_partial_states(mmap=True))
+    read = list(results.iter_partial_states())
+    assert [(shot, tag) for shot, tag, _ in mapped] == [(0, "s"), (1, "s")]
+    assert [(shot, tag) for shot, tag, _ in read] == [(0, "s"), (1, "s")]
+    for (_, _, m), (_, _, r) in zip(mapped, read, strict=True):
+        assert isinstance(m._inner.state, np.memmap)
+        assert m.total_qubits == r.total_qubits == 3
+        assert m.specified_qubits == r.specified_qubits == [2, 0]
+        assert np.array_equal(m._inner.state, r._inner.state)
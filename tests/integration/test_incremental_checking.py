@@ -0,0 +1,136 @@
+from types import ModuleType
+
+import pytest
+
+from guppylang.decorator import guppy
+from guppylang.std.builtins import comptime, py
+from guppylang_internals.engine import ENGINE
+from guppylang_internals.error import GuppyError
+
+
+def test_reuse_checked(validate):
+    @guppy
+    def foo(x: int) -> int:
+        return x + 1
+
+    @guppy
+    def main() -> int:
+        return foo(1)
+
+    validate(main.compile())
+    checked_main = ENGINE.checked[main.id, ()]
+    checked_foo = ENGINE.checked[foo.id, ()]
+
+    validate(main.compile())
+    assert ENGINE.checked[main.id, ()] is checked_main
+    assert ENGINE.checked[foo.id, ()] is checked_foo
+
+
+def test_rebound_python_value(validate):
+    n = 1
+
+    @guppy
+    def foo() -> int:
+        return py(n)
+
+    @guppy
+    def bar() -> int:
+        return 42
+
+    @guppy
+    def main() -> int:
+        return foo() + bar()
+
+    validate(main.compile())
+    checked_main = ENGINE.checked[main.id, ()]
+    checked_foo = ENGINE.checked[foo.id, ()]
+    checked_bar = ENGINE.checked[bar.id, ()]
+
+    n = 2
+    validate(main.compile())
+    assert ENGINE.checked[foo.id, ()] is not checked_foo
+    assert ENGINE.checked[main.id, ()] is not checked_main
+    assert ENGINE.checked[bar.id, ()] is checked_bar
+
+
+def test_rebound_module_attribute(run_int_fn):
+    cfgmod = ModuleType("cfgmod")
+    cfgmod.VALUE = 111  # type: ignore[attr-defined]
+
+    @guppy
+    def main() -> int:
+        return comptime(cfgmod.VALUE)
+
+    run_int_fn(main, 111)
+    cfgmod.VALUE = 222  # type: ignore[attr-defined]
+    run_int_fn(main, 222)
+
+
+def test_mutated_python_value(run_int_fn):
+    xs = [1]
+
+    @guppy
+    def main() -> int:
+        return py(xs[0])
+
+    run_int_fn(main, 1)
+    xs[0] = 2
+    run_int_fn(main, 2)
+
+
+def test_redefined_dependency(validate):
+    @guppy
+    def foo() -> int:
+        return 1
+
+    @guppy
+    def main() -> int:
+        return foo()
+
+    validate(main.compile())
+
+    @guppy
+    def foo() -> bool:  # noqa: F811
+        return True
+
+    with pytest.raises(GuppyError):
+        main.compile()
+    assert (main.id, ()) not in ENGINE.checked
+
+
+def test_error_is_reported_again():
+    @guppy
+    def foo() -> int:
+        return True
+
+    @guppy
+    def main() -> int:
+        return foo()
+
+    with pytest.raises(GuppyError):
+        main.check()
+    with pytest.raises(GuppyError):
+        main.check()
+
+
+def test_scope_shared_across_monomorphizations(validate, run_int_fn):
+    n = 1
+    T = guppy.type_var("T")
+
+    @guppy
+    def foo(x: T) -> int:
+        return py(n)
+
+    @guppy
+    def main() -> int:
+        return foo(1) + foo(1.0)
+
+    validate(main.compile())
+    scope = ENGINE.scopes[foo.id]
+    validate(main.compile())
+    assert ENGINE.scopes[foo.id] is scope
+
+    # Rebinding a referenced name discards the resolved names
+    n = 2
+    run_int_fn(main, 4)
+    assert ENGINE.scopes[foo.id] is not scope
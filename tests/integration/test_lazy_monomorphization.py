@@ -0,0 +1,121 @@
+from hugr import Hugr, ops
+
+from guppylang import array, guppy
+from guppylang.std.builtins import owned
+from guppylang.experimental import enable_lazy_monomorphization
+from guppylang_internals.engine import ENGINE
+
+
+def funcs_defs(h: Hugr) -> list[str]:
+    return [h[node].op.f_name for node in h if isinstance(h[node].op, ops.FuncDefn)]
+
+
+def test_polymorphic(validate, run_int_fn):
+    N = guppy.nat_var("N")
+
+    @guppy
+    def foo(xs: array[int, N]) -> int:
+        return xs[0] + N
+
+    @guppy
+    def main() -> int:
+        return foo(array(1, 2)) + foo(array(3, 4, 5))
+
+    with enable_lazy_monomorphization():
+        package = main.compile_function()
+        validate(package)
+        # Both calls of `foo` share a single polymorphic function
+        assert len(funcs_defs(package.modules[0])) == 2
+        stats = ENGINE.instantiation_report()[foo.id]
+        assert stats.polymorphic
+        assert stats.compiled == 1
+        run_int_fn(main, 9)
+
+
+def test_monomorphized_by_default(validate):
+    N = guppy.nat_var("N")
+
+    @guppy
+    def foo(xs: array[int, N]) -> int:
+        return xs[0] + N
+
+    @guppy
+    def main() -> int:
+        return foo(array(1, 2)) + foo(array(3, 4, 5))
+
+    package = main.compile_function()
+    validate(package)
+    assert len(funcs_defs(package.modules[0])) == 3
+    stats = ENGINE.instantiation_report()[foo.id]
+    assert not stats.polymorphic
+    assert stats.compiled == 2
+
+
+def test_polymorphic_call_chain(validate):
+    N = guppy.nat_var("N")
+
+    @guppy
+    def bar(xs: array[int, N] @ owned) -> array[int, N]:
+        return xs
+
+    @guppy
+    def foo(xs: array[int, N] @ owned) -> array[int, N]:
+        return bar(xs)
+
+    @guppy
+    def main() -> None:
+        foo(array(1, 2))
+        foo(array(1, 2, 3))
+
+    with enable_lazy_monomorphization():
+        package = main.compile_function()
+        validate(package)
+        assert len(funcs_defs(package.modules[0])) == 3
+        report = ENGINE.instantiation_report()
+        assert report[foo.id].polymorphic
+        assert report[bar.id].polymorphic
+
+
+def test_comptime_fallback(validate, run_int_fn):
+    N = guppy.nat_var("N")
+
+    @guppy
+    def foo(xs: array[int, N]) -> int:
+        s = 0
+        for i in range(N):
+            s += xs[i]
+        return s
+
+    @guppy
+    def main() -> int:
+        return foo(array(1, 2)) + foo(array(3, 4, 5))
+
+    with enable_lazy_monomorphization():
+        package = main.compile_function()
+        validate(package)
+        stats = ENGINE.instantiation_report()[foo.id]
+        assert not stats.polymorphic
+        assert stats.compiled == 2
+        run_int_fn(main, 15)
+
+
+def test_nested_fallback(validate):
+    N = guppy.nat_var("N")
+
+    @guppy
+    def foo(xs: array[int, N]) -> int:
+        def bar() -> int:
+            return 1
+
+        return bar()
+
+    @guppy
+    def main() -> int:
+        return foo(array(1, 2)) + foo(array(3, 4, 5))
+
+    with enable_lazy_monomorphization():
+        package = main.compile_function()
+        validate(package)
+        stats = ENGINE.instantiation_report()[foo.id]
+        assert not stats.polymorphic
+        assert stats.compiled == 2
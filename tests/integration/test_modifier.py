@@ -368,3 +368,19 @@ def test_comptime_unitary_mixed(validate):
         return q1
 
     validate(foo.compile_function())
+
+
+def test_generic_control_instantiations(validate):
+    n = guppy.nat_var("n")
+
+    @guppy
+    def bar(qs: array[qubit, n], q: qubit) -> None:
+        with control(qs):
+            h(q)
+
+    @guppy
+    def main(qs1: array[qubit, 2], qs2: array[qubit, 3], q: qubit) -> None:
+        bar(qs1, q)
+        bar(qs2, q)
+
+    validate(main.compile_function())
@@ -1,4 +1,5 @@
 from guppylang import qubit, array
+from guppylang.std.num import nat
 from guppylang.decorator import guppy
 from guppylang_internals.decorator import custom_function, hugr_op
 from guppylang_internals.definition.custom import NoopCompiler
@@ -190,3 +191,30 @@ def test_everything_can_be_overloaded(validate):
         combined_circ(qs)
 
     validate(main.compile_function())
+
+
+def test_pick_by_argument_type(validate):
+    @guppy.declare
+    def variant1(x: bool) -> bool: ...
+
+    @guppy.declare
+    def variant2(x: array[int, 2]) -> int: ...
+
+    @guppy.declare
+    def variant3(x: float) -> float: ...
+
+    @guppy.declare
+    def variant4(x: nat) -> nat: ...
+
+    @guppy.overload(variant1, variant2, variant3, variant4)
+    def combined(*args): ...
+
+    @guppy
+    def main(b: bool, xs: array[int, 2], n: nat) -> float:
+        # Variables of numeric type may be coerced, so `n` picks `variant3`
+        x: float = combined(n)
+        y: int = combined(xs)
+        z: bool = combined(b)
+        return x + combined(1.0 + y)
+
+    validate(main.compile_function())
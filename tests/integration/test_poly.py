@@ -11,6 +11,7 @@ from guppylang.decorator import guppy
 from guppylang_internals.decorator import custom_function, custom_type
 from guppylang_internals.definition.custom import CustomCallCompiler
 from guppylang.std.builtins import array
+from guppylang.std.option import Option
 from guppylang.std.quantum import qubit
 
 
@@ -168,6 +169,22 @@ def test_infer_nested(validate):
     validate(main.compile_function())
 
 
+def test_infer_nested_generic(validate):
+    T = guppy.type_var("T")
+
+    @guppy.declare
+    def foo() -> Option[T]: ...
+
+    @guppy.declare
+    def bar(x: Option[T]) -> Option[T]: ...
+
+    @guppy
+    def main() -> None:
+        x: Option[int] = bar(bar(bar(foo())))
+
+    validate(main.compile_function())
+
+
 def test_infer_left_to_right(validate):
     S = guppy.type_var("S")
     T = guppy.type_var("T")
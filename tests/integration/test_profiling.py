@@ -0,0 +1,79 @@
+import json
+
+from guppylang import qubit
+from guppylang.decorator import guppy
+from guppylang.std.quantum import cx, h
+from guppylang_internals.profiling import active_profile, profile
+
+
+def test_profile(validate, tmp_path):
+    @guppy
+    def foo(x: int) -> int:
+        return x + 1
+
+    @guppy
+    def main() -> int:
+        return foo(1)
+
+    with profile() as prof:
+        validate(main.compile())
+    assert active_profile() is None
+
+    for name in ("parse", "check", "compile", "insert_drops", "used_extensions"):
+        assert prof.phases[name].calls > 0
+    assert prof.phases["compile"].nodes > 0
+
+    [foo_label] = [label for label in prof.definitions if label.startswith("foo#")]
+    assert prof.definitions[foo_label]["check"].calls == 1
+    assert prof.definitions[foo_label]["check_cfg_linearity"].calls == 1
+    assert prof.definitions[foo_label]["compile"].nodes > 0
+
+    prof.dump_json(tmp_path / "profile.json")
+    summary = json.loads((tmp_path / "profile.json").read_text())
+    assert summary["phases"]["check"]["calls"] == prof.phases["check"].calls
+
+    prof.dump_chrome_trace(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert len(trace["traceEvents"]) == len(prof.events)
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+
+
+def test_profile_disabled():
+    @guppy
+    def main() -> int:
+        return 1
+
+    main.compile()
+    assert active_profile() is None
+
+
+def test_profile_to_hugr_cache(validate):
+    @guppy.struct
+    class MyStruct:
+        x: int
+        y: tuple[int, float]
+
+    @guppy
+    def foo(s: MyStruct) -> MyStruct:
+        return s
+
+    @guppy
+    def main(s: MyStruct) -> MyStruct:
+        return foo(foo(s))
+
+    with profile() as prof:
+        validate(main.compile_function())
+    assert prof.counters["to_hugr_cache_misses"] > 0
+    assert prof.counters["to_hugr_cache_hits"] > 0
+
+
+def test_profile_trace_call_cache(validate):
+    @guppy.comptime
+    def main(q1: qubit, q2: qubit) -> None:
+        for _ in range(10):
+            h(q1)
+            cx(q1, q2)
+
+    with profile() as prof:
+        validate(main.compile_function())
+    assert prof.counters["trace_call_cache_hits"] == 18
@@ -165,3 +165,20 @@ def test_nested(validate):
 
     for loop in [l1, l2, l3, l4]:
         check_order(hugr, hugr.children(loop)[:2])
+
+
+def test_tracking_is_local_to_hugr():
+    from hugr.build import Dfg
+
+    from guppylang_internals.compiler.core import track_hugr_side_effects
+
+    tracked, untracked = Dfg(), Dfg()
+    panic_op = PRELUDE.get_op("panic").instantiate()
+    with track_hugr_side_effects(tracked.hugr):
+        tracked.add_op(panic_op, *tracked.inputs())
+        untracked.add_op(panic_op, *untracked.inputs())
+    assert "add_node" not in vars(tracked.hugr)
+
+    [tracked_panic] = find_ext_nodes(tracked.hugr, "prelude.panic")
+    check_order(tracked.hugr, [tracked.input_node, tracked_panic, tracked.output_node])
+    assert not list(untracked.hugr.outgoing_order_links(untracked.input_node))
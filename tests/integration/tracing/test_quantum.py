@@ -40,3 +40,56 @@ def test_angles(validate):
             theta /= 2
 
     validate(test.compile_function())
+
+
+def _op_names(package) -> list[str]:
+    hugr = package.modules[0]
+    return [data.op.name() for _, data in hugr.nodes() if hasattr(data.op, "name")]
+
+
+def test_touch_few_elements(validate):
+    @guppy.comptime
+    def test(qs: array[qubit, 100]) -> None:
+        h(qs[3])
+        cx(qs[3], qs[42])
+
+    package = test.compile_function()
+    validate(package)
+    names = _op_names(package)
+    assert not any("unpack" in name for name in names)
+    assert sum(".borrow<" in name for name in names) == 2
+
+
+def test_touch_then_iterate(validate):
+    @guppy.comptime
+    def test(qs: array[qubit, 10]) -> None:
+        h(qs[0])
+        for q in qs:
+            h(q)
+
+    validate(test.compile_function())
+
+
+def test_pass_array_through(validate):
+    @guppy
+    def inner(qs: array[qubit, 10]) -> None:
+        for i in range(10):
+            h(qs[i])
+
+    @guppy.comptime
+    def test(qs: array[qubit, 10]) -> None:
+        h(qs[1])
+        inner(qs)
+        cx(qs[1], qs[2])
+        inner(qs)
+
+    validate(test.compile_function())
+
+
+def test_modified_list(validate):
+    @guppy.comptime
+    def test(qs: array[qubit, 10]) -> None:
+        qs[0], qs[9] = qs[9], qs[0]
+        h(qs[0])
+
+    validate(test.compile_function())
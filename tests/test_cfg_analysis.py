@@ -0,0 +1,111 @@
+import ast
+import random
+
+import pytest
+from guppylang_internals.cfg.analysis import (
+    AssignmentAnalysis,
+    BackwardAnalysis,
+    ForwardAnalysis,
+    LivenessAnalysis,
+    VarIndex,
+    Worklist,
+)
+from guppylang_internals.cfg.bb import BB, VariableStats
+from guppylang_internals.cfg.cfg import CFG
+
+VARS = ["a", "b", "c", "d", "e"]
+
+
+def random_cfg(
+    seed: int, include_unreachable: bool
+) -> tuple[CFG, dict[BB, VariableStats[str]]]:
+    """Builds a random CFG with loops, unreachable BBs and dummy edges.
+
+    Unless `include_unreachable` is set, there are no jumps from unreachable BBs into
+    reachable ones, matching the CFGs on which the analyses are run in that mode.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    cfg = CFG()
+    bbs = [cfg.entry_bb] + [cfg.new_bb() for _ in range(rng.randint(1, 8))]
+    bbs.append(cfg.exit_bb)
+    for bb in bbs[:-1]:
+        for succ in rng.sample(bbs[1:], rng.randint(0, 2)):
+            if rng.random() < 0.2:
+                cfg.dummy_link(bb, succ)
+            else:
+                cfg.link(bb, succ)
+    cfg.update_reachable()
+    if not include_unreachable:
+        for bb in cfg.bbs:
+            if not bb.reachable:
+                for succ in bb.successors:
+                    succ.predecessors.remove(bb)
+                bb.successors = []
+    stats = {
+        bb: VariableStats(
+            assigned={x: ast.Pass() for x in rng.sample(VARS, rng.randint(0, 2))},
+            used={x: ast.Pass() for x in rng.sample(VARS, rng.randint(0, 2))},
+        )
+        for bb in cfg.bbs
+    }
+    return cfg, stats
+
+
+def test_var_index():
+    index: VarIndex[str] = VarIndex()
+    assert index.bits(["b", "a"]) == 0b11
+    assert index.bits(["c", "a"]) == 0b110
+    assert list(index.unpack(0b111)) == ["b", "a", "c"]
+    assert list(index.unpack(0)) == []
+
+
+def test_worklist():
+    cfg = CFG()
+    bb1, bb2, bb3 = cfg.entry_bb, cfg.exit_bb, cfg.new_bb()
+    worklist = Worklist([bb3, bb1])
+    assert worklist.pop() is bb3
+    # Pending BBs and BBs outside of the order are ignored
+    worklist.update([bb1, bb2])
+    assert worklist.pop() is bb1
+    assert not worklist
+    worklist.update([bb1, bb3])
+    assert worklist.pop() is bb3
+    assert worklist.pop() is bb1
+    assert not worklist
+
+
+def test_postorder_loop():
+    cfg = CFG()
+    body = cfg.new_bb(cfg.entry_bb)
+    cfg.link(body, body)
+    cfg.link(body, cfg.exit_bb)
+    analysis = LivenessAnalysis({})
+    assert analysis.postorder(cfg.bbs) == [cfg.exit_bb, body, cfg.entry_bb]
+
+
+@pytest.mark.parametrize("include_unreachable", [False, True])
+@pytest.mark.parametrize("seed", range(50))
+def test_liveness(seed: int, include_unreachable: bool):
+    cfg, stats = random_cfg(seed, include_unreachable)
+    initial = {"a": cfg.exit_bb}
+    analysis = LivenessAnalysis(stats, initial, include_unreachable)
+    expected = BackwardAnalysis.run(analysis, cfg.bbs)
+    actual = analysis.run(cfg.bbs)
+    assert actual.keys() == expected.keys()
+    for bb, live in actual.items():
+        assert live.keys() == expected[bb].keys()
+        # Each live variable must come with a BB that actually uses it
+        for x, use_bb in live.items():
+            assert x in stats[use_bb].used or initial.get(x) is use_bb
+
+
+@pytest.mark.parametrize("include_unreachable", [False, True])
+@pytest.mark.parametrize("seed", range(50))
+def test_assignment(seed: int, include_unreachable: bool):
+    cfg, stats = random_cfg(seed, include_unreachable)
+    analysis = AssignmentAnalysis(stats, {"a"}, {"a", "b"}, include_unreachable)
+    expected = ForwardAnalysis.run(analysis, cfg.bbs)
+    assert analysis.run(cfg.bbs) == expected
+    def_ass, maybe_ass = analysis.run_unpacked(cfg.bbs)
+    assert def_ass == {bb: d for bb, (d, _) in expected.items()}
+    assert maybe_ass == {bb: m for bb, (_, m) in expected.items()}
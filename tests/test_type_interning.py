@@ -0,0 +1,38 @@
+from guppylang_internals.tys.builtin import array_type, int_type, list_type
+from guppylang_internals.tys.param import TypeParam
+from guppylang_internals.tys.ty import (
+    FuncInput,
+    FunctionType,
+    InputFlags,
+    TupleType,
+    intern_type,
+)
+
+
+def test_structurally_equal_types_are_shared():
+    ty1 = array_type(array_type(int_type(), 3), 4)
+    ty2 = array_type(array_type(int_type(), 3), 4)
+    assert ty1 is ty2
+    assert array_type(int_type(), 3) is not array_type(int_type(), 4)
+
+
+def test_instantiation_is_interned():
+    param = TypeParam(0, "T", must_be_copyable=False, must_be_droppable=False)
+    generic = FunctionType(
+        [FuncInput(list_type(param.to_bound().ty), InputFlags.NoFlags)],
+        param.to_bound().ty,
+        [param],
+    )
+    elem = TupleType([int_type(), int_type()])
+    inst1 = generic.instantiate((elem.to_arg(),))
+    inst2 = generic.instantiate((TupleType([int_type(), int_type()]).to_arg(),))
+    assert inst1 is inst2
+    assert inst1.inputs[0].ty is list_type(elem)
+
+
+def test_input_names_are_kept_apart():
+    ty1 = FunctionType([FuncInput(int_type(), InputFlags.NoFlags, "x")], int_type())
+    ty2 = FunctionType([FuncInput(int_type(), InputFlags.NoFlags, "y")], int_type())
+    assert ty1 == ty2
+    assert intern_type(ty1) is not intern_type(ty2)
+    assert intern_type(ty2).input_names == ["y"]
@@ -0,0 +1,35 @@
+from guppylang_internals.tys.builtin import array_type, int_type, list_type, nat_type
+from guppylang_internals.tys.const import ExistentialConstVar
+from guppylang_internals.tys.ty import ExistentialTypeVar, Unifier, unify
+
+
+def fresh_var(name: str) -> ExistentialTypeVar:
+    return ExistentialTypeVar.fresh(name, copyable=True, droppable=True)
+
+
+def test_chained_vars():
+    a, b, c = fresh_var("a"), fresh_var("b"), fresh_var("c")
+    unifier = Unifier()
+    assert unifier.unify(a, b)
+    assert unifier.unify(b, c)
+    assert unifier.find(a) == unifier.find(c)
+    assert unifier.unify(list_type(c), list_type(int_type()))
+    assert unifier.subst() == {a: int_type(), b: int_type(), c: int_type()}
+
+
+def test_lazy_resolution():
+    a, b = fresh_var("a"), fresh_var("b")
+    n = ExistentialConstVar.fresh("n", nat_type())
+    unifier = Unifier()
+    assert unifier.unify(a, list_type(b))
+    assert unifier.unify(array_type(b, n), array_type(int_type(), 42))
+    assert unifier.resolve(a) == list_type(int_type())
+    assert unifier.resolve(array_type(a, n)) == array_type(list_type(int_type()), 42)
+
+
+def test_occurs_check():
+    a, b = fresh_var("a"), fresh_var("b")
+    unifier = Unifier()
+    assert unifier.unify(a, list_type(b))
+    assert not unifier.unify(b, a)
+    assert unify(a, list_type(a), {}) is None